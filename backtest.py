@@ -0,0 +1,506 @@
+# backtest.py (VEKTÖREL GEÇMİŞ TESTİ: Canlı Kuralların Tüm Geçmişte Tekrarı)
+#
+# bot.py'deki kuralları (is_yesil1_daily, is_yesil2_4h, detect_ma_crosses,
+# detect_volume_spike, today_trend_break ve rules.json'daki tetikleyici/güç kuralları)
+# her 4H bar kapanışında, tüm semboller için bar döngüsü olmadan değerlendirir.
+# Tetikleyici ve güç kuralları worker ile aynı rules.json'dan derlenir ve
+# (sembol x bar) matrislerinde tek geçişte değerlendirilir.
+# Her t barı için worker'ın o anda göreceği çerçeveler esas alınır:
+#   4H:     t'ye kadarki tüm 4H barlar
+#   günlük: t'nin gününden önce tamamlanmış günler + o günün t anındaki kısmi
+#           barı (açılış = günün ilk 4H açılışı, kapanış = t kapanışı). Bu,
+#           worker'ın saatlik veriden türettiği (derive_frames) günlük çerçevedir.
+# Tetiklenen her bar için ileri getiriler (HORIZONS adet 4H bar sonrası) ve
+# isabet oranları tetikleyici ve güç bazında raporlanır. verify_last_bar son
+# barın canlı fonksiyonlarla birebir aynı olduğunu denetler.
+# Ağ kullanılmaz: veri bar önbelleğinden (bars.db) veya fixture CSV'lerinden okunur.
+#
+#   python backtest.py --source fixture --fixture-dir fixtures
+#   python backtest.py --source cache --cache bars.db --out sinyaller.csv
+
+import argparse
+import glob
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from indicators import MA_CROSS_LABELS, align_universe, ema, rsi
+from resample import SESSION_TZ, derive_frames
+from signal_rules import MA_FEATURES, load_rules
+
+RSI_PERIOD = 14
+SR_LOOKBACK = 100
+SR_ORDER = 5
+MA_MIN_DAYS = 210          # detect_ma_crosses: en az bu kadar günlük bar
+HORIZONS = (1, 2, 6, 12)   # ileri getiri ufukları (4H bar)
+SYMBOL_BLOCK = 128         # bellek için 4H göstergeleri bu kadar sembollük bloklarla hesaplanır
+
+# Kural tetikleyicilerine ek olarak raporlanan ayrıntı grupları (ad, yön)
+DETAIL_GROUPS = tuple((f"ma:{label}", 1 if "↑" in label else -1) for label in MA_CROSS_LABELS) + \
+    (("trend:res_break", 1), ("trend:sup_break", -1))
+
+
+def strength_direction(name):
+    """Güç adının yönü: *sell -> -1, diğerleri +1 (bot.py'deki emoji seçimiyle aynı)."""
+    return -1 if name and "sell" in name else 1
+
+
+# -----------------------
+# YARDIMCILAR
+# -----------------------
+def _trailing(arr, n):
+    """out[i] = arr[i-n+1 .. i] toplamı (pencerede NaN varsa NaN); i < n-1 için NaN."""
+    out = np.full(len(arr), np.nan)
+    if n <= 0:
+        out[:] = 0.0
+    elif len(arr) >= n:
+        out[n - 1:] = sliding_window_view(arr, n).sum(axis=-1)
+    return out
+
+
+def _at(arr, idx):
+    """arr[idx]; sınır dışı indeksler için NaN."""
+    if len(arr) == 0:
+        return np.full(np.shape(idx), np.nan)
+    ok = (idx >= 0) & (idx < len(arr))
+    return np.where(ok, arr[np.clip(idx, 0, len(arr) - 1)], np.nan)
+
+
+def _day_keys(index):
+    """İndeksin İstanbul saatine göre gün anahtarları (int64)."""
+    if getattr(index, "tz", None) is not None:
+        index = index.tz_convert(SESSION_TZ).tz_localize(None)
+    return index.normalize().asi8
+
+
+def _rsi_from_sums(gain_sum, loss_sum, period):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = (gain_sum / period) / (loss_sum / period)
+        return 100 - (100 / (1 + rs))
+
+
+# -----------------------
+# GÜNLÜK KURALLAR (as-of)
+# -----------------------
+def daily_asof(df_day, df_4h, rsi_period=RSI_PERIOD, max_day_bars=None):
+    """Her 4H bar için günlük çerçeve kuralları: (g1, ma bayrakları [4 dizi]).
+
+    max_day_bars verilirse worker'ın DAY_PERIOD kırpması taklit edilir
+    (MA kesişimi için görünen günlük bar sayısı bu sınırı aşamaz).
+    """
+    C = df_day["Close"].to_numpy(dtype=float)
+    P = df_4h["Close"].to_numpy(dtype=float)
+    h_open = df_4h["Open"].to_numpy(dtype=float)
+    hkey = _day_keys(df_4h.index)
+    p = np.searchsorted(_day_keys(df_day.index), hkey, side="left")   # tamamlanmış gün sayısı
+    first = np.r_[True, hkey[1:] != hkey[:-1]] if len(hkey) else np.zeros(0, bool)
+    O = h_open[np.maximum.accumulate(np.where(first, np.arange(len(hkey)), 0))]
+    n_days = p + 1
+    if max_day_bars:
+        n_days = np.minimum(n_days, max_day_bars)
+
+    # Hareketli ortalamalar: şimdiki = (son n-1 tamamlanmış gün + kısmi kapanış) / n
+    ma_now, ma_prev = {}, {}
+    for n in (20, 50, 200):
+        ma_now[n] = (_at(_trailing(C, n - 1), p - 1) + P) / n
+        ma_prev[n] = _at(_trailing(C, n), p - 1) / n
+    ma_ok = n_days >= MA_MIN_DAYS
+    with np.errstate(invalid="ignore"):
+        ma_flags = (
+            ma_ok & (ma_prev[20] <= ma_prev[50]) & (ma_now[20] > ma_now[50]),
+            ma_ok & (ma_prev[20] >= ma_prev[50]) & (ma_now[20] < ma_now[50]),
+            ma_ok & (ma_prev[50] <= ma_prev[200]) & (ma_now[50] > ma_now[200]),
+            ma_ok & (ma_prev[50] >= ma_prev[200]) & (ma_now[50] < ma_now[200]),
+        )
+
+    # RSI: önceki = tamamlanmış günler, şimdiki = son period-1 değişim + kısmi değişim
+    delta = np.diff(C, prepend=np.nan)
+    gain = np.where(np.isnan(delta), np.nan, np.clip(delta, 0, None))
+    loss = np.where(np.isnan(delta), np.nan, -np.clip(delta, None, 0))
+    last_delta = P - _at(C, p - 1)
+    rsi_now = _rsi_from_sums(_at(_trailing(gain, rsi_period - 1), p - 1) + np.clip(last_delta, 0, None),
+                             _at(_trailing(loss, rsi_period - 1), p - 1) - np.clip(last_delta, None, 0),
+                             rsi_period)
+    rsi_prev = _rsi_from_sums(_at(_trailing(gain, rsi_period), p - 1),
+                              _at(_trailing(loss, rsi_period), p - 1), rsi_period)
+    with np.errstate(invalid="ignore"):
+        g1 = (p + 1 >= 2) & (P > O) & (p >= rsi_period + 1) & (rsi_now > rsi_prev)
+    return g1, ma_flags
+
+
+# -----------------------
+# DESTEK/DİRENÇ KIRILIMI (today_trend_break)
+# -----------------------
+def _full_extrema(y, order):
+    """Tam ±order komşuluğu seri içinde kalan kesin tepe noktaları (NaN karşılaştırması False)."""
+    n = len(y)
+    out = np.zeros(n, bool)
+    if n < 2 * order + 1:
+        return out
+    core = y[order:n - order]
+    m = np.ones(len(core), bool)
+    with np.errstate(invalid="ignore"):
+        for k in range(1, order + 1):
+            m &= (core > y[order - k:n - order - k]) & (core > y[order + k:n + k - order])
+    out[order:n - order] = m
+    return out
+
+
+def _edge_values(y, x, ts, s, order, left):
+    """Pencere kenarındaki (kırpılmış) tepe değerleri: (len(ts), order-1), tepe değilse NaN."""
+    a = np.arange(1, order)
+    b = np.concatenate([np.arange(-order, 0), np.arange(1, order + 1)])
+    center = (s[:, None] + a) if left else (ts[:, None] - a)
+    nb = center[:, :, None] + b
+    valid = (a[:, None] + b >= 0) if left else (b <= a[:, None])
+    with np.errstate(invalid="ignore"):
+        greater = y[center][:, :, None] > y[np.clip(nb, 0, len(y) - 1)]
+    is_ext = np.all(greater | ~valid[None], axis=-1)
+    return np.where(is_ext, x[center], np.nan)
+
+
+def trend_breaks(close, high, low, lookback=SR_LOOKBACK, order=SR_ORDER):
+    """Her bar için today_trend_break: (kod [+1 res_break, -1 sup_break, 0], seviye)."""
+    T = len(close)
+    code, level = np.zeros(T, np.int8), np.full(T, np.nan)
+    idx = np.arange(T)
+    s_all = np.maximum(0, idx - lookback + 1)
+    ts = idx[(idx - s_all + 1 >= 2 * order + 3) & (idx >= 1)]
+    if not len(ts):
+        return code, level
+    s = s_all[ts]
+    n_int = lookback - 2 * order   # tam pencerede onaylı iç nokta sayısı
+
+    def window_values(sign):
+        y = close * sign
+        flag = _full_extrema(y, order)
+        padded = np.concatenate([np.full(n_int - 1, np.nan), np.where(flag, close, np.nan)])
+        interior = sliding_window_view(padded, n_int)[ts - order]
+        # Kısa pencerelerde (s=0) iç aralığın altına taşan noktalar zaten tepe sayılmaz
+        return np.concatenate([interior, _edge_values(y, close, ts, s, order, True),
+                               _edge_values(y, close, ts, s, order, False)], axis=1)
+
+    cur = close[ts][:, None]
+    with np.errstate(invalid="ignore"):
+        tops = window_values(1)
+        above = tops > cur
+        count = above.sum(axis=1)
+        cand = np.where(above, tops, np.inf)
+        k = min(2, cand.shape[1] - 1)
+        nearest3 = np.sort(np.partition(cand, k, axis=1)[:, :k + 1], axis=1)
+        # resistances = en yakın 3 direnç (artan); today_trend_break resistances[-1]'i kullanır
+        last_res = nearest3[np.arange(len(ts)), np.clip(count, 1, k + 1) - 1]
+        bottoms = window_values(-1)
+        below = bottoms < cur
+        sup0 = np.where(below, bottoms, -np.inf).max(axis=1)
+
+        prev_close, hi, lo = close[ts - 1], high[ts], low[ts]
+        res_break = (count > 0) & (hi > last_res) & (prev_close <= last_res)
+        sup_break = ~res_break & below.any(axis=1) & (lo < sup0) & (prev_close >= sup0)
+    code[ts] = np.where(res_break, 1, np.where(sup_break, -1, 0))
+    level[ts] = np.where(res_break, last_res, np.where(sup_break, sup0, np.nan))
+    return code, level
+
+
+# -----------------------
+# SONUÇ
+# -----------------------
+class BacktestResult:
+    """(sembol x bar) sağa hizalı matrisler; son sütun her sembolün son barıdır."""
+
+    def __init__(self, symbols, times, close, arrays, flags, rules, horizons=HORIZONS):
+        self.symbols = list(symbols)
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        self.times = times          # int64 ns (NaT yerine iNaT)
+        self.close = close
+        self.arrays = arrays        # özellik matrisleri: "g1", "rsi4h", "trend", "strength", ...
+        self.flags = flags          # kural tetikleyicisi / ayrıntı grubu adı -> bool matris
+        self.trigger_names = [r.name for r in rules.triggers]
+        self.groups = [(r.name, r.direction) for r in rules.triggers] + list(DETAIL_GROUPS)
+        self.strengths = (None,) + rules.strength_names   # strength matrisi kodları
+        self.horizons = tuple(horizons)
+        self.forward = {}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for h in self.horizons:
+                fwd = np.full(close.shape, np.nan)
+                if close.shape[1] > h:
+                    fwd[:, :-h] = close[:, h:] / close[:, :-h] - 1
+                self.forward[h] = fwd
+
+    @property
+    def triggered(self):
+        return np.logical_or.reduce([self.flags[name] for name in self.trigger_names])
+
+    def last_bar(self, sym):
+        """Son barın analyze_symbol ile aynı biçimdeki alanları."""
+        i, a = self.index[sym], self.arrays
+        trend = None
+        if a["trend"][i, -1]:
+            trend = ("res_break" if a["trend"][i, -1] > 0 else "sup_break", float(a["trend_level"][i, -1]))
+        return {
+            "price": float(self.close[i, -1]),
+            "rsi4h": float(a["rsi4h"][i, -1]) if a["rsi4h_known"][i, -1] else None,
+            "ma_crosses": [label for label in MA_CROSS_LABELS if a[f"ma:{label}"][i, -1]],
+            "vol_spike": bool(a["vol_spike"][i, -1]),
+            "g1": bool(a["g1"][i, -1]), "g2": bool(a["g2"][i, -1]),
+            "trend": trend,
+            "strength": self.strengths[a["strength"][i, -1]],
+        }
+
+    def stats(self):
+        """Tetikleyici ve güç bazında ileri getiri özeti: [{key, horizon, n, mean, median, hit_rate}].
+
+        hit_rate yön düzeltmelidir: satış yönlü tetikleyicide getirinin negatif olması isabettir.
+        Yönü 0 olan (karışık) tetikleyicide hit_rate None'dır.
+        """
+        triggered = self.triggered
+        groups = [(name, self.flags[name], d) for name, d in self.groups]
+        groups += [(f"strength:{name or 'none'}", triggered & (self.arrays["strength"] == c),
+                    strength_direction(name)) for c, name in enumerate(self.strengths)]
+        rows = []
+        for key, mask, direction in groups:
+            for h in self.horizons:
+                r = self.forward[h][mask]
+                r = r[~np.isnan(r)]
+                rows.append({"key": key, "horizon": h, "n": int(len(r)),
+                             "mean": float(r.mean()) if len(r) else None,
+                             "median": float(np.median(r)) if len(r) else None,
+                             "hit_rate": float((r * direction > 0).mean()) if len(r) and direction else None})
+        return rows
+
+    def signals(self):
+        """Tetiklenen her (sembol, bar) için satır içeren DataFrame."""
+        rows_i, cols_i = np.nonzero(self.triggered)
+        names = self.trigger_names
+        flags = np.stack([self.flags[n][rows_i, cols_i] for n in names], axis=1)
+        out = pd.DataFrame({
+            "symbol": np.array(self.symbols, dtype=object)[rows_i],
+            "time": pd.to_datetime(self.times[rows_i, cols_i], utc=True),
+            "price": self.close[rows_i, cols_i],
+            "strength": [self.strengths[c] for c in self.arrays["strength"][rows_i, cols_i]],
+            "triggers": [",".join(n for n, f in zip(names, row) if f) for row in flags],
+        })
+        for h in self.horizons:
+            out[f"fwd_{h}"] = self.forward[h][rows_i, cols_i]
+        return out
+
+
+# -----------------------
+# MOTOR
+# -----------------------
+def run_backtest(frames_day, frames_4h, symbols=None, rules=None, rsi_period=RSI_PERIOD,
+                 sr_lookback=SR_LOOKBACK, sr_order=SR_ORDER, max_day_bars=None, horizons=HORIZONS):
+    """Tüm semboller ve tüm 4H barlar için kuralları değerlendirir; BacktestResult döndürür.
+
+    rules verilmezse worker'ın varsayılan rules.json'u kullanılır.
+    """
+    rules = rules or load_rules()
+    vol_factor = float(rules.params.get("vol_factor", 1.7))
+    symbols = [s for s in (symbols or list(frames_4h))
+               if s in frames_day and s in frames_4h and frames_4h[s] is not None and len(frames_4h[s])]
+    close, lengths = align_universe(frames_4h, symbols, "Close")
+    S, T = close.shape
+    arrays = {f"ma:{label}": np.zeros((S, T), bool) for label in MA_CROSS_LABELS}
+    arrays.update(g1=np.zeros((S, T), bool), g2=np.zeros((S, T), bool),
+                  vol_spike=np.zeros((S, T), bool), avg_vol=np.full((S, T), np.nan),
+                  last_vol=np.full((S, T), np.nan),
+                  rsi4h=np.full((S, T), np.nan), rsi4h_known=np.zeros((S, T), bool),
+                  trend=np.zeros((S, T), np.int8), trend_level=np.full((S, T), np.nan),
+                  strength=np.zeros((S, T), np.int8))
+    times = np.full((S, T), np.iinfo(np.int64).min, dtype=np.int64)
+
+    # 4H kuralları: sembol blokları halinde, bar döngüsü olmadan
+    for b0 in range(0, S, SYMBOL_BLOCK):
+        blk = slice(b0, min(S, b0 + SYMBOL_BLOCK))
+        syms = symbols[blk]
+        h_close = close[blk]
+        h_open, _ = align_universe(frames_4h, syms, "Open")
+        h_vol, _ = align_universe(frames_4h, syms, "Volume")
+        h_open, h_vol = _pad_to(h_open, T), _pad_to(h_vol, T)
+        seen = np.arange(T)[None, :] - (T - lengths[blk])[:, None] + 1   # t anında görülen bar sayısı
+
+        rsi4h = rsi(h_close, rsi_period)
+        known = seen >= rsi_period + 1
+        # Hacim: son bar hariç önceki 20 barın (NaN atlanarak) ortalaması
+        prev_vol = np.concatenate([np.full((len(syms), 1), np.nan), h_vol[:, :-1]], axis=1)
+        avg_vol = np.full(h_vol.shape, np.nan)
+        if T >= 20:
+            win = sliding_window_view(prev_vol, 20, axis=1)
+            counts = (~np.isnan(win)).sum(axis=-1)
+            sums = np.nansum(win, axis=-1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                avg_vol[:, 19:] = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+        ema20 = ema(h_close, 20)
+        green = h_close > h_open
+        green_prev = np.concatenate([np.zeros((len(syms), 1), bool), green[:, :-1]], axis=1)
+        with np.errstate(invalid="ignore"):
+            vol_spike = (seen >= 22) & (avg_vol > 0) & (h_vol > avg_vol * vol_factor)
+            g2 = (seen >= 2) & green & green_prev & known & ~(rsi4h > 60) & ~(h_close < ema20)
+        arrays["vol_spike"][blk], arrays["g2"][blk] = vol_spike, g2
+        # detect_volume_spike gibi: 22 bardan kısa seride hacim değerleri yok
+        arrays["last_vol"][blk] = np.where(seen >= 22, h_vol, np.nan)
+        arrays["avg_vol"][blk] = np.where(seen >= 22, avg_vol, np.nan)
+        arrays["rsi4h"][blk], arrays["rsi4h_known"][blk] = np.where(known, rsi4h, np.nan), known
+
+    # Günlük kurallar ve S/R kırılımı: sembol başına, zaman ekseninde vektörel
+    for i, sym in enumerate(symbols):
+        df_day, df_4h = frames_day[sym], frames_4h[sym]
+        n = lengths[i]
+        cols = slice(T - n, T)
+        times[i, cols] = df_4h.index.asi8
+        g1, ma_flags = daily_asof(df_day, df_4h, rsi_period, max_day_bars)
+        arrays["g1"][i, cols] = g1
+        for label, cross in zip(MA_CROSS_LABELS, ma_flags):
+            arrays[f"ma:{label}"][i, cols] = cross
+        code, level = trend_breaks(df_4h["Close"].to_numpy(dtype=float), df_4h["High"].to_numpy(dtype=float),
+                                   df_4h["Low"].to_numpy(dtype=float), sr_lookback, sr_order)
+        arrays["trend"][i, cols], arrays["trend_level"][i, cols] = code, level
+    flags = {f"ma:{label}": arrays[f"ma:{label}"] for label in MA_CROSS_LABELS}
+    flags["trend:res_break"], flags["trend:sup_break"] = arrays["trend"] > 0, arrays["trend"] < 0
+
+    # Tetikleyiciler ve güç: worker ile aynı derlenmiş kurallar, tüm matris tek geçişte
+    features = {name: arrays[key] for key, name in
+                [("g1", "g1"), ("g2", "g2"), ("vol_spike", "vol_spike"), ("last_vol", "last_vol"),
+                 ("avg_vol", "avg_vol"), ("rsi4h", "rsi4h"), ("rsi4h_known", "rsi4h_known")]}
+    features["res_break"], features["sup_break"] = flags["trend:res_break"], flags["trend:sup_break"]
+    features.update({name: arrays[f"ma:{label}"] for label, name in MA_FEATURES.items()})
+    features["price"] = close
+    with np.errstate(invalid="ignore", divide="ignore"):
+        features["vol_ratio"] = np.where(features["avg_vol"] > 0, features["last_vol"] / features["avg_vol"],
+                                         np.nan)
+    verdict = rules.evaluate(features)
+    flags.update(verdict.triggers)
+    arrays["strength"] = verdict.strength_code
+    return BacktestResult(symbols, times, close, arrays, flags, rules, horizons)
+
+
+def _pad_to(mat, width):
+    if mat.shape[1] == width:
+        return mat
+    out = np.full((mat.shape[0], width), np.nan)
+    out[:, width - mat.shape[1]:] = mat
+    return out
+
+
+# -----------------------
+# CANLI FONKSİYONLARLA KARŞILAŞTIRMA
+# -----------------------
+def verify_last_bar(frames_day, frames_4h, result, tol=1e-9):
+    """Son barı bot.py fonksiyonlarıyla karşılaştırır; uyuşmazlık listesi döndürür."""
+    # bot.py içe aktarılırken dosya/ağ yan etkisi olmasın
+    for key in ("BIST_SIGNAL_DB", "BIST_SIGNAL_INDEX", "BIST_BAR_CACHE", "BIST_INDICATOR_STATE"):
+        os.environ.setdefault(key, "")
+    os.environ.setdefault("BIST_DATA_PROVIDER", "fixture")
+    import bot
+
+    mismatches = []
+    for sym in result.symbols:
+        df_day, df_4h = frames_day[sym], frames_4h[sym]
+        rsi4h = bot.compute_rsi(df_4h["Close"])
+        ma_crosses = bot.detect_ma_crosses(df_day)
+        vol_spike = bot.detect_volume_spike(df_4h)[0]
+        g1, g2 = bot.is_yesil1_daily(df_day), bot.is_yesil2_4h(df_4h)
+        expected = {"price": float(df_4h["Close"].iloc[-1]), "rsi4h": rsi4h, "ma_crosses": ma_crosses,
+                    "vol_spike": bool(vol_spike), "g1": bool(g1), "g2": bool(g2),
+                    "trend": bot.today_trend_break(df_4h),
+                    "strength": bot.decide_strength(g1, g2, ma_crosses, vol_spike, rsi4h)}
+        got = result.last_bar(sym)
+        for key, exp in expected.items():
+            if not _same(exp, got[key], tol):
+                mismatches.append({"symbol": sym, "field": key, "expected": exp, "got": got[key]})
+    return mismatches
+
+
+def _same(a, b, tol):
+    if isinstance(a, float) and isinstance(b, float):
+        return (np.isnan(a) and np.isnan(b)) or abs(a - b) <= tol * max(1.0, abs(a))
+    if isinstance(a, tuple) and isinstance(b, tuple):
+        return len(a) == len(b) and all(_same(x, y, tol) for x, y in zip(a, b))
+    return a == b
+
+
+# -----------------------
+# VERİ (OFFLINE)
+# -----------------------
+def load_history(source="fixture", symbols=None, fixture_dir="fixtures", cache_path="bars.db",
+                 interval="1h"):
+    """{sembol: gün içi DataFrame}; ağ kullanılmaz."""
+    if source == "fixture":
+        from data_provider import FixtureProvider
+        if not symbols:
+            suffix = f"_{interval}.csv"
+            symbols = sorted(os.path.basename(p)[:-len(suffix)]
+                             for p in glob.glob(os.path.join(fixture_dir, f"*{suffix}")))
+        return FixtureProvider(fixture_dir).fetch_many(symbols, period="max", interval=interval)
+    if source == "cache":
+        from bar_cache import BarCache, rows_to_frame
+        cache = BarCache(cache_path)
+        frames = {}
+        for sym in symbols or cache.symbols(interval):
+            info = cache.series_info(sym, interval)
+            if info is None:
+                continue
+            df = rows_to_frame(cache.read_rows(sym, interval), tz=info[1])
+            if df is not None:
+                frames[sym] = df
+        return frames
+    raise ValueError(f"Bilinmeyen kaynak: {source}")
+
+
+def derive_universe(base_frames):
+    """Gün içi çerçevelerden worker ile aynı şekilde (frames_day, frames_4h) türetir."""
+    frames_day, frames_4h = {}, {}
+    for sym, df in base_frames.items():
+        derived = derive_frames(df)
+        if derived["4h"] is None or derived["1d"] is None:
+            continue
+        frames_day[sym], frames_4h[sym] = derived["1d"], derived["4h"]
+    return frames_day, frames_4h
+
+
+def format_stats(rows):
+    lines = [f"{'tetikleyici':<22} {'ufuk':>4} {'adet':>7} {'ort. %':>8} {'medyan %':>9} {'isabet %':>9}"]
+    for r in rows:
+        if not r["n"]:
+            continue
+        hit = "-" if r["hit_rate"] is None else f"{r['hit_rate'] * 100:.1f}"
+        lines.append(f"{r['key']:<22} {r['horizon']:>4} {r['n']:>7} {r['mean'] * 100:>8.2f} "
+                     f"{r['median'] * 100:>9.2f} {hit:>9}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Sinyal kurallarının vektörel geçmiş testi")
+    ap.add_argument("--source", choices=("fixture", "cache"), default="fixture")
+    ap.add_argument("--fixture-dir", default="fixtures")
+    ap.add_argument("--cache", default="bars.db")
+    ap.add_argument("--symbols", default="", help="virgülle ayrılmış; boşsa kaynaktaki tümü")
+    ap.add_argument("--interval", default="1h", help="günlük/4H'in türetileceği gün içi aralık")
+    ap.add_argument("--rules", default="", help="kural dosyası (varsayılan: rules.json)")
+    ap.add_argument("--max-day-bars", type=int, default=None,
+                    help="worker'ın günlük çerçeve kırpmasını taklit et (bar)")
+    ap.add_argument("--out", default="", help="tetiklenen barları CSV'ye yaz")
+    ap.add_argument("--no-verify", action="store_true", help="son bar karşılaştırmasını atla")
+    args = ap.parse_args()
+
+    symbols = [s.strip() for s in args.symbols.split(",") if s.strip()] or None
+    base = load_history(args.source, symbols, args.fixture_dir, args.cache, args.interval)
+    frames_day, frames_4h = derive_universe(base)
+    t0 = time.perf_counter()
+    result = run_backtest(frames_day, frames_4h, rules=load_rules(args.rules or None),
+                          max_day_bars=args.max_day_bars)
+    elapsed = time.perf_counter() - t0
+    bars = int(sum(len(frames_4h[s]) for s in result.symbols))
+    print(f"{len(result.symbols)} sembol, {bars} 4H bar: {elapsed:.2f} sn "
+          f"({int(result.triggered.sum())} tetiklenen bar)")
+    print(format_stats(result.stats()))
+    if args.out:
+        result.signals().to_csv(args.out, index=False)
+        print(f"Sinyaller yazıldı -> {args.out}")
+    if not args.no_verify:
+        mismatches = verify_last_bar(frames_day, frames_4h, result)
+        print("Son bar canlı fonksiyonlarla aynı." if not mismatches else
+              f"UYUŞMAZLIK ({len(mismatches)}): {mismatches[:5]}")
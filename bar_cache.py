@@ -0,0 +1,302 @@
+# bar_cache.py (KALICI OHLCV BAR ÖNBELLEĞİ)
+#
+# Sembol + interval başına barları SQLite'ta saklar. Soğuk başlangıçtan sonra
+# veri kaynağından yalnızca son kayıtlı bardan sonraki barlar istenir; son
+# (henüz kapanmamış) mum her seferinde yeniden yazılır.
+# Not: Bu modül pandas'ı yalnızca DataFrame dönüşümünde (tembel) içe aktarır,
+# böylece web süreci de barları hafifçe okuyabilir (readonly=True).
+
+import math
+import sqlite3
+import threading
+import time
+
+DEFAULT_MAX_AGE_DAYS = 400    # Serinin son barından bu kadar eski barlar silinir
+DEFAULT_MAX_BARS = 5000       # Seri başına tutulacak en fazla bar
+DEFAULT_IDLE_DAYS = 30        # Bu süre okunmayan seriler tamamen silinir
+EVICT_INTERVAL = 3600         # Temizlik en fazla saatte bir çalışır (saniye)
+
+# Sıcak güncellemelerde istenecek period (gün) kademeleri; benzer boşluktaki
+# semboller tek toplu istekte birleşir.
+GAP_BUCKETS = (2, 5, 10, 30, 60, 120)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (symbol, interval, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS series (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    tz TEXT NOT NULL DEFAULT '',
+    last_ts INTEGER NOT NULL,
+    last_access INTEGER NOT NULL,
+    PRIMARY KEY (symbol, interval)
+);
+"""
+
+
+class BarCache:
+    """SQLite tabanlı bar deposu; hit/miss sayaçları ve boyut/yaş temizliği içerir.
+
+    Yazma worker'da; web süreci readonly=True ile açar (okumalar last_access'i güncellemez).
+    """
+
+    def __init__(self, path="bars.db", max_age_days=DEFAULT_MAX_AGE_DAYS,
+                 max_bars=DEFAULT_MAX_BARS, idle_days=DEFAULT_IDLE_DAYS, readonly=False):
+        self.path = path
+        self.max_age_days = max_age_days
+        self.max_bars = max_bars
+        self.idle_days = idle_days
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        self.counters = {"hits": 0, "misses": 0, "bars_downloaded": 0, "bars_served": 0,
+                         "evicted_bars": 0, "evicted_series": 0}
+
+    # --- Okuma ---
+    def series_info(self, symbol, interval):
+        """(last_ts, tz) veya seri yoksa None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_ts, tz FROM series WHERE symbol=? AND interval=?",
+                (symbol, interval)).fetchone()
+        return row
+
+    def symbols(self, interval):
+        """Önbellekte bu interval için serisi olan semboller (alfabetik)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT symbol FROM series WHERE interval=? ORDER BY symbol", (interval,)).fetchall()
+        return [r[0] for r in rows]
+
+    def last_row(self, symbol, interval):
+        """(ilk ts, son ts, son kapanış, son hacim) veya seri boşsa None.
+
+        Oluşmakta olan son mum yeniden yazıldığında da değişir; okuyucular bunu
+        seri sürümü olarak kullanır.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT (SELECT MIN(ts) FROM bars WHERE symbol=? AND interval=?), ts, close, volume "
+                "FROM bars WHERE symbol=? AND interval=? ORDER BY ts DESC LIMIT 1",
+                (symbol, interval, symbol, interval)).fetchone()
+
+    def read_rows(self, symbol, interval, since_ts=None, until_ts=None):
+        """[(ts, open, high, low, close, volume), ...] artan zaman sırasında."""
+        q = "SELECT ts, open, high, low, close, volume FROM bars WHERE symbol=? AND interval=?"
+        args = [symbol, interval]
+        if since_ts is not None:
+            q += " AND ts >= ?"
+            args.append(int(since_ts))
+        if until_ts is not None:
+            q += " AND ts <= ?"
+            args.append(int(until_ts))
+        q += " ORDER BY ts"
+        with self._lock:
+            rows = self._conn.execute(q, args).fetchall()
+            if self.readonly:
+                return rows
+            self._conn.execute("UPDATE series SET last_access=? WHERE symbol=? AND interval=?",
+                               (int(time.time()), symbol, interval))
+            self._conn.commit()
+        return rows
+
+    # --- Yazma ---
+    def write_rows(self, symbol, interval, rows, tz=""):
+        """Barları ekler; aynı zamanlı bar (ör. oluşmakta olan son mum) üzerine yazılır."""
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO bars (symbol, interval, ts, open, high, low, close, volume) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(symbol, interval) + tuple(r) for r in rows])
+            self._conn.execute(
+                "INSERT INTO series (symbol, interval, tz, last_ts, last_access) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(symbol, interval) DO UPDATE SET "
+                "last_ts=MAX(last_ts, excluded.last_ts), tz=excluded.tz, last_access=excluded.last_access",
+                (symbol, interval, tz or "", int(rows[-1][0]), int(time.time())))
+            self._conn.commit()
+
+    # --- Temizlik ---
+    def evict(self, now=None):
+        """Yaş/boyut politikasını uygular; silinen bar sayısını döndürür."""
+        now = int(now or time.time())
+        removed = 0
+        with self._lock:
+            cur = self._conn.execute(
+                "SELECT symbol, interval FROM series WHERE last_access < ?",
+                (now - self.idle_days * 86400,))
+            idle = cur.fetchall()
+            for sym, interval in idle:
+                removed += self._conn.execute(
+                    "DELETE FROM bars WHERE symbol=? AND interval=?", (sym, interval)).rowcount
+                self._conn.execute("DELETE FROM series WHERE symbol=? AND interval=?", (sym, interval))
+            for sym, interval, last_ts in self._conn.execute(
+                    "SELECT symbol, interval, last_ts FROM series").fetchall():
+                removed += self._conn.execute(
+                    "DELETE FROM bars WHERE symbol=? AND interval=? AND ts < ?",
+                    (sym, interval, last_ts - self.max_age_days * 86400)).rowcount
+                removed += self._conn.execute(
+                    "DELETE FROM bars WHERE symbol=? AND interval=? AND ts <= ("
+                    "SELECT ts FROM bars WHERE symbol=? AND interval=? "
+                    "ORDER BY ts DESC LIMIT 1 OFFSET ?)",
+                    (sym, interval, sym, interval, self.max_bars)).rowcount
+            self._conn.commit()
+            self.counters["evicted_bars"] += removed
+            self.counters["evicted_series"] += len(idle)
+        return removed
+
+    def count(self, name, n=1):
+        """Sayaç artırımı (getirme thread'leri eşzamanlı çağırır)."""
+        with self._lock:
+            self.counters[name] += n
+
+    def stats(self):
+        with self._lock:
+            out = dict(self.counters)
+        total = out["hits"] + out["misses"]
+        out["hit_rate"] = round(out["hits"] / total, 4) if total else None
+        return out
+
+
+# -----------------------
+# DataFrame <-> satır dönüşümleri
+# -----------------------
+def frame_to_rows(df):
+    idx = df.index
+    tz = str(idx.tz) if getattr(idx, "tz", None) is not None else ""
+    # pandas 2+ indeksleri ns dışında bir birimde (ör. us) olabilir
+    ts = idx.as_unit("s").asi8 if hasattr(idx, "as_unit") else idx.asi8 // 10**9
+    cols = [df[c].to_numpy(dtype=float) if c in df.columns else [math.nan] * len(df)
+            for c in ("Open", "High", "Low", "Close", "Volume")]
+    return [(int(t), *(float(c[i]) for c in cols)) for i, t in enumerate(ts)], tz
+
+
+def rows_to_frame(rows, tz=""):
+    import pandas as pd
+    if not rows:
+        return None
+    ts, o, h, l, c, v = zip(*rows)
+    idx = pd.to_datetime(list(ts), unit="s", utc=True)
+    idx = idx.tz_convert(tz) if tz else idx.tz_localize(None)
+    return pd.DataFrame({"Open": o, "High": h, "Low": l, "Close": c, "Volume": v},
+                        index=idx.rename("Date"))
+
+
+# -----------------------
+# ÖNBELLEKLİ VERİ KAYNAĞI
+# -----------------------
+class CachedProvider:
+    """Bir DataProvider'ı BarCache ile sarar; sıcak sembollerde yalnızca yeni barları indirir.
+
+    fetch_many hattın getirme thread'lerinden eşzamanlı çağrılır: bellekteki
+    çerçeveler ve temizlik zamanı _lock ile, sayaçlar BarCache.count ile korunur.
+    İndirme (inner.fetch_many) kilit dışında yapılır.
+    """
+
+    def __init__(self, inner, cache):
+        self.inner = inner
+        self.cache = cache
+        self.name = f"cached:{inner.name}"
+        self._frames = {}  # (sym, interval) -> bellekteki DataFrame (yeniden parse etmemek için)
+        self._last_evict = 0.0
+        self._lock = threading.Lock()
+
+    def fetch(self, symbol, period="90d", interval="4h"):
+        return self.fetch_many([symbol], period=period, interval=interval).get(symbol)
+
+    def fetch_many(self, symbols, period="90d", interval="4h", **kwargs):
+        from data_provider import period_to_timedelta, trim_to_period
+
+        span = period_to_timedelta(period)
+        span_s = span.total_seconds() if span is not None else None
+        now = time.time()
+        with self._lock:
+            due = now - self._last_evict >= EVICT_INTERVAL
+            if due:
+                self._last_evict = now   # yalnızca bir thread temizler
+        if due:
+            self.evict()
+        cold, warm = [], {}
+        for sym in symbols:
+            info = self.cache.series_info(sym, interval)
+            gap_days = (now - info[0]) / 86400 if info else None
+            if info is None or (span_s is not None and gap_days * 86400 >= span_s):
+                cold.append(sym)
+                continue
+            bucket = next((b for b in GAP_BUCKETS if b >= gap_days + 1), None)
+            if bucket is None:
+                cold.append(sym)
+            else:
+                warm.setdefault(bucket, []).append(sym)
+
+        if cold:
+            self.cache.count("misses", len(cold))
+            self._store(self.inner.fetch_many(cold, period=period, interval=interval, **kwargs),
+                        interval, since=None)
+        for bucket, syms in warm.items():
+            self.cache.count("hits", len(syms))
+            self._store(self.inner.fetch_many(syms, period=f"{bucket}d", interval=interval, **kwargs),
+                        interval, since={s: self.cache.series_info(s, interval)[0] for s in syms})
+
+        out = {}
+        for sym in symbols:
+            df = self._frame(sym, interval)
+            if df is None:
+                continue
+            df = trim_to_period(df, period)
+            self.cache.count("bars_served", len(df))
+            out[sym] = df
+        return out
+
+    def _store(self, frames, interval, since):
+        import pandas as pd
+        for sym, df in frames.items():
+            rows, tz = frame_to_rows(df)
+            if since is not None:
+                # Yalnızca son kayıtlı bar (yeniden yazılır) ve sonrası
+                rows = [r for r in rows if r[0] >= since[sym]]
+            if not rows:
+                continue
+            self.cache.count("bars_downloaded", len(rows))
+            # Yazma ve bellekteki çerçevenin güncellenmesi tek adım: evict() araya giremez
+            with self._lock:
+                self.cache.write_rows(sym, interval, rows, tz=tz)
+                mem = self._frames.get((sym, interval))
+                if mem is None or since is None:
+                    self._frames.pop((sym, interval), None)  # tam okuma _frame'de yapılır
+                    continue
+                fresh = rows_to_frame(rows, tz)
+                mem = mem[mem.index < fresh.index[0]]
+                self._frames[(sym, interval)] = pd.concat([mem, fresh]).iloc[-self.cache.max_bars:]
+
+    def _frame(self, sym, interval):
+        with self._lock:
+            df = self._frames.get((sym, interval))
+            if df is None:
+                info = self.cache.series_info(sym, interval)
+                if info is None:
+                    return None
+                df = rows_to_frame(self.cache.read_rows(sym, interval), info[1])
+                if df is None:
+                    return None
+                self._frames[(sym, interval)] = df
+            return df
+
+    def evict(self):
+        with self._lock:
+            removed = self.cache.evict()
+            if removed:
+                self._frames.clear()
+        return removed
@@ -0,0 +1 @@
+# bench: ağ gerektirmeyen benchmark ve yük testi betikleri (python -m bench.<modül>)
@@ -0,0 +1,73 @@
+# bench/concurrency.py (EŞZAMANLILIK BENCHMARK'I)
+#
+# Yapay gecikmeli sahte veri kaynağıyla batch ve concurrent tarama modlarında
+# döngü süresini eşzamanlılık seviyesine göre ölçer. Ağ ve Telegram kullanılmaz.
+#
+#   python -m bench.concurrency --symbols 23 --latency 0.4 --jitter 0.2
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("BIST_BAR_CACHE", "")          # önbellek ölçümü bozmasın
+
+import bot
+from bench.synthetic import SyntheticProvider, synthetic_universe
+
+
+def run(symbols, latency, jitter, levels, hang_every=0):
+    frames = synthetic_universe(symbols, n_bars=8 * 130, seed=1)
+    bot.SYMBOLS = symbols
+    bot.send_telegram_message = lambda message: None
+    bot.update_status_file = lambda: None
+    rows = []
+
+    base = SyntheticProvider(frames, latency=latency, jitter=jitter)
+    bot.provider = base
+    bot.SCAN_MODE = "batch"
+    t0 = time.perf_counter()
+    bot.scan_cycle()
+    rows.append(("batch", 1, time.perf_counter() - t0, base.calls, 0))
+
+    for level in levels:
+        prov = SyntheticProvider(frames, latency=latency, jitter=jitter)
+        if hang_every:
+            # Her N. istek FETCH_DEADLINE'dan uzun sürer (askıda kalan indirme)
+            inner_fetch = prov.fetch_many
+
+            def fetch_many(syms, *a, _inner=inner_fetch, **kw):
+                if prov.calls % hang_every == hang_every - 1:
+                    time.sleep(bot.FETCH_DEADLINE * 2)
+                return _inner(syms, *a, **kw)
+            prov.fetch_many = fetch_many
+        bot.provider = bot.RateLimitedProvider(prov, bot.TokenBucket(bot.FETCH_RATE, bot.FETCH_BURST))
+        bot.SCAN_MODE = "concurrent"
+        bot.SCAN_CONCURRENCY = level
+        t0 = time.perf_counter()
+        bot.scan_cycle()
+        stale = sum(1 for e in bot.latest_state["errors"] if "zaman" in e["error"])
+        rows.append(("concurrent", level, time.perf_counter() - t0, prov.calls, stale))
+    return rows
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--symbols", type=int, default=23)
+    ap.add_argument("--latency", type=float, default=0.4, help="istek başına gecikme (sn)")
+    ap.add_argument("--jitter", type=float, default=0.2)
+    ap.add_argument("--levels", default="1,2,4,8,16")
+    ap.add_argument("--rate", type=float, default=None, help="token-bucket istek/sn")
+    ap.add_argument("--deadline", type=float, default=None, help="getirme grubu başına süre sınırı (sn)")
+    ap.add_argument("--hang-every", type=int, default=0, help="her N. isteği askıda bırak")
+    args = ap.parse_args()
+
+    if args.rate is not None:
+        bot.FETCH_RATE = args.rate
+        bot.FETCH_BURST = max(1, int(args.rate))
+    if args.deadline is not None:
+        bot.FETCH_DEADLINE = args.deadline
+    symbols = [f"SYN{i:04d}.IS" for i in range(args.symbols)]
+    levels = [int(x) for x in args.levels.split(",")]
+    print(f"{'mod':<11} {'eşzamanlılık':>12} {'döngü (sn)':>11} {'istek':>6} {'stale':>6}")
+    for mode, level, secs, calls, stale in run(symbols, args.latency, args.jitter, levels, args.hang_every):
+        print(f"{mode:<11} {level:>12} {secs:>11.2f} {calls:>6} {stale:>6}")
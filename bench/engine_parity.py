@@ -0,0 +1,134 @@
+# bench/engine_parity.py (GÖSTERGE MOTORLARI EŞLİK KONTROLÜ)
+#
+# Sentetik saatlik geçmişi bar bar yeniden oynatır. Her adımda worker gibi
+# kırpılmış günlük/4H çerçeveler kurulur (bot.load_frames: BASE_PERIOD indirme,
+# seans hizalı türetme, DAY_PERIOD/H4_PERIOD kırpma) ve skaler, vektörel
+# (indicators.compute_universe) ve artımlı (incremental.IndicatorBank) motorların
+# sembol özetleri karşılaştırılır; destek/direnç için support_resistance ile
+# artımlı sr_levels.SRBank her (lookback, order) ayarında eşlenir. Artımlı durum adımlar arasında korunur: oluşan
+# bar revise, yeni bar append ile işlenir; pencere de her adımda kayar. Replay
+# öncesinde artımlı durum kırpılmamış tüm geçmişle ısıtılır (uzun süredir çalışan
+# ya da checkpoint'ten dönen worker gibi): durum çerçeveden uzun bir geçmiş taşır.
+# Herhangi bir farkta çıkış kodu 1'dir. Ağ ve Telegram kullanılmaz.
+#
+#   python -m bench.engine_parity --symbols 8 --bars 3200 --steps 480 --day-periods 120d,400d
+
+import argparse
+import math
+import os
+import sys
+import time
+
+os.environ.setdefault("BIST_BAR_CACHE", "")
+
+import bot
+from bench.synthetic import synthetic_symbol
+from data_provider import trim_to_period
+from incremental import IndicatorBank
+from sr_levels import SRBank
+from indicators import compute_universe
+from resample import derive_frames
+
+FIELDS = ("rsi4h", "ma_crosses", "vol_spike", "avg_vol", "g1", "g2")
+SR_SETTINGS = [(bot.SR_LOOKBACK, bot.SR_ORDER)] + bot.SR_EXTRA_SETTINGS
+
+
+def frames_at(df, end, day_period, h4_period):
+    """Worker'ın end'inci saatlik bar anında gördüğü (günlük, 4H) çerçeveler."""
+    derived = derive_frames(trim_to_period(df.iloc[:end], day_period))
+    return trim_to_period(derived["1d"], day_period), trim_to_period(derived["4h"], h4_period)
+
+
+def features(df_day, df_4h, st_day=None, st_4h=None):
+    """Skaler (state=None) ya da artımlı motorla sembol özeti."""
+    spike, _, avg = bot.detect_volume_spike(df_4h, state=st_4h)
+    return {"rsi4h": bot.compute_rsi(df_4h["Close"], state=st_4h),
+            "ma_crosses": bot.detect_ma_crosses(df_day, state=st_day),
+            "vol_spike": bool(spike), "avg_vol": avg,
+            "g1": bool(bot.is_yesil1_daily(df_day, state=st_day)),
+            "g2": bool(bot.is_yesil2_4h(df_4h, state=st_4h))}
+
+
+def same(a, b, tol=1e-6):
+    if isinstance(a, float) or isinstance(b, float):
+        if a is None or b is None:
+            return a is None and b is None
+        if a != a or b != b:
+            return a != a and b != b
+        return math.isclose(a, b, rel_tol=tol, abs_tol=tol)
+    return a == b
+
+
+def replay(n_symbols, n_bars, steps, seed, day_period, h4_period):
+    """{"checks", "diffs": {alan: n}, "examples", "ma_crosses"} döndürür."""
+    symbols = [f"SYN{i:03d}.IS" for i in range(n_symbols)]
+    data = {s: synthetic_symbol(i, n_bars, seed) for i, s in enumerate(symbols)}
+    bank = IndicatorBank(rsi_period=bot.RSI_PERIOD)
+    sr_bank = SRBank(SR_SETTINGS)
+    sr_fields = [f"sr {lb}/{od}" for lb, od in SR_SETTINGS]
+    diffs, examples = {f: 0 for f in FIELDS + tuple(sr_fields)}, []
+    checks = crosses = 0
+    start = n_bars - steps
+    for sym in symbols:
+        derived = derive_frames(data[sym].iloc[:start])
+        bank.sync_frame(sym, "1d", derived["1d"])
+        bank.sync_frame(sym, "4h", derived["4h"])
+        sr_bank.sync_frame(sym, "4h", derived["4h"])
+    for end in range(n_bars - steps + 1, n_bars + 1):
+        frames = {s: frames_at(data[s], end, day_period, h4_period) for s in symbols}
+        ind = compute_universe({s: f[0] for s, f in frames.items()}, {s: f[1] for s, f in frames.items()},
+                               symbols, rsi_period=bot.RSI_PERIOD, vol_factor=bot.VOL_FACTOR)
+        for sym, (df_day, df_4h) in frames.items():
+            bank.sync_frame(sym, "1d", df_day)
+            bank.sync_frame(sym, "4h", df_4h)
+            scalar = features(df_day, df_4h)
+            incr = features(df_day, df_4h, bank.get(sym, "1d"), bank.get(sym, "4h"))
+            vec = {f: ind.row(sym)[f] for f in FIELDS}
+            crosses += bool(scalar["ma_crosses"])
+            checks += 1
+            for f in FIELDS:
+                if not (same(scalar[f], incr[f]) and same(scalar[f], vec[f])):
+                    diffs[f] += 1
+                    if len(examples) < 10:
+                        examples.append((sym, end, f, scalar[f], vec[f], incr[f]))
+            # S/R'nin vektörel karşılığı yok: skaler ile artımlı karşılaştırılır
+            sr_bank.sync_frame(sym, "4h", df_4h)
+            for f, (lb, od) in zip(sr_fields, SR_SETTINGS):
+                s_lv = bot.support_resistance(df_4h, lookback=lb, order=od)
+                i_lv = sr_bank.index(sym, "4h", lb, od).nearest()
+                if [list(x) for x in s_lv] != [list(x) for x in i_lv]:
+                    diffs[f] += 1
+                    if len(examples) < 10:
+                        examples.append((sym, end, f, s_lv, None, i_lv))
+    return {"checks": checks, "diffs": diffs, "examples": examples, "ma_crosses": crosses}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--symbols", type=int, default=8)
+    ap.add_argument("--bars", type=int, default=3200, help="sembol başına saatlik bar")
+    ap.add_argument("--steps", type=int, default=480, help="yeniden oynatılan son saatlik bar sayısı")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--day-periods", default=f"{bot.DAY_PERIOD},400d",
+                    help="denenecek DAY_PERIOD değerleri (uzun pencere MA200 kesişimlerini de sınar)")
+    ap.add_argument("--h4-period", default=bot.H4_PERIOD)
+    args = ap.parse_args()
+
+    failed = False
+    for day_period in [p.strip() for p in args.day_periods.split(",") if p.strip()]:
+        t0 = time.perf_counter()
+        res = replay(args.symbols, args.bars, args.steps, args.seed, day_period, args.h4_period)
+        total = sum(res["diffs"].values())
+        print(f"DAY_PERIOD={day_period}: {res['checks']} sembol-adım, {res['ma_crosses']} MA kesişimi, "
+              f"{total} fark ({time.perf_counter() - t0:.1f} sn)")
+        for f, n in res["diffs"].items():
+            if n:
+                print(f"  {f}: {n}")
+        for sym, end, f, s, v, i in res["examples"]:
+            print(f"  {sym} bar {end} {f}: skaler={s!r} vektörel={v!r} artımlı={i!r}")
+        failed |= total > 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+# bench/hotpaths.py (TARAYICI SICAK YOL BENCHMARK SÜİTİ)
+#
+# Tohumlu sentetik OHLCV verisiyle (ağ yok) tarayıcının sıcak yollarını ölçer:
+#   function  sembol başına fonksiyonlar (compute_rsi, support_resistance,
+#             detect_ma_crosses, detect_volume_spike, is_yesil1_daily/is_yesil2_4h,
+#             today_trend_break, summarize_symbol, derive_frames)
+#   universe  evren boyutunda vektörel adımlar (compute_universe, evaluate_rules)
+#   cycle     tam scan_cycle (soğuk ve ılık); indir -> göstergeler -> kurallar -> yayın
+# Her (evren boyutu, geçmiş uzunluğu) ayrı bir Python sürecinde çalışır: durum
+# paylaşılmaz ve süreç tepe RSS'i o duruma aittir. Süreler tekrarların en iyisi
+# ve medyanıdır; bellek tracemalloc ile ayrı bir geçişte ölçülür (tepe, kalıcı
+# bayt ve kalıcı blok sayısı). Sonuçlar JSON'dur; iki çalıştırma karşılaştırılıp
+# eşiği aşan yavaşlama/bellek artışı işaretlenir (çıkış kodu 1).
+#
+#   python -m bench.hotpaths --sizes 23,500,5000 --days 130 --out bench_base.json
+#   python -m bench.hotpaths --sizes 23,500 --compare bench_base.json --out bench_new.json
+#   python -m bench.hotpaths --compare bench_base.json --results bench_new.json
+
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA_VERSION = 1
+BARS_PER_DAY = 8                 # saatlik seans barı
+DEFAULT_THRESHOLD = 0.10         # süre: %10'dan fazla yavaşlama işaretlenir
+DEFAULT_MEM_THRESHOLD = 0.25     # bellek: tepe %25'ten fazla artarsa işaretlenir
+MEM_NOISE_KB = 64                # bundan küçük bellek farkları yok sayılır
+
+# Sembol başına fonksiyonlar: (bot, sembol, saatlik, günlük, 4H) -> çağrı
+FUNCTIONS = {
+    "derive_frames": lambda bot, sym, base, day, h4: bot.derive_frames(base),
+    "compute_rsi": lambda bot, sym, base, day, h4: bot.compute_rsi(h4["Close"]),
+    "support_resistance": lambda bot, sym, base, day, h4: bot.support_resistance(h4),
+    "detect_ma_crosses": lambda bot, sym, base, day, h4: bot.detect_ma_crosses(day),
+    "detect_volume_spike": lambda bot, sym, base, day, h4: bot.detect_volume_spike(h4),
+    "is_yesil1_daily": lambda bot, sym, base, day, h4: bot.is_yesil1_daily(day),
+    "is_yesil2_4h": lambda bot, sym, base, day, h4: bot.is_yesil2_4h(h4),
+    "today_trend_break": lambda bot, sym, base, day, h4: bot.today_trend_break(h4),
+    "summarize_symbol": lambda bot, sym, base, day, h4: bot.summarize_symbol(sym, day, h4),
+}
+
+
+# -----------------------
+# ÖLÇÜM
+# -----------------------
+def timed(fn, repeat):
+    """(en iyi, medyan) süre (sn)."""
+    times = []
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), statistics.median(times)
+
+
+def traced(fn):
+    """tracemalloc altında bir kez çalıştırır: (tepe KB, kalıcı KB, kalıcı blok)."""
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    try:
+        fn()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    gc.collect()
+    return round(peak / 1024, 1), round(current / 1024, 1), sys.getallocatedblocks() - blocks
+
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+# -----------------------
+# TEK DURUM (alt süreç)
+# -----------------------
+def run_case(size, days, seed=1, repeat=3, max_calls=200, cycle_memory_max=500):
+    """Bir (evren boyutu, gün) durumunu ölçer; sonuç satırları listesi."""
+    tmp = tempfile.mkdtemp(prefix="bist-bench-")
+    # Yerel durum dosyalarına, ağa ve Telegram'a dokunulmaz
+    os.environ.update(BIST_BAR_CACHE="", BIST_SIGNAL_DB="", BIST_SIGNAL_INDEX="", BIST_INDICATOR_STATE="",
+                      BIST_DATA_PROVIDER="fixture", BIST_PROFILE_TRIGGER="", BIST_SHARD_ID="",
+                      BIST_STATE_SNAPSHOT=os.path.join(tmp, "state.snap"))
+    sys.path.insert(0, ROOT)
+    import bot
+    from bench.synthetic import GeneratedProvider, synthetic_symbol
+    from sr_levels import SRBank
+
+    bot.send_telegram_message = lambda message: None
+    n_bars = days * BARS_PER_DAY
+    symbols = [f"SYN{i:04d}.IS" for i in range(size)]
+    rows = []
+
+    def record(name, kind, calls, fn, memory=True, repeat=repeat):
+        best, median = timed(fn, repeat)
+        row = {"name": name, "kind": kind, "symbols": size, "days": days, "calls": calls,
+               "best_s": round(best, 6), "median_s": round(median, 6),
+               "per_call_us": round(best / calls * 1e6, 2), "throughput": round(calls / best, 1)}
+        if memory:
+            row["peak_kb"], row["retained_kb"], row["retained_blocks"] = traced(fn)
+        rows.append(row)
+        print(f"  {name:<22} {size:>5}x{days:<4} {row['per_call_us']:>12.1f} us/çağrı "
+              f"{row['throughput']:>12.1f}/sn", file=sys.stderr)
+        return row
+
+    # Sembol başına fonksiyonlar: ilk max_calls sembol (girdiler ölçüm dışında hazırlanır)
+    sample = []
+    for i, sym in enumerate(symbols[:max_calls]):
+        base = synthetic_symbol(i, n_bars, seed)
+        frames = bot.derive_frames(base)
+        sample.append((sym, base, frames["1d"], frames["4h"]))
+    for name, call in FUNCTIONS.items():
+        record(name, "function", len(sample),
+               lambda call=call: [call(bot, sym, base, day, h4) for sym, base, day, h4 in sample])
+    del sample
+
+    # Evren boyutunda vektörel adımlar
+    frames_day, frames_4h = {}, {}
+    for i, sym in enumerate(symbols):
+        frames = bot.derive_frames(synthetic_symbol(i, n_bars, seed))
+        frames_day[sym], frames_4h[sym] = frames["1d"], frames["4h"]
+    ind = bot.compute_universe(frames_day, frames_4h, symbols, rsi_period=bot.RSI_PERIOD,
+                               vol_factor=bot.VOL_FACTOR)
+    record("compute_universe", "universe", size,
+           lambda: bot.compute_universe(frames_day, frames_4h, symbols, rsi_period=bot.RSI_PERIOD,
+                                        vol_factor=bot.VOL_FACTOR))
+    feature_rows = [bot.summarize_symbol(sym, frames_day[sym], frames_4h[sym], ind)[1] for sym in symbols]
+    record("evaluate_rules", "universe", size, lambda: bot.evaluate_rules(feature_rows))
+    del frames_day, frames_4h, ind, feature_rows
+    gc.collect()
+
+    # Tam tarama döngüsü: soğuk (boş S/R indeksi ve durum) ve ılık (tekrar)
+    bot.SYMBOLS = symbols
+    bot.provider = GeneratedProvider(symbols, n_bars, seed)
+    bot.CHECK_INTERVAL = max(bot.CHECK_INTERVAL, 3600)   # büyük evren döngü süresine takılmasın
+    bot.sr_bank = SRBank([(bot.SR_LOOKBACK, bot.SR_ORDER)] + bot.SR_EXTRA_SETTINGS)
+    bot.latest_state["per_symbol"] = {}
+    record("scan_cycle_cold", "cycle", size, bot.scan_cycle, memory=False, repeat=1)
+    # Büyük evrende döngü dakikalar sürer: tek ılık tekrar ve tracemalloc'suz (yalnızca RSS)
+    small = size <= cycle_memory_max
+    record("scan_cycle", "cycle", size, bot.scan_cycle, memory=small, repeat=repeat if small else 1)
+    return rows, {"symbols": size, "days": days, "peak_rss_mb": peak_rss_mb()}
+
+
+# -----------------------
+# KARŞILAŞTIRMA
+# -----------------------
+def _key(row):
+    return row["name"], row["symbols"], row["days"]
+
+
+def compare(old, new, threshold=DEFAULT_THRESHOLD, mem_threshold=DEFAULT_MEM_THRESHOLD):
+    """İki sonuç belgesini karşılaştırır; [(satır metni, işaretli mi)] döndürür."""
+    baseline = {_key(r): r for r in old["results"]}
+    lines = []
+    for row in new["results"]:
+        prev = baseline.get(_key(row))
+        if prev is None:
+            continue
+        ratio = row["best_s"] / prev["best_s"] if prev["best_s"] else 1.0
+        flags = []
+        if ratio > 1 + threshold:
+            flags.append("YAVAŞ")
+        mem = ""
+        if row.get("peak_kb") is not None and prev.get("peak_kb"):
+            mem_ratio = row["peak_kb"] / prev["peak_kb"]
+            mem = f"{mem_ratio:>6.2f}x"
+            if mem_ratio > 1 + mem_threshold and row["peak_kb"] - prev["peak_kb"] > MEM_NOISE_KB:
+                flags.append("BELLEK")
+        lines.append((f"{row['name']:<22} {row['symbols']:>5}x{row['days']:<4} "
+                      f"{prev['per_call_us']:>11.1f} {row['per_call_us']:>11.1f} {ratio:>6.2f}x {mem:>7} "
+                      f"{' '.join(flags)}", bool(flags)))
+    return lines
+
+
+def print_compare(old, new, threshold, mem_threshold):
+    lines = compare(old, new, threshold, mem_threshold)
+    print(f"\n{'karşılaştırma':<22} {'durum':>10} {'önce us':>11} {'sonra us':>11} {'süre':>7} {'bellek':>7}")
+    for text, _ in lines:
+        print(text)
+    flagged = sum(1 for _, bad in lines if bad)
+    print(f"{len(lines)} ölçüm karşılaştırıldı, {flagged} işaretli "
+          f"(süre eşiği %{threshold * 100:.0f}, bellek eşiği %{mem_threshold * 100:.0f}).")
+    return flagged
+
+
+# -----------------------
+# ANA SÜREÇ
+# -----------------------
+def meta(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    import numpy
+    import pandas
+    return {"created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "commit": commit,
+            "python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count(), "numpy": numpy.__version__, "pandas": pandas.__version__,
+            "seed": args.seed, "repeat": args.repeat, "max_calls": args.max_calls}
+
+
+def run_all(args):
+    doc = {"schema": SCHEMA_VERSION, "meta": meta(args), "cases": [], "results": []}
+    for size in [int(x) for x in args.sizes.split(",")]:
+        for days in [int(x) for x in args.days.split(",")]:
+            print(f"{size} sembol x {days} gün ...", file=sys.stderr)
+            t0 = time.perf_counter()
+            cmd = [sys.executable, "-m", "bench.hotpaths", "--case", f"{size}:{days}",
+                   "--seed", str(args.seed), "--repeat", str(args.repeat),
+                   "--max-calls", str(args.max_calls), "--cycle-memory-max", str(args.cycle_memory_max)]
+            out = subprocess.run(cmd, cwd=ROOT, stdout=subprocess.PIPE, text=True, check=True)
+            case = json.loads(out.stdout.strip().splitlines()[-1])
+            case["info"]["seconds"] = round(time.perf_counter() - t0, 1)
+            doc["cases"].append(case["info"])
+            doc["results"].extend(case["results"])
+    return doc
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="23,500,5000", help="evren boyutları")
+    ap.add_argument("--days", default="130", help="geçmiş uzunlukları (işlem günü)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--max-calls", type=int, default=200, help="sembol başına fonksiyonlarda örnek sembol sayısı")
+    ap.add_argument("--cycle-memory-max", type=int, default=500,
+                    help="döngünün tekrarlanıp tracemalloc ile ölçüleceği en büyük evren")
+    ap.add_argument("--out", default=None, help="sonuç JSON dosyası")
+    ap.add_argument("--results", default=None, help="çalıştırmadan bu sonuç dosyasını kullan")
+    ap.add_argument("--compare", default=None, help="karşılaştırılacak önceki sonuç dosyası")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    ap.add_argument("--mem-threshold", type=float, default=DEFAULT_MEM_THRESHOLD)
+    ap.add_argument("--case", default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.case:
+        size, days = (int(x) for x in args.case.split(":"))
+        rows, info = run_case(size, days, args.seed, args.repeat, args.max_calls, args.cycle_memory_max)
+        print(json.dumps({"info": info, "results": rows}))
+        return 0
+
+    if args.results:
+        with open(args.results, encoding="utf-8") as f:
+            doc = json.load(f)
+    else:
+        doc = run_all(args)
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(doc, f, indent=1, ensure_ascii=False)
+            print(f"Sonuçlar yazıldı: {args.out}")
+
+    print(f"\n{'ölçüm':<22} {'durum':>10} {'us/çağrı':>11} {'çağrı/sn':>11} {'tepe KB':>10} {'kalıcı KB':>10}")
+    for row in doc["results"]:
+        print(f"{row['name']:<22} {row['symbols']:>5}x{row['days']:<4} {row['per_call_us']:>11.1f} "
+              f"{row['throughput']:>11.1f} {row.get('peak_kb', '-'):>10} {row.get('retained_kb', '-'):>10}")
+    for case in doc["cases"]:
+        print(f"{case['symbols']} sembol x {case['days']} gün: tepe RSS {case['peak_rss_mb']} MB"
+              + (f", {case['seconds']} sn" if "seconds" in case else ""))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        if print_compare(old, doc, args.threshold, args.mem_threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
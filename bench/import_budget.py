@@ -0,0 +1,98 @@
+# bench/import_budget.py (WEB SÜRECİ İÇE AKTARMA BÜTÇESİ)
+#
+# dashboard_web'i her seferinde temiz bir Python sürecinde içe aktarır ve
+#   - analiz yığınının (bot, pandas, NumPy, yfinance, SciPy...) yüklenmediğini,
+#   - içe aktarma süresinin (medyan) bütçe içinde kaldığını,
+#   - sürecin en yüksek RSS'inin bütçe içinde kaldığını
+# denetler. Bütçe aşılırsa ya da yasak modül yüklenirse çıkış kodu 1'dir. Yasak
+# modül denetimi tests/test_import_budget.py'da da test olarak çalışır.
+# --detail ile -X importtime çıktısından en pahalı modüller listelenir.
+#
+#   python -m bench.import_budget --runs 5 --budget-ms 800 --rss-mb 80
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Web sürecinde bulunmaması gereken (ağır ya da worker'a ait) modüller
+FORBIDDEN = ("bot", "pandas", "numpy", "scipy", "yfinance", "signal_rules", "indicators",
+             "incremental", "sr_levels", "resample", "data_provider", "backtest")
+DEFAULT_BUDGET_MS = 800
+DEFAULT_RSS_MB = 80
+
+PROBE = r"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss //= 1024
+print(json.dumps({{"ms": elapsed * 1000, "rss_kb": rss,
+                   "loaded": sorted(m for m in {forbidden!r} if m in sys.modules)}}))
+"""
+
+
+def probe(module, env):
+    """Temiz süreçte modülü içe aktarır: {"ms", "rss_kb", "loaded"}."""
+    code = PROBE.format(module=module, forbidden=FORBIDDEN)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True,
+                         capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def import_detail(module, env, top=15):
+    """-X importtime çıktısından kümülatif süresi en yüksek modüller: [(ms, modül)]."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                         env=env, capture_output=True, text=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]) / 1000, parts[2].strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--module", default="dashboard_web")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--budget-ms", type=float,
+                    default=float(os.environ.get("BIST_IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS)))
+    ap.add_argument("--rss-mb", type=float, default=float(os.environ.get("BIST_IMPORT_RSS_MB", DEFAULT_RSS_MB)))
+    ap.add_argument("--detail", action="store_true", help="en pahalı içe aktarmaları listele")
+    args = ap.parse_args()
+
+    # Ortam web süreciyle aynı olsun ama yerel durum dosyalarına dokunulmasın
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    probe(args.module, env)     # ısınma: .pyc ve disk önbelleği
+    results = [probe(args.module, env) for _ in range(max(1, args.runs))]
+    ms = statistics.median(r["ms"] for r in results)
+    rss_mb = max(r["rss_kb"] for r in results) / 1024
+    loaded = sorted({m for r in results for m in r["loaded"]})
+
+    print(f"{args.module}: içe aktarma medyan {ms:.0f} ms (bütçe {args.budget_ms:.0f}), "
+          f"RSS {rss_mb:.1f} MB (bütçe {args.rss_mb:.0f})")
+    if args.detail:
+        for cost, name in import_detail(args.module, env):
+            print(f"  {cost:8.1f} ms  {name}")
+
+    failures = []
+    if loaded:
+        failures.append(f"yasak modüller yüklendi: {', '.join(loaded)}")
+    if ms > args.budget_ms:
+        failures.append(f"içe aktarma süresi bütçeyi aşıyor ({ms:.0f} > {args.budget_ms:.0f} ms)")
+    if rss_mb > args.rss_mb:
+        failures.append(f"RSS bütçeyi aşıyor ({rss_mb:.1f} > {args.rss_mb:.0f} MB)")
+    for msg in failures:
+        print(f"HATA: {msg}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,586 @@
+# bench/replay.py (OFFLINE PİYASA TEKRARI: UÇTAN UCA YÜK VE GECİKME TESTİ)
+#
+# Kayıtlı (fixture CSV'leri, bar önbelleği) ya da sentetik saatlik barları sanal
+# bir saatle scanner_loop'a besler; --speed 6000 ile bir haftalık 4H bar yaklaşık
+# bir dakikada oynar. Worker gerçek zamanlayıcısı, aşamalı taraması ve
+# TelegramDispatcher'ıyla çalışır; yalnızca saati sanal, veri kaynağı replay'dir
+# (sanal "şimdi"den sonra kapanan barlar görünmez). Ağa çıkılmaz:
+#   - Telegram çağrıları yerel stub sunucuya gider (bench/telegram_stub.py)
+#   - web süreci gunicorn ile ayrı süreçte aynı anlık görüntüyü yayınlar ve
+#     --clients kadar simüle istemci /stream'i (ayrı bir süreçte) tüketir
+# Rapor gerçek saniye cinsindendir:
+#   - 4H bar kapanışı -> Telegram ve -> dashboard (SSE) gecikme yüzdelikleri
+#   - döngü süreleri ve CHECK_INTERVAL aşımları
+#   - worker ve web süreçlerinin RSS'inin replay boyunca büyümesi
+# Sanal saat yalnızca worker beklerken hızlıdır; taramalar gerçek sürede akar. Canlıda
+# bar gecikmelerine BAR_CLOSE_DELAY eklenir; replay'de bu bekleme de sıkıştırılır.
+#
+#   python -m bench.replay --symbols 100 --days 5 --speed 6000 --clients 20
+#   python -m bench.replay --source fixture --fixture-dir fixtures --days 3 --speed 2000
+#   python -m bench.replay --source cache --bar-cache bars.db --json replay.json
+
+import argparse
+import bisect
+import json
+import os
+import re
+import resource
+import selectors
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from bench.telegram_stub import TelegramStub
+from bench.webhook_latency import pct, start_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BARS_PER_DAY = 8
+WARMUP_DAYS = 130          # sentetik kaynakta replay öncesi geçmiş (işlem günü)
+BAR_SECONDS = 3600         # replay kaynağı saatlik barlardır
+SAMPLE_INTERVAL = 0.5      # bellek örnekleme aralığı (gerçek sn)
+MESSAGE_RE = re.compile(r"CANLI SİNYAL: ([^<\s]+)</b>.*?Fiyat: ([\d.]+)", re.S)
+
+
+# -----------------------
+# SANAL SAAT
+# -----------------------
+class ReplayClock:
+    """Sanal saat (epoch sn): worker beklerken speed katı hızla, çalışırken gerçek hızda akar.
+
+    Böylece döngü süreleri, zamanlayıcı kararları ve gecikmeler canlıdaki gibi
+    kalır; yalnızca taramalar arasındaki boşluk sıkıştırılır.
+    """
+
+    def __init__(self, start, speed):
+        self.speed = float(speed)
+        now = time.time()
+        self.offset = float(start) - now      # beklemeler dışında sanal = gerçek + offset
+        self.points = [(now, float(start))]   # (gerçek, sanal) kırılma noktaları
+        self._sleeping = None
+
+    def time(self):
+        now, sleeping = time.time(), self._sleeping
+        if sleeping is not None:
+            return sleeping[1] + (now - sleeping[0]) * self.speed
+        return now + self.offset
+
+    def sleep(self, seconds):
+        start = time.time()
+        virtual = start + self.offset
+        self._sleeping = (start, virtual)
+        self.points.append((start, virtual))
+        time.sleep(max(0.0, seconds) / self.speed)
+        end = time.time()
+        self.offset = virtual + (end - start) * self.speed - end
+        self.points.append((end, end + self.offset))
+        self._sleeping = None
+
+    def _interp(self, x, src, dst):
+        points = self.points + [(time.time(), self.time())]
+        i = max(0, bisect.bisect_right([p[src] for p in points], x) - 1)
+        if i >= len(points) - 1:
+            (x0, y0), slope = (points[-1][src], points[-1][dst]), 1.0
+        else:
+            x0, x1, y0, y1 = points[i][src], points[i + 1][src], points[i][dst], points[i + 1][dst]
+            slope = (y1 - y0) / (x1 - x0) if x1 > x0 else 1.0
+        return y0 + (x - x0) * slope
+
+    def to_real(self, virtual):
+        return self._interp(virtual, 1, 0)
+
+    def to_virtual(self, real):
+        return self._interp(real, 0, 1)
+
+
+class _ClockModule:
+    """time modülünün yerine geçer: time()/sleep() sanal, diğerleri (perf_counter...) gerçek."""
+
+    def __init__(self, clock):
+        self.time, self.sleep = clock.time, clock.sleep
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def install_clock(clock, modules):
+    """Modüllerin time/datetime adlarını sanal saate bağlar (yalnızca bu modüllerde)."""
+    class ReplayDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.fromtimestamp(clock.time(), tz)
+
+    for module in modules:
+        if hasattr(module, "time"):
+            module.time = _ClockModule(clock)
+        if hasattr(module, "datetime"):
+            module.datetime = ReplayDatetime
+
+
+# -----------------------
+# REPLAY VERİ KAYNAĞI
+# -----------------------
+def bar_ends(index):
+    """Saatlik barların kapanış anları (epoch sn)."""
+    return index.as_unit("s").asi8 + BAR_SECONDS
+
+
+def load_frames(args, market):
+    """{sembol: saatlik DataFrame (İstanbul saati)} kaynağa göre."""
+    from market_calendar import SESSION_TZ
+
+    if args.source == "synthetic":
+        from bench.synthetic import synthetic_symbol
+        n_bars = (WARMUP_DAYS + args.days) * BARS_PER_DAY
+        frames = {f"SYN{i:04d}.IS": synthetic_symbol(i, n_bars, args.seed) for i in range(args.symbols)}
+    elif args.source == "fixture":
+        from data_provider import FixtureProvider
+        provider = FixtureProvider(args.fixture_dir)
+        symbols = sorted(name[:-len("_1h.csv")] for name in os.listdir(args.fixture_dir)
+                         if name.endswith("_1h.csv"))[:args.symbols]
+        frames = provider.fetch_many(symbols, period="max", interval="1h")
+    else:
+        from bar_cache import BarCache, rows_to_frame
+        cache = BarCache(args.bar_cache)
+        frames = {}
+        for sym in cache.symbols("1h")[:args.symbols]:
+            frames[sym] = rows_to_frame(cache.read_rows(sym, "1h"), cache.series_info(sym, "1h")[1])
+    out = {}
+    for sym, df in frames.items():
+        if df is None or df.empty:
+            continue
+        idx = df.index
+        df.index = idx.tz_localize(SESSION_TZ) if idx.tz is None else idx.tz_convert(SESSION_TZ)
+        out[sym] = df
+    if not out:
+        raise SystemExit(f"Replay için saatlik ({args.source}) bar bulunamadı")
+    return out
+
+
+def replay_window(frames, days, market):
+    """(başlangıç, bitiş) sanal epoch: son `days` işlem gününün ilk seansından son bar kapanışına."""
+    dates = sorted({ts.date() for df in frames.values() for ts in df.index[-(days + 2) * BARS_PER_DAY:]})
+    trading = [d for d in dates if market.is_trading_day(d)] or dates
+    first = trading[-min(days, len(trading))]
+    session = market.session(first)
+    start = session[0] if session else datetime.combine(first, datetime.min.time())
+    end = max(df.index[-1].timestamp() for df in frames.values()) + BAR_SECONDS
+    return start.timestamp(), end
+
+
+class ReplayProvider:
+    """Yalnızca sanal saate göre kapanmış barları veren veri kaynağı (DataProvider arayüzü)."""
+
+    name = "replay"
+
+    def __init__(self, frames, clock):
+        self.frames = frames
+        self.clock = clock
+        self._closes = {sym: bar_ends(df.index) for sym, df in frames.items()}
+        self.calls = 0
+
+    def fetch(self, symbol, period="90d", interval="4h"):
+        return self.fetch_many([symbol], period=period, interval=interval).get(symbol)
+
+    def fetch_many(self, symbols, period="90d", interval="1h", **kwargs):
+        from data_provider import trim_to_period
+
+        self.calls += 1
+        now = self.clock.time()
+        out = {}
+        for sym in symbols:
+            if sym not in self.frames:
+                continue
+            n = int(self._closes[sym].searchsorted(now, side="right"))
+            if not n:
+                continue
+            df = self.frames[sym].iloc[:n]
+            if interval not in ("1h", "60m"):
+                from resample import resample_session
+                df = resample_session(df, interval)
+            out[sym] = trim_to_period(df, period)
+        return out
+
+
+def bar_events(frames, market, start, end):
+    """Replay penceresindeki 4H bar kapanışları: {sembol: [(kapanış sanal epoch, kapanış fiyatı)]}."""
+    closes = {when.timestamp() for d in sorted({ts.date() for df in frames.values() for ts in df.index})
+              for when, _ in market.bar_closes(d)}
+    events = {}
+    for sym, df in frames.items():
+        events[sym] = [(float(t), float(c)) for t, c in zip(bar_ends(df.index), df["Close"].to_numpy())
+                       if start <= t <= end and float(t) in closes]
+    return events
+
+
+def match_bars(events, observations, clock, decimals=None):
+    """Gözlemleri (sembol, fiyat, gerçek zaman, ...) bar kapanışlarına eşler: [(gözlem, kapanış gerçek zamanı)].
+
+    Her bar yalnızca ilk gözleminde sayılır; fiyat, gözlem anında kapanmış en son
+    eşleşen bardır (Telegram mesajında fiyat 2 haneye yuvarlıdır).
+    """
+    seen, out = set(), []
+    for obs in sorted(observations, key=lambda o: o[2]):
+        sym, price, real = obs[:3]
+        virtual = clock.to_virtual(real)
+        candidates = [t for t, p in events.get(sym, ()) if t <= virtual
+                      and (round(p, decimals) == price if decimals is not None else abs(p - price) <= 1e-9 * abs(p))]
+        if not candidates or (sym, candidates[-1]) in seen:
+            continue
+        seen.add((sym, candidates[-1]))
+        out.append((obs, clock.to_real(candidates[-1])))
+    return out
+
+
+# -----------------------
+# SSE İSTEMCİLERİ (ayrı süreç)
+# -----------------------
+class StreamClients:
+    """N ham soket /stream istemcisi; olay id'lerinin varış zamanlarını kaydeder.
+
+    İlk istemci (probe) olayları ayrıştırıp sembol fiyat değişimlerini de kaydeder.
+    Düşürülen istemci Last-Event-ID ile yeniden bağlanır (EventSource gibi).
+    """
+
+    def __init__(self, port, n):
+        self.port = port
+        self.sel = selectors.DefaultSelector()
+        self.arrivals = {}      # olay id -> [gerçek zaman]
+        self.probe = []         # [(sembol, fiyat, gerçek zaman, olay id)]
+        self.prices = {}
+        self.reconnects = 0
+        self.bytes = 0
+        self.stop = threading.Event()
+        for i in range(n):
+            self._connect(i, None)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _connect(self, index, last_id):
+        s = socket.create_connection(("127.0.0.1", self.port))
+        resume = f"Last-Event-ID: {last_id}\r\n" if last_id else ""
+        s.sendall(f"GET /stream HTTP/1.0\r\nHost: 127.0.0.1\r\nAccept: text/event-stream\r\n{resume}\r\n".encode())
+        s.setblocking(False)
+        self.sel.register(s, selectors.EVENT_READ, {"index": index, "buf": b"", "headers": True, "last": last_id})
+
+    def _run(self):
+        while not self.stop.is_set():
+            for key, _ in self.sel.select(timeout=0.2):
+                try:
+                    data = key.fileobj.recv(262144)
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    data = b""
+                client = key.data
+                if not data:
+                    self.sel.unregister(key.fileobj)
+                    key.fileobj.close()
+                    if not self.stop.is_set():
+                        self.reconnects += 1
+                        self._connect(client["index"], client["last"])
+                    continue
+                self.bytes += len(data)
+                self._feed(client, data, time.time())
+
+    def _feed(self, client, data, now):
+        buf = client["buf"] + data
+        if client["headers"]:
+            head, sep, rest = buf.partition(b"\r\n\r\n")
+            if not sep:
+                client["buf"] = buf
+                return
+            client["headers"], buf = False, rest
+        *frames, client["buf"] = buf.split(b"\n\n")
+        for frame in frames:
+            fields = dict(line.split(b": ", 1) for line in frame.split(b"\n") if b": " in line)
+            if b"id" not in fields:
+                continue
+            event_id = fields[b"id"].decode()
+            client["last"] = event_id
+            self.arrivals.setdefault(event_id, []).append(now)
+            if client["index"] == 0 and b"data" in fields:
+                self._observe(json.loads(fields[b"data"]), now, event_id)
+
+    def _observe(self, payload, now, event_id):
+        rows = payload.get("per_symbol") or payload.get("changed") or {}
+        for sym, row in rows.items():
+            price = row.get("price") if isinstance(row, dict) else None
+            if price is not None and self.prices.get(sym) != price:
+                self.prices[sym] = price
+                self.probe.append((sym, price, now, event_id))
+
+    def close(self):
+        self.stop.set()
+        self.thread.join()
+        for key in list(self.sel.get_map().values()):
+            key.fileobj.close()
+
+
+def run_clients(port, n):
+    """Alt süreç: stdin kapanana kadar istemcileri çalıştırır, sonuçları JSON yazar."""
+    clients = StreamClients(port, n)
+    sys.stdin.read()
+    clients.close()
+    print(json.dumps({"arrivals": clients.arrivals, "probe": clients.probe,
+                      "reconnects": clients.reconnects, "bytes": clients.bytes}))
+
+
+def dashboard_latencies(events, clients, clock):
+    """Probe'un barı ilk gördüğü olayın tüm istemcilere varışı: [gecikme sn]."""
+    latencies = []
+    for obs, close in match_bars(events, clients["probe"], clock):
+        latencies.extend(t - close for t in clients["arrivals"][obs[3]])
+    return latencies
+
+
+# -----------------------
+# BELLEK ÖRNEKLEME
+# -----------------------
+def rss_mb(pid):
+    """Sürecin ve çocuklarının RSS toplamı (MB; /proc yoksa yalnızca bu süreç için ru_maxrss)."""
+    try:
+        pids, total = [pid], 0
+        while pids:
+            current = pids.pop()
+            with open(f"/proc/{current}/status") as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+            try:
+                with open(f"/proc/{current}/task/{current}/children") as f:
+                    pids.extend(int(x) for x in f.read().split())
+            except OSError:
+                pass
+        return total / 1024
+    except (OSError, StopIteration):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if pid == os.getpid() else None
+
+
+class MemorySampler(threading.Thread):
+    """Süreçlerin RSS'ini düzenli aralıkla örnekler: {ad: [(sanal epoch, MB)]}."""
+
+    def __init__(self, clock, pids, interval=SAMPLE_INTERVAL):
+        super().__init__(name="memory-sampler", daemon=True)
+        self.clock, self.pids, self.interval = clock, pids, interval
+        self.samples = {name: [] for name in pids}
+        self.stop = threading.Event()
+
+    def run(self):
+        while not self.stop.wait(self.interval):
+            for name, pid in self.pids.items():
+                value = rss_mb(pid)
+                if value is not None:
+                    self.samples[name].append((self.clock.time(), value))
+
+
+def memory_growth(samples, after):
+    """after (sanal epoch) sonrası örneklerden: başlangıç, son, tepe, MB/sanal gün eğimi."""
+    points = [(t, v) for t, v in samples if t >= after] or samples
+    if not points:
+        return None
+    n = len(points)
+    mean_t = sum(t for t, _ in points) / n
+    mean_v = sum(v for _, v in points) / n
+    var = sum((t - mean_t) ** 2 for t, _ in points)
+    slope = sum((t - mean_t) * (v - mean_v) for t, v in points) / var * 86400 if var else 0.0
+    return {"start_mb": round(points[0][1], 1), "end_mb": round(points[-1][1], 1),
+            "peak_mb": round(max(v for _, v in points), 1),
+            "growth_mb": round(points[-1][1] - points[0][1], 1), "mb_per_day": round(slope, 2)}
+
+
+# -----------------------
+# ANA AKIŞ
+# -----------------------
+def percentiles(values):
+    if not values:
+        return {"n": 0}
+    return {"n": len(values), "p50": round(pct(values, 0.5), 3), "p95": round(pct(values, 0.95), 3),
+            "p99": round(pct(values, 0.99), 3), "max": round(max(values), 3)}
+
+
+def _stamp(epoch):
+    from market_calendar import SESSION_ZONE
+    return f"{datetime.fromtimestamp(epoch, SESSION_ZONE):%Y-%m-%d %H:%M}"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run(args):
+    tmp = tempfile.mkdtemp(prefix="bist-replay-")
+    stub = TelegramStub(latency=args.telegram_latency, rate_429=args.rate_429).start()
+    # Worker ve web aynı geçici dosyaları paylaşır; gerçek Telegram'a ve yerel durum dosyalarına dokunulmaz
+    os.environ.update(BIST_STATE_SNAPSHOT=os.path.join(tmp, "state.snap"),
+                      BIST_SIGNAL_DB=os.path.join(tmp, "signals.db"),
+                      BIST_SIGNAL_INDEX=os.path.join(tmp, "signal_index.json"),
+                      BIST_INDICATOR_STATE=os.path.join(tmp, "indicator_state.json"),
+                      BIST_BAR_CACHE="", BIST_DATA_PROVIDER="fixture", BIST_SCHEDULE="calendar",
+                      BIST_BAR_CLOSE_DELAY=str(args.close_delay), BIST_PROFILE_TRIGGER="", BIST_SHARD_ID="",
+                      BIST_SHARD_DIR="", BIST_TELEGRAM_API_BASE=stub.url)
+    sys.path.insert(0, ROOT)
+    import bot
+    import signal_dedup
+
+    frames = load_frames(args, bot.market)
+    start, end = replay_window(frames, args.days, bot.market)
+    events = bar_events(frames, bot.market, start, end)
+    clock = ReplayClock(start, args.speed)
+    install_clock(clock, [bot, signal_dedup])
+
+    bot.SYMBOLS = list(frames)
+    bot.provider = ReplayProvider(frames, clock)
+    bot.TELEGRAM_TOKEN = "REPLAY"
+    bot.CHAT_IDS = [str(9000 + i) for i in range(args.chats)]
+    # Bekleme sırasındaki kalp atışı yazımları gerçek zamanda canlıdaki sıklıkta kalsın
+    bot.IDLE_HEARTBEAT *= args.speed
+
+    cycles, busy = [], threading.Event()
+    scan_cycle = bot.scan_cycle
+
+    def timed_cycle(symbols=None):
+        busy.set()
+        t0, v0 = time.perf_counter(), clock.time()
+        try:
+            return scan_cycle(symbols)
+        finally:
+            cycles.append({"kind": "full" if symbols is None else "refresh", "at": v0,
+                           "symbols": len(bot.SYMBOLS) if symbols is None else len(symbols),
+                           "seconds": time.perf_counter() - t0})
+            busy.clear()
+    bot.scan_cycle = timed_cycle
+
+    web = clients = None
+    pids = {"worker": os.getpid()}
+    if args.clients:
+        port = free_port()
+        web = start_server(args.web_class, port, os.environ["BIST_STATE_SNAPSHOT"], args.web_workers)
+        pids["web"] = web.pid
+        clients = subprocess.Popen([sys.executable, "-m", "bench.replay", "--sse-port", str(port),
+                                    "--clients", str(args.clients)], cwd=ROOT, stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE, text=True)
+    sampler = MemorySampler(clock, pids)
+    sampler.start()
+
+    print(f"Replay: {len(frames)} sembol ({args.source}), {_stamp(start)} -> {_stamp(end)}, "
+          f"bekleme hızı {args.speed:g}x, {args.clients} SSE istemcisi", flush=True)
+    t0 = time.perf_counter()
+    threading.Thread(target=bot.scanner_loop, name="scanner", daemon=True).start()
+    while clock.time() < end:
+        time.sleep(0.2)
+    # Süren döngü bitsin, Telegram kuyruğu ve web yayını boşalsın
+    deadline = time.monotonic() + args.drain
+    while busy.is_set() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    if bot._dispatcher is not None:
+        bot._dispatcher.flush(timeout=max(1.0, deadline - time.monotonic()))
+    time.sleep(1.5 if args.clients else 0)
+    wall = time.perf_counter() - t0
+    sampler.stop.set()
+
+    client_data = None
+    if clients is not None:
+        out, _ = clients.communicate("", timeout=60)
+        client_data = json.loads(out.strip().splitlines()[-1])
+        web.terminate()
+        web.wait()
+    stub.stop()
+
+    telegram = [(m.group(1) + ".IS", float(m.group(2)), t)
+                for t, _, text in stub.received for m in MESSAGE_RE.finditer(text)]
+    n_events = sum(len(v) for v in events.values())
+    first_full = next((c["at"] + c["seconds"] for c in cycles if c["kind"] == "full"), start)
+    window = [c for c in cycles if c["at"] <= end]
+    report = {
+        "meta": {"source": args.source, "symbols": len(frames), "days": args.days, "speed": args.speed,
+                 "start": _stamp(start), "end": _stamp(end), "wall_s": round(wall, 1),
+                 "clients": args.clients, "chats": args.chats, "check_interval": bot.CHECK_INTERVAL},
+        "bars": n_events,
+        "cycles": {kind: dict(percentiles([c["seconds"] for c in window if c["kind"] == kind]),
+                              overruns=sum(c["seconds"] > bot.CHECK_INTERVAL for c in window if c["kind"] == kind))
+                   for kind in ("full", "refresh")},
+        "bar_to_telegram": percentiles([obs[2] - close for obs, close in match_bars(events, telegram, clock, 2)]),
+        "telegram": {"http_messages": len(stub.received), "signals": len(telegram), "throttled": stub.throttled,
+                     "dispatcher": {k: v for k, v in (bot._dispatcher.stats if bot._dispatcher else {}).items()
+                                    if k != "last_latency"}},
+        "memory": {name: memory_growth(samples, first_full) for name, samples in sampler.samples.items()},
+    }
+    if client_data is not None:
+        report["bar_to_dashboard_probe"] = percentiles([obs[2] - close for obs, close
+                                                        in match_bars(events, client_data["probe"], clock)])
+        report["bar_to_dashboard"] = percentiles(dashboard_latencies(events, client_data, clock))
+        report["sse"] = {"events": len(client_data["arrivals"]), "reconnects": client_data["reconnects"],
+                         "mb": round(client_data["bytes"] / 1e6, 1)}
+    return report
+
+
+def print_report(r):
+    m = r["meta"]
+    print(f"\n{m['symbols']} sembol, {m['start']} -> {m['end']}, bekleme hızı {m['speed']:g}x, gerçek {m['wall_s']} sn; "
+          f"{r['bars']} sembol x 4H bar kapanışı")
+    print(f"{'döngü':<10} {'adet':>6} {'p50 sn':>8} {'p95 sn':>8} {'max sn':>8} {'aşım':>6}")
+    for kind, c in r["cycles"].items():
+        if c["n"]:
+            print(f"{kind:<10} {c['n']:>6} {c['p50']:>8.3f} {c['p95']:>8.3f} {c['max']:>8.3f} "
+                  f"{c['overruns']:>6}")
+    print(f"(aşım: döngü > CHECK_INTERVAL={m['check_interval']} sn)")
+    print(f"\n{'gecikme (sn)':<26} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for key, label in (("bar_to_telegram", "4H bar -> Telegram"), ("bar_to_dashboard_probe", "4H bar -> dashboard"),
+                       ("bar_to_dashboard", "  (tüm SSE istemcileri)")):
+        p = r.get(key)
+        if p is None:
+            continue
+        if not p["n"]:
+            print(f"{label:<26} {0:>6}")
+            continue
+        print(f"{label:<26} {p['n']:>6} {p['p50']:>8.3f} {p['p95']:>8.3f} {p['p99']:>8.3f} {p['max']:>8.3f}")
+    t = r["telegram"]
+    print(f"\nTelegram: {t['signals']} sinyal, {t['http_messages']} HTTP mesajı, 429: {t['throttled']}, "
+          f"düşürülen: {t['dispatcher'].get('dropped', 0)}")
+    if "sse" in r:
+        print(f"SSE: {r['sse']['events']} olay, {r['sse']['mb']} MB, yeniden bağlanma: {r['sse']['reconnects']}")
+    for name, mem in r["memory"].items():
+        if mem:
+            print(f"Bellek ({name}): {mem['start_mb']} -> {mem['end_mb']} MB (tepe {mem['peak_mb']}), "
+                  f"büyüme {mem['growth_mb']:+} MB, {mem['mb_per_day']:+} MB/sanal gün")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--source", choices=("synthetic", "fixture", "cache"), default="synthetic")
+    ap.add_argument("--symbols", type=int, default=23, help="sembol sayısı (kayıtlı kaynakta en fazla)")
+    ap.add_argument("--days", type=int, default=5, help="oynatılacak işlem günü")
+    ap.add_argument("--speed", type=float, default=6000, help="sanal saat hızı (6000: bir hafta ~1 dk)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--fixture-dir", default="fixtures")
+    ap.add_argument("--bar-cache", default="bars.db")
+    ap.add_argument("--close-delay", type=int, default=60, help="BAR_CLOSE_DELAY (sanal sn)")
+    ap.add_argument("--clients", type=int, default=10, help="SSE istemcisi (0: web süreci başlatılmaz)")
+    ap.add_argument("--web-class", default="gevent")
+    ap.add_argument("--web-workers", type=int, default=1)
+    ap.add_argument("--chats", type=int, default=1, help="sinyal gönderilecek sohbet sayısı")
+    ap.add_argument("--telegram-latency", type=float, default=0.05, help="stub yanıt gecikmesi (sn)")
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--drain", type=float, default=30.0, help="replay sonunda boşalma için en fazla bekleme (sn)")
+    ap.add_argument("--json", default=None, help="raporu JSON olarak yaz")
+    ap.add_argument("--sse-port", type=int, default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.sse_port:
+        run_clients(args.sse_port, args.clients)
+        return 0
+    report = run(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1, ensure_ascii=False)
+        print(f"Rapor yazıldı: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# bench/sse_fanout.py (SSE YAYIN YÜK TESTİ)
+#
+# 1..1000 simüle SSE istemcisiyle web sürecinin CPU tüketimini ölçer.
+#  - broadcast: tek StateBroadcaster izleyicisi + istemci başına kuyruk
+#  - legacy:    her istemci 2 sn'de bir anlık görüntüyü kendisi okuyup ayrıştırır
+# Worker yerine bir thread her `--publish` saniyede yeni generation yazar.
+#
+#   python -m bench.sse_fanout --clients 1,10,100,1000 --seconds 6
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import state_broadcast
+from shared_state import SnapshotWriter, read_snapshot
+from state_broadcast import StateBroadcaster
+
+
+def fake_state(n_symbols, tick):
+    per_symbol = {f"SYN{i:04d}.IS": {"symbol": f"SYN{i:04d}.IS", "price": 10 + i + tick * 0.01,
+                                     "rsi4h": 50.0, "supports": [9.5, 9.0], "resistances": [11.0],
+                                     "ma_crosses": [], "vol_spike": False, "g1": False, "g2": False}
+                  for i in range(n_symbols)}
+    return {"status": {"running": True, "total_signals": tick, "worker_heartbeat": str(tick)},
+            "per_symbol": per_symbol, "signals": [], "errors": []}
+
+
+def publisher(path, n_symbols, every, stop):
+    writer = SnapshotWriter(path)
+    tick = 0
+    while not stop.is_set():
+        writer.publish(fake_state(n_symbols, tick))
+        tick += 1
+        stop.wait(every)
+
+
+def run_broadcast(path, n_clients, seconds):
+    bc = StateBroadcaster(path, poll=0.1, heartbeat=2)
+    received = [0] * n_clients
+    stop = threading.Event()
+
+    def client(i):
+        sub = bc.subscribe()
+        while not stop.is_set():
+            try:
+                sub.queue.get(timeout=0.5)
+                received[i] += 1
+            except Exception:
+                pass
+        bc.unsubscribe(sub)
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(n_clients)]
+    for t in threads:
+        t.start()
+    c0, w0 = time.process_time(), time.perf_counter()
+    time.sleep(seconds)
+    cpu, wall = time.process_time() - c0, time.perf_counter() - w0
+    stop.set()
+    for t in threads:
+        t.join()
+    return cpu / wall, bc.stats["parses"], sum(received) / max(1, n_clients)
+
+
+def run_legacy(path, n_clients, seconds, interval=2.0):
+    stop = threading.Event()
+    parses = [0]
+
+    def client():
+        last = None
+        while not stop.is_set():
+            _, state = read_snapshot(path)
+            parses[0] += 1
+            if state != last:
+                last = state
+            stop.wait(interval)
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(n_clients)]
+    for t in threads:
+        t.start()
+    c0, w0 = time.process_time(), time.perf_counter()
+    time.sleep(seconds)
+    cpu, wall = time.process_time() - c0, time.perf_counter() - w0
+    stop.set()
+    for t in threads:
+        t.join()
+    return cpu / wall, parses[0], None
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", default="1,10,100,1000")
+    ap.add_argument("--seconds", type=float, default=6)
+    ap.add_argument("--symbols", type=int, default=500)
+    ap.add_argument("--publish", type=float, default=1.0, help="worker yayın aralığı (sn)")
+    ap.add_argument("--legacy", action="store_true", help="eski istemci-başına-okuma modelini de ölç")
+    args = ap.parse_args()
+
+    state_broadcast.HEARTBEAT_INTERVAL = 2
+    path = os.path.join(tempfile.mkdtemp(), "state.snap")
+    stop = threading.Event()
+    pub = threading.Thread(target=publisher, args=(path, args.symbols, args.publish, stop), daemon=True)
+    pub.start()
+    time.sleep(0.5)
+
+    print(f"{'mod':<10} {'istemci':>8} {'CPU (çekirdek)':>15} {'ayrıştırma':>11} {'olay/istemci':>13}")
+    for n in [int(x) for x in args.clients.split(",")]:
+        cpu, parses, per_client = run_broadcast(path, n, args.seconds)
+        print(f"{'broadcast':<10} {n:>8} {cpu:>15.3f} {parses:>11} {per_client:>13.1f}")
+        if args.legacy:
+            cpu, parses, _ = run_legacy(path, n, args.seconds)
+            print(f"{'legacy':<10} {n:>8} {cpu:>15.3f} {parses:>11} {'-':>13}")
+    stop.set()
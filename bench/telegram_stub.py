@@ -0,0 +1,110 @@
+# bench/telegram_stub.py (YEREL TELEGRAM STUB SUNUCUSU)
+#
+# /bot<token>/sendMessage çağrılarını kabul eden, gecikme ve 429 simüle eden
+# küçük bir HTTP sunucusu. Alınan mesajlar zaman damgasıyla saklanır.
+# Doğrudan çalıştırılırsa TelegramDispatcher'ı patlama + 429 altında dener:
+#
+#   python -m bench.telegram_stub --messages 40 --latency 0.3 --rate-429 0.2
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class TelegramStub:
+    """Arka planda çalışan stub; received listesinde (zaman, chat_id, text) tutar."""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, rate_429=0.0, retry_after=1, seed=0):
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.received = []
+        self.requests = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode()
+                if self.headers.get("Content-Type", "").startswith("application/json"):
+                    payload = json.loads(body or "{}")
+                else:
+                    payload = {k: v[0] for k, v in parse_qs(body).items()}
+                if stub.latency:
+                    time.sleep(stub.latency)
+                with stub._lock:
+                    stub.requests += 1
+                    throttle = stub.rng.random() < stub.rate_429
+                    if throttle:
+                        stub.throttled += 1
+                    else:
+                        stub.received.append((time.time(), str(payload.get("chat_id")), payload.get("text", "")))
+                if throttle:
+                    self._reply(429, {"ok": False, "error_code": 429,
+                                      "description": "Too Many Requests",
+                                      "parameters": {"retry_after": stub.retry_after}})
+                else:
+                    self._reply(200, {"ok": True, "result": {"message_id": stub.requests}})
+
+            def do_GET(self):
+                self._reply(200, {"ok": True, "result": True})
+
+            def _reply(self, code, obj):
+                data = json.dumps(obj).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+
+
+if __name__ == "__main__":
+    import argparse
+    from telegram_dispatch import TelegramDispatcher
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=40)
+    ap.add_argument("--chats", type=int, default=2)
+    ap.add_argument("--latency", type=float, default=0.3)
+    ap.add_argument("--rate-429", type=float, default=0.2)
+    args = ap.parse_args()
+
+    stub = TelegramStub(latency=args.latency, rate_429=args.rate_429).start()
+    disp = TelegramDispatcher("TEST", api_base=stub.url).start()
+    t0 = time.perf_counter()
+    for i in range(args.messages):
+        for c in range(args.chats):
+            disp.enqueue(1000 + c, f"sinyal {i}")
+    enqueue_s = time.perf_counter() - t0
+    disp.flush(timeout=120)
+    total_s = time.perf_counter() - t0
+    delivered = sum(t.count("sinyal") for _, _, t in stub.received)
+    print(f"kuyruğa ekleme: {enqueue_s * 1000:.2f} ms ({args.messages * args.chats} mesaj)")
+    print(f"teslim: {delivered}/{args.messages * args.chats} sinyal, {len(stub.received)} HTTP mesajı "
+          f"({disp.stats['digests']} özet), 429: {stub.throttled}, toplam {total_s:.2f} sn")
+    print(f"gecikme: {disp.latency_percentiles()}")
+    stub.stop()
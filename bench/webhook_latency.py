@@ -0,0 +1,144 @@
+# bench/webhook_latency.py (WEBHOOK GECİKMESİ / SSE YÜKÜ ALTINDA)
+#
+# gunicorn'u verilen worker sınıfıyla ayrı süreçte başlatır, N adet SSE
+# istemcisini /stream'e bağlı tutar ve bu sırada /telegram_webhook'a ardışık
+# POST'lar göndererek p50/p99 gecikmeyi ölçer. SSE bağlantıları tek bir
+# selectors thread'inde ham soketlerle boşaltılır (istemci tarafı ucuz kalsın).
+# Sync worker'da N >= worker sayısı olduğunda webhook hiç yanıt alamaz; bu
+# durumda istek zaman aşımı olarak sayılır.
+#
+#   python -m bench.webhook_latency --classes sync,gthread,gevent --clients 0,10,100
+
+import argparse
+import json
+import os
+import selectors
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+from bench.sse_fanout import fake_state
+from shared_state import SnapshotWriter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(worker_class, port, snapshot, workers):
+    env = dict(os.environ, PORT=str(port), WEB_WORKER_CLASS=worker_class,
+               WEB_CONCURRENCY=str(workers), BIST_STATE_SNAPSHOT=snapshot)
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+                             "dashboard_web:app"], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/status_json", timeout=1).read()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"gunicorn ({worker_class}) başlatılamadı")
+
+
+class SSEClients:
+    """N ham soket SSE bağlantısını tek thread'de açık tutar ve okur."""
+
+    def __init__(self, port, n):
+        self.sel = selectors.DefaultSelector()
+        self.socks = []
+        self.bytes = 0
+        self.stop = threading.Event()
+        request = f"GET /stream HTTP/1.1\r\nHost: 127.0.0.1\r\nAccept: text/event-stream\r\n\r\n".encode()
+        for _ in range(n):
+            s = socket.create_connection(("127.0.0.1", port))
+            s.sendall(request)
+            s.setblocking(False)
+            self.sel.register(s, selectors.EVENT_READ)
+            self.socks.append(s)
+        self.thread = threading.Thread(target=self._drain, daemon=True)
+        self.thread.start()
+
+    def _drain(self):
+        while not self.stop.is_set():
+            for key, _ in self.sel.select(timeout=0.2):
+                try:
+                    data = key.fileobj.recv(65536)
+                except BlockingIOError:
+                    continue
+                if not data:
+                    self.sel.unregister(key.fileobj)
+                self.bytes += len(data)
+
+    def close(self):
+        self.stop.set()
+        self.thread.join()
+        for s in self.socks:
+            s.close()
+
+
+def measure_webhook(port, requests_n, timeout):
+    body = json.dumps({"message": {"chat": {"id": 1}, "text": "merhaba"}}).encode()
+    lat, failures = [], 0
+    for _ in range(requests_n):
+        req = urllib.request.Request(f"http://127.0.0.1:{port}/telegram_webhook", data=body,
+                                     headers={"Content-Type": "application/json"})
+        t0 = time.perf_counter()
+        try:
+            urllib.request.urlopen(req, timeout=timeout).read()
+            lat.append(time.perf_counter() - t0)
+        except OSError:
+            failures += 1
+    return lat, failures
+
+
+def pct(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--classes", default="sync,gthread,gevent")
+    ap.add_argument("--clients", default="0,10,100,500")
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--timeout", type=float, default=2.0, help="webhook istek zaman aşımı (sn)")
+    ap.add_argument("--port", type=int, default=5055)
+    ap.add_argument("--symbols", type=int, default=500)
+    args = ap.parse_args()
+
+    snapshot = os.path.join(tempfile.mkdtemp(), "state.snap")
+    writer = SnapshotWriter(snapshot)
+    stop = threading.Event()
+
+    def publisher():
+        tick = 0
+        while not stop.is_set():
+            writer.publish(fake_state(args.symbols, tick))
+            tick += 1
+            stop.wait(1.0)
+    threading.Thread(target=publisher, daemon=True).start()
+
+    print(f"{'worker':<8} {'SSE':>5} {'p50 (ms)':>9} {'p99 (ms)':>9} {'hata':>5} {'SSE KB':>8}")
+    for worker_class in args.classes.split(","):
+        for n in [int(x) for x in args.clients.split(",")]:
+            proc = start_server(worker_class, args.port, snapshot, args.workers)
+            clients = None
+            try:
+                clients = SSEClients(args.port, n)
+                time.sleep(1.0)
+                lat, failures = measure_webhook(args.port, args.requests, args.timeout)
+                print(f"{worker_class:<8} {n:>5} {pct(lat, 0.5) * 1000:>9.1f} "
+                      f"{pct(lat, 0.99) * 1000:>9.1f} {failures:>5} {clients.bytes / 1024:>8.0f}")
+            finally:
+                if clients:
+                    clients.close()
+                proc.terminate()
+                proc.wait()
+    stop.set()
@@ -1,104 +1,369 @@
 # bot.py (NİHAİ VERSİYON: Tüm Analiz, Telegram ve Status Kaydı)
 
+import os
+import signal
+import threading
 import time
-import json
+from collections import deque
 from datetime import datetime
-import yfinance as yf
 import numpy as np
 import pandas as pd
-import requests
 
 # config.py'dan gizli ayarları içe aktar
 from config import TELEGRAM_TOKEN, CHAT_IDS
-from scipy.signal import argrelextrema 
+from data_provider import make_provider, trim_to_period
+from resample import derive_frames
+from indicators import compute_universe
+from incremental import IndicatorBank
+from sr_levels import SRBank, local_extrema, nearest_levels
+from scan_pool import TokenBucket, RateLimitedProvider
+from scan_pipeline import LatencyStats, Pipeline, Stage
+from telegram_dispatch import TelegramDispatcher, API_BASE
+from telemetry import MetricsRegistry, SamplingProfiler
+from bar_cache import BarCache, CachedProvider
+from signal_dedup import SuppressionIndex
+from signal_store import SignalStore
+from signal_rules import features_from_rows, label_context, load_rules
+from shared_state import SNAPSHOT_SIGNALS, SnapshotWriter, build_snapshot
+from sharding import HashRing, live_members, load_symbols, shard_path
+from market_calendar import BistCalendar, ScanScheduler, SESSION_ZONE, priority_symbols
 
-# Worker ve Web Service'in durum paylaşımı için dosya
-STATUS_FILE = "status.json"
+# Worker ve Web Service'in durum paylaşımı için dosya (atomik, sürümlü anlık görüntü)
+STATE_SNAPSHOT = os.environ.get("BIST_STATE_SNAPSHOT", "state.snap")
 
 # -----------------------
 # CONFIG (Analiz Ayarları)
 # -----------------------
-CHECK_INTERVAL = 300          # 5 dakika
-VOL_FACTOR = 1.7
+CHECK_INTERVAL = 300          # 5 dakika (seans içi yenileme / sabit mod aralığı)
+# Tetikleyici/güç kuralları ve eşikleri (rules.json); başlangıçta bir kez derlenir
+RULES_FILE = os.environ.get("BIST_RULES", "") or None
+RULES = load_rules(RULES_FILE)
+VOL_FACTOR = float(RULES.params.get("vol_factor", 1.7))
 RSI_PERIOD = 14
 SR_ORDER = 5
 SR_LOOKBACK = 100
+# Ek destek/direnç ayarları "lookback:order,..." (özette sr_levels altında yayınlanır)
+SR_EXTRA_SETTINGS = [tuple(int(x) for x in item.split(":"))
+                     for item in os.environ.get("BIST_SR_SETTINGS", "50:3,200:10").split(",") if item.strip()]
+# Aynı bölgeye toplanacak seviyelerin en fazla göreli uzaklığı
+SR_ZONE_TOLERANCE = 0.005
 
-SYMBOLS = [
+# Veri kaynağı: "yfinance" (canlı) veya "fixture" (BIST_FIXTURE_DIR altındaki CSV'ler)
+DATA_PROVIDER = os.environ.get("BIST_DATA_PROVIDER", "yfinance")
+FIXTURE_DIR = os.environ.get("BIST_FIXTURE_DIR", "fixtures")
+# Kalıcı bar önbelleği (SQLite); boş bırakılırsa her döngüde tam geçmiş indirilir
+BAR_CACHE_PATH = os.environ.get("BIST_BAR_CACHE", "bars.db")
+# Günlük ve 4H barlar tek bir gün içi (BASE_INTERVAL) indirmeden seans hizalı türetilir;
+# "0" yapılırsa iki zaman dilimi ayrı ayrı indirilir.
+DERIVE_FROM_INTRADAY = os.environ.get("BIST_DERIVE_FROM_INTRADAY", "1") == "1"
+BASE_INTERVAL = "1h"
+DAY_PERIOD, H4_PERIOD = "120d", "90d"
+BASE_PERIOD = DAY_PERIOD
+# Gösterge hesaplama: "vector" (tüm evren NumPy matrisinde), "incremental"
+# (sembol başına kalıcı O(1) durum) veya "scalar" (her döngüde sembol sembol)
+INDICATOR_ENGINE = os.environ.get("BIST_INDICATOR_ENGINE", "vector")
+# Tarama modu: "batch" (SCAN_CHUNK sembollük toplu indirmeler + vektörel göstergeler) veya
+# "concurrent" (sembol başına indirme, SCAN_CONCURRENCY thread). Her iki modda da tarama
+# aşamalı akıştır (scan_pipeline.py): her sembolün sonucu hazır olur olmaz yayınlanır.
+SCAN_MODE = os.environ.get("BIST_SCAN_MODE", "batch")
+SCAN_CONCURRENCY = int(os.environ.get("BIST_SCAN_CONCURRENCY", "8"))
+SCAN_CHUNK = int(os.environ.get("BIST_SCAN_CHUNK", "8"))
+BATCH_FETCH_WORKERS = 2
+# Sinyal yokken durum dosyası tarama sırasında en fazla bu aralıkla yazılır (sn)
+PUBLISH_INTERVAL = 0.5
+# Zamanlama: "calendar" (BIST seansı; bar kapanışında tam tarama, seans içinde öncelikli
+# sembollerle yenileme, piyasa kapalıyken bekleme) veya "fixed" (her CHECK_INTERVAL'da tam tarama)
+SCHEDULE_MODE = os.environ.get("BIST_SCHEDULE", "calendar")
+# Bar kapanışından sonra tam tarama için bekleme (sn); yfinance BIST verisi ~15 dk gecikmelidir
+BAR_CLOSE_DELAY = int(os.environ.get("BIST_BAR_CLOSE_DELAY", "960" if DATA_PROVIDER == "yfinance" else "60"))
+# Seans içi yenilemede taranacak semboller: S/R'ye yakın (%) veya hacmi yüksek (ortalamanın katı)
+REFRESH_SR_PCT = float(os.environ.get("BIST_REFRESH_SR_PCT", "1.5"))
+REFRESH_VOL_RATIO = float(os.environ.get("BIST_REFRESH_VOL_RATIO", "1.2"))
+REFRESH_MAX_SYMBOLS = int(os.environ.get("BIST_REFRESH_MAX_SYMBOLS", "50"))
+# Tabloda olmayan/ek tatiller ve yarım günler: "YYYY-AA-GG,..."
+EXTRA_HOLIDAYS = os.environ.get("BIST_HOLIDAYS", "").split(",")
+EXTRA_HALF_DAYS = os.environ.get("BIST_HALF_DAYS", "").split(",")
+# Beklerken durum dosyası bu aralıkla yenilenir (worker kalp atışı)
+IDLE_HEARTBEAT = 300
+# İndirme aşamasında bir getirme grubunun (fetch chunk) süre sınırı, saniye. concurrent
+# modda grup tek semboldür (sembol başına sınır); batch modda SCAN_CHUNK sembolün tek
+# toplu isteğidir ve aşılırsa gruptaki tüm semboller bu döngüde "stale" kalır.
+# (BIST_SYMBOL_DEADLINE eski addır, hâlâ okunur.)
+FETCH_DEADLINE = float(os.environ.get("BIST_FETCH_DEADLINE", os.environ.get("BIST_SYMBOL_DEADLINE", "30")))
+FETCH_RATE = float(os.environ.get("BIST_FETCH_RATE", "4"))              # veri kaynağına istek/sn
+FETCH_BURST = int(os.environ.get("BIST_FETCH_BURST", "8"))
+# İstek üzerine tek döngü profili: tetik dosyası oluşturulunca ya da SIGUSR1 gelince
+# sonraki tarama örneklenir ve PROFILE_DIR'e folded (flame graph) yığınlar yazılır
+PROFILE_TRIGGER = os.environ.get("BIST_PROFILE_TRIGGER", "profile.request")
+PROFILE_DIR = os.environ.get("BIST_PROFILE_DIR", "profiles")
+PROFILE_INTERVAL = float(os.environ.get("BIST_PROFILE_INTERVAL", "0.005"))   # örnekleme aralığı (sn)
+# Telegram API adresi (yerel stub sunucuyla test için değiştirilebilir)
+TELEGRAM_API_BASE = os.environ.get("BIST_TELEGRAM_API_BASE", API_BASE)
+# Sinyal bastırma indeksi (boş bırakılırsa her taramada tüm tetikleyiciler gönderilir)
+SIGNAL_INDEX_FILE = os.environ.get("BIST_SIGNAL_INDEX", "signal_index.json")
+# Tetikleyici başına bekleme süreleri (sn); süre dolmadan aynı sinyal ancak güç yükselirse tekrar gider
+SIGNAL_COOLDOWNS = {"green12": 4 * 3600, "volume": 4 * 3600, "rsi_low": 4 * 3600,
+                    "rsi_high": 4 * 3600, "trend": 24 * 3600,
+                    "ma:MA20↑MA50": 24 * 3600, "ma:MA20↓MA50": 24 * 3600,
+                    "ma:MA50↑MA200": 24 * 3600, "ma:MA50↓MA200": 24 * 3600}
+# Bellekte tutulan son sinyal sayısı (halka tampon); tüm geçmiş SIGNAL_DB'de
+SIGNAL_HISTORY = 500
+SIGNAL_DB = os.environ.get("BIST_SIGNAL_DB", "signals.db")
+# Artımlı gösterge durumunun checkpoint dosyası (worker yeniden başlayınca yüklenir)
+INDICATOR_STATE_FILE = os.environ.get("BIST_INDICATOR_STATE", "indicator_state.json")
+
+# Yatay bölme (sharding.py): BIST_SHARD_ID verilirse worker evrenin yalnızca kendi payını tarar.
+# SHARD_DIR tüm shard'lar ve web süreci için ortak olmalı (aynı makine ya da paylaşılan disk).
+SHARD_ID = os.environ.get("BIST_SHARD_ID", "")
+SHARD_DIR = os.environ.get("BIST_SHARD_DIR", "shards")
+# Sabit üye listesi ("w1,w2,w3"); boşsa SHARD_DIR'deki taze shard dosyalarından keşfedilir
+SHARD_MEMBERS = [m.strip() for m in os.environ.get("BIST_SHARD_MEMBERS", "").split(",") if m.strip()]
+# Kalp atışı bu süreden eski shard ölü sayılır ve sembolleri diğerlerine geçer (sn)
+SHARD_TTL = int(os.environ.get("BIST_SHARD_TTL", str(3 * IDLE_HEARTBEAT)))
+if SHARD_ID:
+    # Anlık görüntü ortak dizinde; shard'a özel durum dosyaları (açıkça verilmediyse) shard adıyla
+    STATE_SNAPSHOT = shard_path(SHARD_DIR, SHARD_ID)
+    os.makedirs(SHARD_DIR, exist_ok=True)
+    if "BIST_SIGNAL_INDEX" not in os.environ:
+        SIGNAL_INDEX_FILE = f"signal_index.{SHARD_ID}.json"
+    if "BIST_INDICATOR_STATE" not in os.environ:
+        INDICATOR_STATE_FILE = f"indicator_state.{SHARD_ID}.json"
+
+# Sembol evreni: BIST_SYMBOLS_FILE (satır/virgülle ayrılmış) verilmezse aşağıdaki liste
+SYMBOLS_FILE = os.environ.get("BIST_SYMBOLS_FILE", "")
+SYMBOLS = load_symbols(SYMBOLS_FILE, [
     "AKBNK.IS","ARCLK.IS","ASELS.IS","BIMAS.IS","EKGYO.IS","EREGL.IS","FROTO.IS",
     "GARAN.IS","HEKTS.IS","ISCTR.IS","KCHOL.IS","KOZAA.IS","KOZAL.IS","KRDMD.IS",
     "PETKM.IS","PGSUS.IS","SAHOL.IS","SASA.IS","SISE.IS","TCELL.IS","THYAO.IS",
     "TUPRS.IS","YKBNK.IS"
-]
+])
 
 # Hata Giderildi: latest_state sözlüğünün doğru başlangıç değerleri.
 latest_state = {
     "last_run": None,
     "last_signal": None,
-    "signals": [],
+    "signals": deque(maxlen=SIGNAL_HISTORY),
+    "total_signals": 0,
     "per_symbol": {},
     "running": False,
     "errors": []
 }
+# latest_state'e yayın aşaması thread'i ve ana thread (döngü başı/sonu, zamanlayıcı,
+# anlık görüntü) yalnızca bu kilitle erişir; süre aşımında terk edilen bir yayın
+# çağrısı run() döndükten sonra da sürebilir. Yayın aşaması kilidi tutarken
+# update_status_file'ı çağırdığı için yeniden girilebilir.
+state_lock = threading.RLock()
+
+provider = make_provider(DATA_PROVIDER, fixture_dir=FIXTURE_DIR)
+provider = RateLimitedProvider(provider, TokenBucket(FETCH_RATE, FETCH_BURST), timeout=FETCH_DEADLINE)
+if BAR_CACHE_PATH:
+    provider = CachedProvider(provider, BarCache(BAR_CACHE_PATH))
+
+snapshot_writer = SnapshotWriter(STATE_SNAPSHOT)
+
+signal_store = SignalStore(SIGNAL_DB) if SIGNAL_DB else None
+if signal_store is not None:
+    latest_state["total_signals"] = signal_store.count()
+
+# İşlem takvimi (zamanlayıcı ve bar kapanışı -> yayın gecikmesi ölçümü)
+market = BistCalendar(EXTRA_HOLIDAYS, EXTRA_HALF_DAYS)
+# Aşama süreleri ve uçtan uca gecikmeler (bar kapanışı / döngü başı -> yayın)
+METRIC_HELP = {
+    "bist_stage_seconds": "Aşama başına öğe (sembol grubu / sembol) işleme süresi",
+    "bist_publish_latency_seconds": "Döngü başı / bar kapanışı -> yayın gecikmesi",
+    "bist_symbol_seconds": "Sembol başına hesaplama süresi (indicators: gösterge, sr: destek/direnç)",
+    "bist_batch_seconds": "Grup başına vektörel hesaplama süresi (vector: göstergeler, rules: kurallar)",
+    "bist_fetch_seconds": "Veri kaynağı çağrısı süresi",
+    "bist_fetch_symbols_total": "Veri kaynağından gelen sembol sayısı",
+    "bist_fetch_bars_total": "Veri kaynağından (önbellek dahil) gelen bar sayısı",
+    "bist_fetch_frame_bytes_total": "Veri kaynağından (önbellek dahil) gelen çerçevelerin bellekteki boyutu (bayt)",
+    "bist_fetch_errors_total": "Veri kaynağı hataları",
+    "bist_bar_cache_hits_total": "Bar önbelleğinden artımlı sunulan sembol sayısı",
+    "bist_bar_cache_misses_total": "Soğuk (tam) indirilen sembol sayısı",
+    "bist_bar_cache_bars_downloaded_total": "Önbellek arkasında gerçekten indirilen bar sayısı",
+    "bist_bar_cache_hit_ratio": "Bar önbelleği isabet oranı",
+    "bist_telegram_queue_depth": "Gönderilmeyi bekleyen Telegram mesajı",
+    "bist_telegram_messages_total": "Telegram mesajları (sonuca göre)",
+    "bist_telegram_retries_total": "429 sonrası yeniden denemeler",
+    "bist_telegram_latency_seconds": "Kuyruğa girişten gönderime gecikme (yüzdelik)",
+    "bist_cycle_seconds": "Tarama döngüsü süresi",
+    "bist_cycle_last_seconds": "Son tarama döngüsü süresi",
+    "bist_cycle_budget_ratio": "Son döngü süresi / CHECK_INTERVAL",
+    "bist_cycle_overruns_total": "CHECK_INTERVAL'ı aşan döngüler",
+    "bist_cycle_timeouts_total": "Süresi dolan (yarım kalan) döngüler",
+    "bist_check_interval_seconds": "Tarama aralığı (CHECK_INTERVAL)",
+    "bist_scanned_symbols_total": "Taranan sembol sayısı",
+    "bist_symbol_errors_total": "Hata veya zaman aşımıyla yayınlanamayan semboller",
+    "bist_signals_total": "Yayınlanan yeni sinyaller",
+}
+metrics = MetricsRegistry(help_texts=METRIC_HELP)
+metrics.set("bist_check_interval_seconds", CHECK_INTERVAL)
+
+def observe_latency(name, seconds):
+    """LatencyStats ölçümlerini histogramlara da aktarır."""
+    if name.startswith("stage."):
+        metrics.observe("bist_stage_seconds", seconds, stage=name[len("stage."):])
+    else:
+        metrics.observe("bist_publish_latency_seconds", seconds, kind=name)
+
+pipeline_metrics = LatencyStats(observer=observe_latency)
+# Sembol başına en son tamamlanmış 4H barın kapanışı (yeni bar -> yayın gecikmesi için)
+last_closed_bar = {}
+
+signal_index = (SuppressionIndex(SIGNAL_INDEX_FILE, cooldowns=SIGNAL_COOLDOWNS)
+                if SIGNAL_INDEX_FILE else None)
+
+indicator_bank = (IndicatorBank.load(INDICATOR_STATE_FILE, rsi_period=RSI_PERIOD)
+                  if INDICATOR_ENGINE == "incremental" else None)
+
+# Sembol başına artımlı destek/direnç indeksi (tüm lookback/order ayarları)
+sr_bank = SRBank([(SR_LOOKBACK, SR_ORDER)] + SR_EXTRA_SETTINGS)
 
 # -----------------------
 # TELEGRAM GÖNDERİM FONKSİYONU
 # -----------------------
+_dispatcher = None
+
+def get_dispatcher():
+    """Worker'ın tek arka plan Telegram göndericisini (ilk çağrıda) başlatır."""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = TelegramDispatcher(TELEGRAM_TOKEN, api_base=TELEGRAM_API_BASE).start()
+    return _dispatcher
+
 def send_telegram_message(message):
-    """Mesajı config.py'daki tüm CHAT_IDS'lere HTML formatında gönderir."""
+    """Mesajı config.py'daki tüm CHAT_IDS'ler için gönderim kuyruğuna (HTML) ekler; beklemez."""
     # Hata Giderildi: Eksik ayar kontrolü
     if TELEGRAM_TOKEN == "YOUR_TOKEN" or not CHAT_IDS:
         print("Telegram ayarları eksik veya güncel değil. Mesaj gönderilemedi.")
         return
 
-    url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-    payload = {"text": message, "parse_mode": "HTML"}
-    
+    dispatcher = get_dispatcher()
     for chat_id in CHAT_IDS:
-        try:
-            payload["chat_id"] = chat_id
-            response = requests.post(url, data=payload)
-            if response.status_code != 200:
-                print(f"Telegram'a gönderme hatası ({chat_id}): {response.text}")
-        except Exception as e:
-            print(f"Telegram gönderme istisnası: {e}")
+        if not dispatcher.enqueue(chat_id, message, parse_mode="HTML"):
+            print(f"Telegram kuyruğu dolu, mesaj düşürüldü ({chat_id}).")
 
 # -----------------------
 # YARDIMCI: Durumu Dosyaya Yazma Fonksiyonu
 # -----------------------
 def update_status_file():
-    """latest_state içeriğini yerel bir JSON dosyasına yazar."""
+    """latest_state'in tamamını (özet, per_symbol, son sinyaller, hatalar) anlık görüntü olarak yayınlar."""
     global latest_state
-    
-    # HATA GİDERİLDİ: NoneType kontrolü (AttributeError'ı önler)
-    last_signal_obj = latest_state.get("last_signal")
-    last_signal_time = last_signal_obj.get("time", "Yok") if last_signal_obj else "Yok"
-
-    summary_state = {
-        "running": latest_state.get("running", False),
-        "last_run": latest_state.get("last_run"),
-        "total_signals": len(latest_state.get("signals", [])),
-        "last_signal_time": last_signal_time,
-        "errors_count": len(latest_state.get("errors", [])),
-        "worker_heartbeat": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    }
+    # Şema shared_state.py'dadır (web süreci aynı modülü okur). Metrik toplama da
+    # try içindedir: bir metrik hatası worker döngüsünü durdurmamalı.
     try:
-        with open(STATUS_FILE, 'w') as f:
-            json.dump(summary_state, f, indent=4)
+        with state_lock:
+            snapshot = build_snapshot(latest_state, SNAPSHOT_SIGNALS, rules=RULES.timing(),
+                                      pipeline=pipeline_metrics.summary(), metrics=collect_metrics())
+            if SHARD_ID:
+                snapshot["shard"] = latest_state.get("shard")
+            if latest_state.get("profile"):
+                snapshot["profile"] = latest_state["profile"]
+            snapshot_writer.publish(snapshot)
     except Exception as e:
         print(f"HATA: Durum dosyasına yazılamadı: {e}")
 
+def collect_metrics():
+    """Anlık değerli metrikleri (bar önbelleği, Telegram kuyruğu) günceller ve dışa aktarır."""
+    cache = getattr(provider, "cache", None)
+    if cache is not None:
+        stats = cache.stats()
+        for key in ("hits", "misses", "bars_downloaded"):
+            metrics.set_counter(f"bist_bar_cache_{key}_total", stats[key])
+        if stats["hit_rate"] is not None:
+            metrics.set("bist_bar_cache_hit_ratio", stats["hit_rate"])
+    if _dispatcher is not None:
+        metrics.set("bist_telegram_queue_depth", _dispatcher.depth())
+        for result in ("sent", "failed", "dropped"):
+            metrics.set_counter("bist_telegram_messages_total", _dispatcher.stats[result], result=result)
+        metrics.set_counter("bist_telegram_retries_total", _dispatcher.stats["retries_429"])
+        for q, value in _dispatcher.latency_percentiles().items():
+            if value is not None:
+                metrics.set("bist_telegram_latency_seconds", value, quantile=str(int(q[1:]) / 100))
+    return metrics.export()
+
+# -----------------------
+# PROFİL (istek üzerine tek döngü)
+# -----------------------
+profile_requested = threading.Event()
+
+def request_profile(signum=None, frame=None):
+    """SIGUSR1 işleyicisi: sonraki tarama döngüsü profillenir."""
+    profile_requested.set()
+
+def start_profile_if_requested():
+    """Profil istendiyse (sinyal veya tetik dosyası) örnekleyiciyi başlatır; yoksa None."""
+    wanted = profile_requested.is_set()
+    if PROFILE_TRIGGER and os.path.exists(PROFILE_TRIGGER):
+        wanted = True
+        try:
+            os.remove(PROFILE_TRIGGER)
+        except OSError:
+            pass
+    if not wanted:
+        return None
+    profile_requested.clear()
+    # Tarama thread'leri ve Telegram göndericisi; beklemedeki örnekler sayılmaz
+    return SamplingProfiler(PROFILE_INTERVAL, thread_filter=lambda name: name == "MainThread"
+                            or name.startswith(("pipe-", "telegram"))).start()
+
+def finish_profile(profiler, t0, kind):
+    profiler.stop()
+    path = os.path.join(PROFILE_DIR, f"cycle-{t0:%Y%m%d-%H%M%S}-{kind}.folded")
+    try:
+        profiler.write(path)
+    except OSError as e:
+        print(f"HATA: Profil yazılamadı: {e}")
+        return
+    profile = {"path": path, "time": t0.strftime("%Y-%m-%d %H:%M:%S"), "kind": kind,
+               "seconds": round(profiler.duration, 3), "samples": profiler.samples,
+               "idle_samples": profiler.idle, "top": profiler.top()}
+    with state_lock:
+        latest_state["profile"] = profile
+    print(f"Profil yazıldı: {path} ({profiler.samples} örnek)")
+
 # -----------------------
 # ANALİZ FONKSİYONLARI
 # -----------------------
 def safe_download(symbol, period="90d", interval="4h"):
     try:
-        df = yf.download(symbol, period=period, interval=interval, progress=False, threads=False)
-        return df if df is not None and not df.empty else None
+        return provider.fetch(symbol, period=period, interval=interval)
     except Exception:
         return None
 
-def compute_rsi(series: pd.Series, period=RSI_PERIOD):
+def fetch_universe(symbols, period, interval):
+    """Tüm sembolleri tek toplu çağrıyla indirir: {sembol: DataFrame}."""
+    t0 = time.perf_counter()
+    try:
+        frames = provider.fetch_many(symbols, period=period, interval=interval)
+    except Exception as e:
+        metrics.inc("bist_fetch_errors_total", interval=interval)
+        print(f"Veri kaynağı hatası ({interval}): {e}")
+        return {}
+    metrics.observe("bist_fetch_seconds", time.perf_counter() - t0, interval=interval)
+    metrics.inc("bist_fetch_symbols_total", len(frames), interval=interval)
+    metrics.inc("bist_fetch_bars_total", sum(len(df) for df in frames.values()), interval=interval)
+    # İndirme baytı değil (yfinance yük boyutunu vermez); gerçekten indirilen barlar
+    # bist_bar_cache_bars_downloaded_total'dadır
+    metrics.inc("bist_fetch_frame_bytes_total",
+                sum(int(df.memory_usage(index=True).sum()) for df in frames.values()), interval=interval)
+    return frames
+
+def load_frames(symbols):
+    """(frames_day, frames_4h) döndürür; her biri {sembol: DataFrame}."""
+    if not DERIVE_FROM_INTRADAY:
+        return (fetch_universe(symbols, period=DAY_PERIOD, interval="1d"),
+                fetch_universe(symbols, period=H4_PERIOD, interval="4h"))
+    frames_day, frames_4h = {}, {}
+    for sym, df in fetch_universe(symbols, period=BASE_PERIOD, interval=BASE_INTERVAL).items():
+        derived = derive_frames(df)
+        frames_day[sym] = trim_to_period(derived["1d"], DAY_PERIOD)
+        frames_4h[sym] = trim_to_period(derived["4h"], H4_PERIOD)
+    return frames_day, frames_4h
+
+def compute_rsi(series: pd.Series, period=RSI_PERIOD, state=None):
+    # state (incremental.IndicatorState) verilirse değer artımlı durumdan (görünen pencereye göre) okunur
+    if state is not None: return state.rsi_value
     if series is None or len(series) < period + 1: return None
     delta = series.diff()
     gain = delta.clip(lower=0)
@@ -114,28 +379,29 @@ def compute_rsi(series: pd.Series, period=RSI_PERIOD):
 def support_resistance(df, lookback=SR_LOOKBACK, order=SR_ORDER):
     prices = df["Close"].tail(lookback)
     if prices.empty or len(prices) < (order*2 + 3): return [], []
-    vals = prices.values
-    max_idx = argrelextrema(vals, np.greater, order=order)[0]
-    min_idx = argrelextrema(vals, np.less, order=order)[0]
-    local_max = [float(vals[i]) for i in max_idx]
-    local_min = [float(vals[i]) for i in min_idx]
+    vals = prices.to_numpy(dtype=float).tolist()
+    max_idx, min_idx = local_extrema(vals, order)
     # DeprecationWarning Giderildi: .item() kullanıldı
     cur = float(prices.iloc[-1].item())
-    supports = sorted([v for v in local_min if v < cur], reverse=True)[:3]
-    resistances = sorted([v for v in local_max if v > cur])[:3]
-    return supports, resistances
-
-def detect_ma_crosses(df_day):
-    if df_day is None or df_day.empty or len(df_day) < 210: return []
-    ma20 = df_day["Close"].rolling(20).mean()
-    ma50 = df_day["Close"].rolling(50).mean()
-    ma200 = df_day["Close"].rolling(200).mean()
-    try:
-        # DeprecationWarning Giderildi: .item() kullanıldı
-        ma20_now, ma20_prev = float(ma20.iloc[-1].item()), float(ma20.iloc[-2].item())
-        ma50_now, ma50_prev = float(ma50.iloc[-1].item()), float(ma50.iloc[-2].item())
-        ma200_now, ma200_prev = float(ma200.iloc[-1].item()), float(ma200.iloc[-2].item())
-    except Exception: return []
+    return nearest_levels([vals[i] for i in max_idx], [vals[i] for i in min_idx], cur)
+
+def detect_ma_crosses(df_day, state=None):
+    if state is not None:
+        if state.visible < 210: return []
+        ma20_now, ma20_prev = state.ma20.value, state.ma20.prev
+        ma50_now, ma50_prev = state.ma50.value, state.ma50.prev
+        ma200_now, ma200_prev = state.ma200.value, state.ma200.prev
+    else:
+        if df_day is None or df_day.empty or len(df_day) < 210: return []
+        ma20 = df_day["Close"].rolling(20).mean()
+        ma50 = df_day["Close"].rolling(50).mean()
+        ma200 = df_day["Close"].rolling(200).mean()
+        try:
+            # DeprecationWarning Giderildi: .item() kullanıldı
+            ma20_now, ma20_prev = float(ma20.iloc[-1].item()), float(ma20.iloc[-2].item())
+            ma50_now, ma50_prev = float(ma50.iloc[-1].item()), float(ma50.iloc[-2].item())
+            ma200_now, ma200_prev = float(ma200.iloc[-1].item()), float(ma200.iloc[-2].item())
+        except Exception: return []
     out = []
     if ma20_prev <= ma50_prev and ma20_now > ma50_now: out.append("MA20↑MA50")
     if ma20_prev >= ma50_prev and ma20_now < ma50_now: out.append("MA20↓MA50")
@@ -143,41 +409,54 @@ def detect_ma_crosses(df_day):
     if ma50_prev >= ma200_prev and ma50_now < ma200_now: out.append("MA50↓MA200")
     return out
 
-def detect_volume_spike(df_h4):
-    if df_h4 is None or df_h4.empty or len(df_h4) < 22: return False, None, None
-    vols = df_h4["Volume"].astype(float)
-    avg20 = vols.iloc[-21:-1].mean()
-    # DeprecationWarning Giderildi: .item() kullanıldı
-    last = float(vols.iloc[-1].item())
+def detect_volume_spike(df_h4, state=None):
+    if state is not None:
+        if state.visible < 22: return False, None, None
+        avg20, last = state.volume.average, float(state.volume.last)
+    else:
+        if df_h4 is None or df_h4.empty or len(df_h4) < 22: return False, None, None
+        vols = df_h4["Volume"].astype(float)
+        avg20 = vols.iloc[-21:-1].mean()
+        # DeprecationWarning Giderildi: .item() kullanıldı
+        last = float(vols.iloc[-1].item())
     if avg20 > 0 and last > avg20 * VOL_FACTOR: return True, last, avg20
     return False, last, avg20
 
-def is_yesil1_daily(df_day):
+def is_yesil1_daily(df_day, state=None):
     if df_day is None or len(df_day) < 2: return False
     last = df_day.iloc[-1]
     # DeprecationWarning Giderildi: .item() kullanıldı
     if float(last["Close"].item()) <= float(last["Open"].item()): return False
-    rsi_prev = compute_rsi(df_day["Close"].iloc[:-1])
-    rsi_now = compute_rsi(df_day["Close"])
+    if state is not None:
+        rsi_prev, rsi_now = state.rsi_prev, state.rsi_value
+    else:
+        rsi_prev = compute_rsi(df_day["Close"].iloc[:-1])
+        rsi_now = compute_rsi(df_day["Close"])
     if rsi_prev is None or rsi_now is None: return False
     return rsi_now > rsi_prev
 
-def is_yesil2_4h(df_h4):
+def is_yesil2_4h(df_h4, state=None):
     if df_h4 is None or len(df_h4) < 2: return False
     last1 = df_h4.iloc[-1]
-    last2 = df_4h.iloc[-2]
+    last2 = df_h4.iloc[-2]
     # DeprecationWarning Giderildi: .item() kullanıldı
     if not (float(last1["Close"].item()) > float(last1["Open"].item()) and float(last2["Close"].item()) > float(last2["Open"].item())): return False
-    rsi_now = compute_rsi(df_h4["Close"])
+    rsi_now = compute_rsi(df_h4["Close"], state=state)
     if rsi_now is None or rsi_now > 60: return False
-    # DeprecationWarning Giderildi: .item() kullanıldı
-    ema20 = df_h4["Close"].ewm(span=20).mean().iloc[-1].item()
+    if state is not None:
+        ema20 = state.ema20_value
+    else:
+        # DeprecationWarning Giderildi: .item() kullanıldı
+        ema20 = df_h4["Close"].ewm(span=20).mean().iloc[-1].item()
     if float(last1["Close"].item()) < ema20: return False
     return True
 
-def today_trend_break(df):
+def today_trend_break(df, levels=None):
+    """levels: aynı frame için zaten hesaplanmış (supports, resistances); verilmezse hesaplanır."""
     if df is None or len(df) < 5: return None
-    supports, resistances = support_resistance(df, lookback=SR_LOOKBACK, order=SR_ORDER)
+    if levels is None:
+        levels = support_resistance(df, lookback=SR_LOOKBACK, order=SR_ORDER)
+    supports, resistances = levels
     closes, highs, lows = df["Close"].values, df["High"].values, df["Low"].values
     # DeprecationWarning Giderildi: .item() kullanıldı
     prev_close = float(closes[-2].item())
@@ -193,103 +472,391 @@ def today_trend_break(df):
         if today_low < last_sup and prev_close >= last_sup: return ("sup_break", last_sup)
     return None
 
+def check_indicator_engine(frames_day, frames_4h, symbols=None, tol=1e-9):
+    """Vektörel motoru tekil fonksiyonlarla karşılaştırır; uyuşmazlıkları listeler."""
+    symbols = symbols or list(frames_4h)
+    ind = compute_universe(frames_day, frames_4h, symbols, rsi_period=RSI_PERIOD, vol_factor=VOL_FACTOR)
+    mismatches = []
+    for sym in ind.symbols:
+        df_day, df_4h = frames_day[sym], frames_4h[sym]
+        vol_spike, last_vol, avg_vol = detect_volume_spike(df_4h)
+        expected = {"price": float(df_4h["Close"].iloc[-1].item()), "rsi4h": compute_rsi(df_4h["Close"]),
+                    "ma_crosses": detect_ma_crosses(df_day), "vol_spike": vol_spike,
+                    "last_vol": last_vol, "avg_vol": avg_vol,
+                    "g1": is_yesil1_daily(df_day), "g2": is_yesil2_4h(df_4h)}
+        got = ind.row(sym)
+        for key, exp in expected.items():
+            val = got[key]
+            if isinstance(exp, float) and isinstance(val, float):
+                same = (np.isnan(exp) and np.isnan(val)) or abs(exp - val) <= tol * max(1.0, abs(exp))
+            else:
+                same = exp == val
+            if not same:
+                mismatches.append({"symbol": sym, "field": key, "expected": exp, "got": val})
+    return mismatches
+
 def decide_strength(g1, g2, ma_crosses, vol_spike, rsi4h):
-    if g1 and g2 and ("MA50↑MA200" in ma_crosses) and vol_spike and (rsi4h is None or rsi4h < 70): return "strong_buy"
-    if (g1 and g2) or ("MA20↑MA50" in ma_crosses): return "buy"
-    if ("MA50↓MA200" in ma_crosses) and vol_spike and (rsi4h is not None and rsi4h > 60): return "strong_sell"
-    if ("MA20↓MA50" in ma_crosses): return "sell"
-    return None
+    """rules.json'daki güç kuralları (ilk eşleşen) tek sembol için."""
+    row = {"g1": g1, "g2": g2, "ma_crosses": ma_crosses, "vol_spike": vol_spike, "rsi4h": rsi4h}
+    return RULES.evaluate(features_from_rows([row])).strength(0)
 
 # -----------------------
 # SCANNER (ANA İŞ DÖNGÜSÜ)
 # -----------------------
+def summarize_symbol(sym, df_day, df_4h, ind=None):
+    """Tek sembolün per_symbol özeti ve kural özellik satırı: (summary, row)."""
+    t0 = time.perf_counter()
+    if ind is not None and sym in ind.index:
+        row = ind.row(sym)
+        price, rsi4h, ma_crosses = row["price"], row["rsi4h"], row["ma_crosses"]
+        vol_spike, last_vol, avg_vol = row["vol_spike"], row["last_vol"], row["avg_vol"]
+        g1, g2 = row["g1"], row["g2"]
+    else:
+        st_day = st_4h = None
+        if indicator_bank is not None:
+            indicator_bank.sync_frame(sym, "1d", df_day)
+            indicator_bank.sync_frame(sym, "4h", df_4h)
+            st_day, st_4h = indicator_bank.get(sym, "1d"), indicator_bank.get(sym, "4h")
+        # DeprecationWarning Giderildi: .item() kullanıldı
+        price = float(df_4h["Close"].iloc[-1].item())
+        rsi4h = compute_rsi(df_4h["Close"], state=st_4h)
+        ma_crosses = detect_ma_crosses(df_day, state=st_day)
+        vol_spike, last_vol, avg_vol = detect_volume_spike(df_4h, state=st_4h)
+        g1 = is_yesil1_daily(df_day, state=st_day)
+        g2 = is_yesil2_4h(df_4h, state=st_4h)
+    t1 = time.perf_counter()
+    metrics.observe("bist_symbol_seconds", t1 - t0, phase="indicators")
+    # Seviyeler bir kez (artımlı indeksten) alınır; trend kırılımı aynılarını kullanır
+    sr_bank.sync_frame(sym, "4h", df_4h)
+    sr_index = sr_bank.index(sym, "4h", SR_LOOKBACK, SR_ORDER)
+    supports, resistances = sr_index.nearest()
+    trend = today_trend_break(df_4h, levels=(supports, resistances))
+    zones = [z for z in sr_index.zones(SR_ZONE_TOLERANCE) if z["touches"] > 1]
+    sr_levels = {f"{lb}/{od}": dict(zip(("supports", "resistances"),
+                                        sr_bank.index(sym, "4h", lb, od).nearest()))
+                 for lb, od in SR_EXTRA_SETTINGS}
+    metrics.observe("bist_symbol_seconds", time.perf_counter() - t1, phase="sr")
+
+    summary = {"symbol": sym, "price": price, "rsi4h": rsi4h,
+               "supports": supports, "resistances": resistances,
+               "ma_crosses": ma_crosses, "vol_spike": vol_spike,
+               "last_vol": int(last_vol) if last_vol else None, 
+               "avg_vol": int(avg_vol) if avg_vol else None,
+               "g1": g1, "g2": g2, "trend": trend,
+               "sr_zones": [[z["low"], z["high"], z["touches"]] for z in zones],
+               "sr_levels": sr_levels,
+               "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+    # Kurallar ham hacim değerlerini görür (özette int'e yuvarlanır)
+    return summary, dict(summary, last_vol=last_vol, avg_vol=avg_vol)
+
+def trigger_value(name, row):
+    """Tetikleyicinin sinyal indeksindeki/mesajdaki değeri (yerleşik tetikleyiciler eski biçimde)."""
+    if name == "volume": return {"last": int(row["last_vol"]), "avg": int(row["avg_vol"])}
+    if name == "ma": return row["ma_crosses"]
+    if name == "trend": return row["trend"]
+    if name in ("rsi_low", "rsi_high"): return round(row["rsi4h"], 1)
+    return True
+
+def trigger_label(rule, row):
+    # Şablon alanları yüklemede denetlenir (signal_rules.LABEL_FIELDS)
+    return rule.label.format_map(label_context(row))
+
+def evaluate_rules(rows):
+    """Tüm satırlar için kuralları tek geçişte değerlendirir: [(tetiklenenler, güç)]."""
+    if not rows: return []
+    result = RULES.evaluate(features_from_rows(rows))
+    return [(result.fired(i), result.strength(i)) for i in range(len(rows))]
+
+def emit_signal(sym, df_day, df_4h, row, fired, strength):
+    """Tetiklenen kurallardan sinyal mesajını üretir ve gönderir; bastırılırsa None."""
+    if not fired:
+        return None
+    triggered = {name: trigger_value(name, row) for name in fired}
+
+    # Aynı koşul art arda taramalarda tekrar gönderilmesin: (sembol, tetikleyici, seviye/bar)
+    if signal_index is not None:
+        bar_4h, bar_day = str(df_4h.index[-1]), str(df_day.index[-1])
+        levels = {"green12": bar_4h, "volume": bar_4h, "rsi_low": None, "rsi_high": None}
+        trigger_levels = {}
+        for key, value in triggered.items():
+            if key == "ma":
+                for cross in value: trigger_levels[f"ma:{cross}"] = bar_day
+            elif key == "trend":
+                trigger_levels["trend"] = f"{value[0]}@{value[1]:.4g}"
+            else:
+                trigger_levels[key] = levels.get(key, bar_4h)
+        if not signal_index.should_emit(sym, trigger_levels, strength):
+            return None
+
+    rules = {rule.name: rule for rule in RULES.triggers}
+    parts = [trigger_label(rules[name], row) for name in fired]
+    price = row["price"]
+
+    msg = {"symbol": sym, "price": price, "parts": parts, "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "strength": strength}
+    
+    # Hata Giderildi: strength None iken ("buy" in None) TypeError sinyali düşürüyordu
+    emoji = "🚀 AL" if strength and "buy" in strength else ("🔻 SAT" if strength and "sell" in strength else "🔔 SİNYAL")
+    telegram_msg = (
+        f"{emoji} <b>CANLI SİNYAL: {msg['symbol'].replace('.IS','')}</b>\n"
+        f"  • Güç: <b>{strength.upper() if strength else 'NORMAL'}</b>\n"
+        f"  • Fiyat: {msg['price']:.2f} ₺\n"
+        f"  • Tetikleyiciler: {', '.join(msg['parts'])}\n"
+        f"  • Zaman: {msg['time']}"
+    )
+    send_telegram_message(telegram_msg)
+    return msg
+
+def analyze_symbol(sym, df_day, df_4h, ind=None):
+    """Tek sembolün per_symbol özetini ve (tetiklenmişse) sinyal mesajını üretir: (summary, msg)."""
+    summary, row = summarize_symbol(sym, df_day, df_4h, ind)
+    (fired, strength), = evaluate_rules([row])
+    return summary, emit_signal(sym, df_day, df_4h, row, fired, strength)
+
+# -----------------------
+# AŞAMALI TARAMA (indir -> göstergeler -> kurallar -> yayın)
+# -----------------------
+def stage_fetch(chunk):
+    """Sembol grubunu indirir (günlük/4H aynı kaynaktan)."""
+    frames_day, frames_4h = load_frames(chunk)
+    return [{"symbols": chunk, "frames_day": frames_day, "frames_4h": frames_4h}]
+
+def stage_indicators(batch):
+    """Grubun göstergelerini (vektörel) hesaplar ve sembol özetlerini çıkarır."""
+    frames_day, frames_4h = batch["frames_day"], batch["frames_4h"]
+    symbols = [s for s in batch["symbols"] if frames_day.get(s) is not None and frames_4h.get(s) is not None]
+    ind = None
+    if INDICATOR_ENGINE == "vector" and symbols:
+        try:
+            with metrics.time("bist_batch_seconds", phase="vector"):
+                ind = compute_universe(frames_day, frames_4h, symbols, rsi_period=RSI_PERIOD,
+                                       vol_factor=VOL_FACTOR)
+        except Exception as e:
+            print(f"Vektörel gösterge hatası, tekil hesaplamaya dönülüyor: {e}")
+    batch["rows"], batch["errors"] = {}, []
+    for sym in symbols:
+        try:
+            batch["rows"][sym] = summarize_symbol(sym, frames_day[sym], frames_4h[sym], ind)
+        except Exception as e:
+            batch["errors"].append({"symbol": sym, "error": str(e)})
+    return [batch]
+
+def stage_rules(batch):
+    """Kuralları grup için tek vektörel geçişte değerlendirir; sembol başına öğe üretir."""
+    out = [{"error": e} for e in batch["errors"]]
+    with metrics.time("bist_batch_seconds", phase="rules"):
+        verdicts = evaluate_rules([row for _, row in batch["rows"].values()])
+    for (sym, (summary, row)), (fired, strength) in zip(batch["rows"].items(), verdicts):
+        out.append({"symbol": sym, "summary": summary, "row": row, "fired": fired, "strength": strength,
+                    "df_day": batch["frames_day"][sym], "df_4h": batch["frames_4h"][sym]})
+    return out
+
+def item_symbols(item):
+    """Aşama öğesinin (grup, parti veya sembol sonucu) kapsadığı semboller."""
+    if isinstance(item, list): return item
+    if "symbol" in item: return [item["symbol"]]
+    if "error" in item: return [item["error"]["symbol"]]
+    return item.get("symbols", [])
+
+def make_publisher(cycle):
+    """Sembol sonucunu hemen yayınlayan son aşama: sinyal (Telegram kuyruğu + depo) ve durum dosyası."""
+    def publish(item):
+        with state_lock:
+            _publish(item)
+
+    def _publish(item):
+        if "error" in item:
+            cycle["errors"].append(item["error"])
+            return
+        sym = item["symbol"]
+        msg = emit_signal(sym, item["df_day"], item["df_4h"], item["row"], item["fired"], item["strength"])
+        latest_state["per_symbol"][sym] = item["summary"]
+        cycle["published"].add(sym)
+        now = time.time()
+        pipeline_metrics.add("cycle_to_publish", now - cycle["started"])
+        # Bar kapanışı -> yayın: yalnızca sembolün yeni tamamlanan ilk barında ölçülür
+        closes = [market.bar_close(ts).timestamp() for ts in item["df_4h"].index[-2:]]
+        bar_close = max([c for c in closes if c <= now], default=None)
+        new_bar = bar_close is not None and last_closed_bar.get(sym, bar_close) < bar_close
+        if bar_close is not None:
+            last_closed_bar[sym] = bar_close
+        if new_bar:
+            pipeline_metrics.add("bar_to_publish", now - bar_close)
+        if msg:
+            cycle["new_signals"] += 1
+            latest_state["signals"].append(msg)
+            latest_state["last_signal"] = msg
+            latest_state["total_signals"] += 1
+            pipeline_metrics.add("signal_cycle_to_publish", now - cycle["started"])
+            if new_bar:
+                pipeline_metrics.add("signal_bar_to_publish", now - bar_close)
+            if signal_store is not None:
+                try:
+                    signal_store.append(msg)
+                except Exception as e:
+                    print(f"HATA: Sinyal depoya yazılamadı: {e}")
+        # Sinyal hemen, diğer güncellemeler en fazla PUBLISH_INTERVAL'da bir yayınlanır
+        if msg or now - cycle["last_publish"] >= PUBLISH_INTERVAL:
+            update_status_file()
+            cycle["last_publish"] = time.time()
+    return publish
+
+def owned_symbols():
+    """Bu worker'ın sembolleri: shard modunda halkadaki payı (her döngüde yeniden hesaplanır), değilse tümü."""
+    if not SHARD_ID:
+        return list(SYMBOLS)
+    members = live_members(SHARD_DIR, SHARD_ID, SHARD_TTL, SHARD_MEMBERS)
+    owned = HashRing(members).owned(SYMBOLS, SHARD_ID)
+    with state_lock:
+        previous = latest_state.get("shard")
+        latest_state["shard"] = {"id": SHARD_ID, "members": members, "owned": len(owned),
+                                 "universe": len(SYMBOLS)}
+    if previous is not None and previous["members"] != members:
+        print(f"Shard üyeliği değişti: {previous['members']} -> {members} ({len(owned)} sembol)")
+    return owned
+
+def scan_cycle(symbols=None):
+    """Sembolleri (verilmezse tümünü) aşamalı akışla tarar; yeni sinyal sayısını döndürür.
+
+    Her sembolün özeti ve sinyali hazır olur olmaz yayınlanır. Alt küme taranırken
+    diğer sembollerin son özetleri korunur.
+    """
+    global latest_state
+    t0 = datetime.now()
+    with state_lock:
+        latest_state["last_run"] = t0.strftime("%Y-%m-%d %H:%M:%S")
+    partial = symbols is not None
+    kind = "refresh" if partial else "full"
+    profiler = start_profile_if_requested()
+    universe = owned_symbols()
+    owned = set(universe)
+    symbols = universe if symbols is None else [s for s in symbols if s in owned]
+    # Başka shard'a geçen sembollerin satırları bırakılır (yeni sahibi yayınlar)
+    with state_lock:
+        previous = {s: row for s, row in latest_state["per_symbol"].items() if s in owned}
+        latest_state["per_symbol"] = dict(previous)
+    cycle = {"started": time.time(), "errors": [], "published": set(), "stale": set(),
+             "new_signals": 0, "last_publish": 0.0}
+
+    def on_error(stage, item, exc):
+        for sym in item_symbols(item):
+            cycle["errors"].append({"symbol": sym, "error": str(exc)})
+
+    def on_stale(stage, item, reason):
+        # Süresini aşan grup diğerlerini bekletmez; sembollerinin son özeti döngü sonunda
+        # "stale" işaretlenir (ana thread'de çağrılır, latest_state'e burada dokunulmaz)
+        for sym in item_symbols(item):
+            cycle["errors"].append({"symbol": sym, "error": reason})
+            if sym in previous:
+                cycle["stale"].add(sym)
+
+    if SCAN_MODE == "concurrent":
+        chunks, fetch_workers = [[sym] for sym in symbols], SCAN_CONCURRENCY
+    else:
+        chunks = [symbols[i:i + SCAN_CHUNK] for i in range(0, len(symbols), SCAN_CHUNK)]
+        fetch_workers = BATCH_FETCH_WORKERS
+    # Gösterge/kural/yayın aşamaları birer thread: sr_bank ve indicator_bank paylaşılmaz.
+    # latest_state'e her erişim state_lock altındadır.
+    # Süre sınırı grup başınadır (batch modda SCAN_CHUNK sembol birlikte stale olur)
+    pipeline = Pipeline([Stage("fetch", stage_fetch, workers=fetch_workers, deadline=FETCH_DEADLINE),
+                         Stage("indicators", stage_indicators),
+                         Stage("rules", stage_rules),
+                         Stage("publish", make_publisher(cycle))],
+                        metrics=pipeline_metrics, on_error=on_error, on_stale=on_stale)
+    if not pipeline.run(chunks, deadline=CHECK_INTERVAL):
+        metrics.inc("bist_cycle_timeouts_total", kind=kind)
+
+    with state_lock:
+        for sym in cycle["stale"] - cycle["published"]:
+            latest_state["per_symbol"][sym] = dict(previous[sym], stale=True)
+        if not partial:
+            # Tam taramada yalnızca bu döngüde yayınlanan ve stale semboller kalır
+            keep = cycle["published"] | cycle["stale"]
+            latest_state["per_symbol"] = {s: latest_state["per_symbol"][s] for s in universe
+                                          if s in keep and s in latest_state["per_symbol"]}
+        latest_state["errors"] = cycle["errors"]
+
+    if indicator_bank is not None:
+        try:
+            indicator_bank.save(INDICATOR_STATE_FILE)
+        except Exception as e:
+            print(f"HATA: Gösterge durumu kaydedilemedi: {e}")
+    if signal_index is not None:
+        try:
+            signal_index.save()
+        except Exception as e:
+            print(f"HATA: Sinyal indeksi kaydedilemedi: {e}")
+
+    elapsed = time.time() - cycle["started"]
+    metrics.observe("bist_cycle_seconds", elapsed, kind=kind)
+    metrics.set("bist_cycle_last_seconds", elapsed, kind=kind)
+    metrics.set("bist_cycle_budget_ratio", elapsed / CHECK_INTERVAL, kind=kind)
+    if elapsed > CHECK_INTERVAL:
+        metrics.inc("bist_cycle_overruns_total", kind=kind)
+    metrics.inc("bist_scanned_symbols_total", len(symbols), kind=kind)
+    metrics.inc("bist_symbol_errors_total", len(cycle["errors"]), kind=kind)
+    metrics.inc("bist_signals_total", cycle["new_signals"])
+    if profiler is not None:
+        finish_profile(profiler, t0, kind)
+
+    update_status_file()
+    return cycle["new_signals"]
+
 def scanner_loop():
     global latest_state
-    latest_state["running"] = True
+    with state_lock:
+        latest_state["running"] = True
+    if SCHEDULE_MODE == "fixed":
+        while True:
+            t0 = datetime.now()
+            n_signals = scan_cycle()
+
+            elapsed = (datetime.now() - t0).total_seconds()
+            wait = max(1, CHECK_INTERVAL - elapsed)
+            print(f"Tarama tamamlandı. {n_signals} yeni sinyal bulundu. {wait:.1f} saniye bekleniyor...")
+            time.sleep(wait)
+
+    scheduler = ScanScheduler(market, refresh_interval=CHECK_INTERVAL, close_delay=BAR_CLOSE_DELAY)
+    if not market.known_year(datetime.now().year):
+        print("UYARI: Bu yılın dini bayramları takvimde yok; BIST_HOLIDAYS ile eklenmeli.")
+    kind = "full"   # başlangıçta her zaman tam tarama
     while True:
-        t0 = datetime.now()
-        latest_state["last_run"] = t0.strftime("%Y-%m-%d %H:%M:%S")
-        new_signals, errors, per_symbol = [], [], {}
-        
-        for sym in SYMBOLS:
-            try:
-                df_day = safe_download(sym, period="120d", interval="1d")
-                df_4h = safe_download(sym, period="90d", interval="4h")
-                if df_day is None or df_4h is None: continue
-                
-                # DeprecationWarning Giderildi: .item() kullanıldı
-                price = float(df_4h["Close"].iloc[-1].item())
-                rsi4h = compute_rsi(df_4h["Close"])
-                supports, resistances = support_resistance(df_4h)
-                ma_crosses = detect_ma_crosses(df_day)
-                vol_spike, last_vol, avg_vol = detect_volume_spike(df_4h)
-                g1 = is_yesil1_daily(df_day)
-                g2 = is_yesil2_4h(df_4h)
-                trend = today_trend_break(df_4h)
-
-                summary = {"symbol": sym, "price": price, "rsi4h": rsi4h,
-                           "supports": supports, "resistances": resistances,
-                           "ma_crosses": ma_crosses, "vol_spike": vol_spike,
-                           "last_vol": int(last_vol) if last_vol else None, 
-                           "avg_vol": int(avg_vol) if avg_vol else None,
-                           "g1": g1, "g2": g2, "trend": trend,
-                           "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-                per_symbol[sym] = summary
-
-                triggered = {}
-                if g1 and g2: triggered["green12"] = True
-                if vol_spike: triggered["volume"] = {"last": int(last_vol), "avg": int(avg_vol)}
-                if ma_crosses: triggered["ma"] = ma_crosses
-                if trend: triggered["trend"] = trend
-                if rsi4h is not None and rsi4h < 20: triggered["rsi_low"] = round(rsi4h,1)
-                if rsi4h is not None and rsi4h > 80: triggered["rsi_high"] = round(rsi4h,1)
-
-                strength = decide_strength(g1, g2, ma_crosses, vol_spike, rsi4h)
-                
-                if triggered:
-                    parts = []
-                    if "green12" in triggered: parts.append("Günlük G1 + 4H G2")
-                    if "volume" in triggered: parts.append("Hacim Spike")
-                    if "ma" in triggered: parts.append(",".join(triggered["ma"]))
-                    if "trend" in triggered: parts.append("Trend Kırılımı")
-                    if "rsi_low" in triggered: parts.append(f"RSI Düşük({triggered['rsi_low']})")
-                    if "rsi_high" in triggered: parts.append(f"RSI Yüksek({triggered['rsi_high']})")
-
-                    msg = {"symbol": sym, "price": price, "parts": parts, "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "strength": strength}
-                    
-                    emoji = "🚀 AL" if "buy" in strength else ("🔻 SAT" if "sell" in strength else "🔔 SİNYAL")
-                    telegram_msg = (
-                        f"{emoji} <b>CANLI SİNYAL: {msg['symbol'].replace('.IS','')}</b>\n"
-                        f"  • Güç: <b>{strength.upper() if strength else 'NORMAL'}</b>\n"
-                        f"  • Fiyat: {msg['price']:.2f} ₺\n"
-                        f"  • Tetikleyiciler: {', '.join(msg['parts'])}\n"
-                        f"  • Zaman: {msg['time']}"
-                    )
-                    send_telegram_message(telegram_msg)
-
-                    new_signals.append(msg)
-                    latest_state["last_signal"] = msg
-                    
-            except Exception as e:
-                errors.append({"symbol": sym, "error": str(e)})
-
-        latest_state["per_symbol"] = per_symbol
-        latest_state["signals"].extend(new_signals) 
-        latest_state["errors"] = errors
-        
-        update_status_file() 
-
-        elapsed = (datetime.now() - t0).total_seconds()
-        wait = max(1, CHECK_INTERVAL - elapsed)
-        print(f"Tarama tamamlandı. {len(new_signals)} yeni sinyal bulundu. {wait:.1f} saniye bekleniyor...")
-        time.sleep(wait)
+        if kind == "full":
+            symbols = None
+        else:
+            with state_lock:
+                per_symbol = dict(latest_state["per_symbol"])
+            symbols = priority_symbols(per_symbol, REFRESH_SR_PCT, REFRESH_VOL_RATIO, REFRESH_MAX_SYMBOLS)
+        n_signals = 0
+        if symbols is None or symbols:   # öncelikli sembol yoksa yenileme atlanır
+            n_signals = scan_cycle(symbols)
+        with state_lock:
+            scanned = len(latest_state["per_symbol"]) if symbols is None else len(symbols)
+
+        now = datetime.now(tz=SESSION_ZONE)
+        when, kind, reason = scheduler.next_run(now)
+        with state_lock:
+            latest_state["schedule"] = {"market_open": market.is_open(now),
+                                        "next_scan": f"{when:%Y-%m-%d %H:%M:%S}",
+                                        "next_kind": kind, "reason": reason}
+        print(f"Tarama tamamlandı ({scanned} sembol). {n_signals} yeni sinyal bulundu. "
+              f"Sonraki: {kind} @ {when:%Y-%m-%d %H:%M:%S} ({reason})")
+        update_status_file()
+        # Uzun beklemelerde (gece, hafta sonu, tatil) durum dosyası düzenli yenilenir
+        while True:
+            remaining = (when - datetime.now(tz=SESSION_ZONE)).total_seconds()
+            if remaining <= 0: break
+            time.sleep(min(remaining, IDLE_HEARTBEAT))
+            update_status_file()
 
 # -----------------------
 # WORKER BAŞLANGICI
 # -----------------------
 if __name__ == "__main__":
     print("BIST Sinyal Worker Başlatılıyor...")
-    send_telegram_message("🔔 <b>BIST Sinyal Worker Aktif!</b>\nTarama döngüsü başlatıldı.")
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, request_profile)
+    shard_note = f" (shard {SHARD_ID})" if SHARD_ID else ""
+    send_telegram_message(f"🔔 <b>BIST Sinyal Worker Aktif!</b>{shard_note}\nTarama döngüsü başlatıldı.")
     
     update_status_file() 
     
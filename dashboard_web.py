@@ -1,192 +1,238 @@
 # dashboard_web.py (WEB SERVİSİ - Webhook ve Dashboard)
 
-import json
-import time
-from datetime import datetime
 from flask import Flask, Response, render_template_string, request, jsonify
 from flask_cors import CORS
 import requests
+import gzip
+import json
 import os
-
-# Worker ile paylaşılan durum dosyasının adı
-STATUS_FILE = "status.json"
+import threading
+from datetime import datetime
+from config import TELEGRAM_TOKEN
+from signal_store import SignalStore
+from shared_state import CORRUPT_ERROR, SnapshotReader, offline_state
+from sharding import DEFAULT_TTL, ShardedSnapshotReader
+from state_broadcast import StateBroadcaster
+from telegram_commands import SnapshotIndex, handle_command
+from telegram_dispatch import API_BASE, TelegramDispatcher
+from telemetry import MetricsRegistry, render_prometheus
+
+# Worker ile paylaşılan durum anlık görüntüsü (atomik, sürümlü)
+STATE_SNAPSHOT = os.environ.get("BIST_STATE_SNAPSHOT", "state.snap")
+# Worker'ın sinyal geçmişini yazdığı SQLite deposu (salt-okunur açılır)
+SIGNAL_DB = os.environ.get("BIST_SIGNAL_DB", "signals.db")
+# Worker'ın bar önbelleği (salt-okunur açılır); sembol detay grafiği buradan beslenir
+BAR_CACHE = os.environ.get("BIST_BAR_CACHE", "bars.db")
+# Shard modu: doluysa worker'lar bu dizine <shard>.snap yazar ve web hepsini birleştirir
+SHARD_DIR = os.environ.get("BIST_SHARD_DIR", "")
+SHARD_TTL = int(os.environ.get("BIST_SHARD_TTL", str(DEFAULT_TTL)))
+# Kalp atışı bu süreden eskiyse worker kapalı sayılır (anlık görüntü çöken worker'dan kalabilir)
+WORKER_TTL = int(os.environ.get("BIST_WORKER_TTL", str(SHARD_TTL)))
+# Worker süreci başına en fazla SSE istemcisi (bkz. gunicorn.conf.py)
+MAX_SSE_CLIENTS = int(os.environ.get("BIST_MAX_SSE_CLIENTS", "500"))
+# Bu boyuttan küçük yanıtlar sıkıştırılmaz
+GZIP_MIN_SIZE = 512
+# Telegram API adresi (benchmark/replay için yerel stub'a yönlendirilebilir)
+TELEGRAM_API_BASE = os.environ.get("BIST_TELEGRAM_API_BASE", API_BASE)
 
 app = Flask("bist_dashboard")
 CORS(app)
 
+def count_signals():
+    store = get_signal_store()
+    return store.count() if store is not None else None
+
+if SHARD_DIR:
+    # Toplam sinyal ortak depodan (shard sayaçları aynı depodan başladığı için toplanamaz)
+    snapshot_reader = ShardedSnapshotReader(SHARD_DIR, ttl=SHARD_TTL, count_signals=count_signals)
+else:
+    snapshot_reader = SnapshotReader(STATE_SNAPSHOT)
+
 # -----------------------
 # YARDIMCI: Durum Dosyasını Okuma
 # -----------------------
-def get_worker_status():
-    """Worker'ın kaydettiği durum dosyasını okur."""
+def get_snapshot():
+    """Worker'ın son anlık görüntüsünü döndürür (generation değişmediyse yeniden ayrıştırılmaz)."""
     try:
-        with open(STATUS_FILE, 'r') as f:
-            return json.load(f)
+        _, state = snapshot_reader.get()
+        return state
     except FileNotFoundError:
         # Worker henüz dosyayı oluşturmadıysa veya durduysa
-        return {"running": False, "error": "Status dosyası bulunamadı (Worker aktif değil)."}
-    except json.JSONDecodeError:
-        # Dosya bozuksa
-        return {"running": False, "error": "Status dosyası okunamıyor (Bozuk format)."}
+        return offline_state()
+    except ValueError:
+        # Dosya bozuksa (atomik yazım sayesinde normalde oluşmaz)
+        return offline_state(CORRUPT_ERROR)
     except Exception as e:
-        return {"running": False, "error": f"Dosya okuma hatası: {e}"}
+        return offline_state(f"Dosya okuma hatası: {e}")
+
+def get_worker_status():
+    """Anlık görüntüdeki özet durum (webhook ve SSE için)."""
+    snap = get_snapshot()
+    status = dict(snap.get("status", {}))
+    if "generation" in snap:
+        status["generation"] = snap["generation"]
+    return status
+
+_signal_store = None
+_signal_lock = threading.Lock()
+
+def get_signal_store():
+    """Süreç başına tek salt-okunur sinyal deposu; worker henüz oluşturmadıysa None.
+
+    Bağlantı istekler arasında paylaşılır (SignalStore kendi kilidiyle sıralar).
+    """
+    global _signal_store
+    with _signal_lock:
+        if _signal_store is None and os.path.exists(SIGNAL_DB):
+            _signal_store = SignalStore(SIGNAL_DB, readonly=True)
+        return _signal_store
+
+_ohlc_history = None
+_ohlc_lock = threading.Lock()
+
+def get_ohlc_history():
+    """Grafik servisi (ohlc_history.py); bar önbelleği henüz yoksa None.
+
+    Gösterge modülleri ilk grafik isteğinde içe aktarılır (web içe aktarma bütçesi).
+    """
+    global _ohlc_history
+    with _ohlc_lock:
+        if _ohlc_history is None and os.path.exists(BAR_CACHE):
+            from ohlc_history import OHLCHistory
+            _ohlc_history = OHLCHistory(BAR_CACHE)
+        return _ohlc_history
+
+# -----------------------
+# YARDIMCI: Koşullu GET (ETag) ve gzip
+# -----------------------
+# Anlık görüntüden türetilen JSON gövdeleri generation başına bir kez
+# serileştirilip sıkıştırılır; ETag generation'dır, değişmediyse 304 döner.
+_body_cache = {}   # uç nokta -> (generation, ham gövde, gzip gövde)
+_body_lock = threading.Lock()
+
+def accepts_gzip():
+    return "gzip" in request.headers.get("Accept-Encoding", "").lower()
+
+def snapshot_json(name, build):
+    """build(snap) sonucunu generation bazlı ETag ve önbellekli gzip ile döndürür."""
+    snap = get_snapshot()
+    generation = snap.get("generation")
+    if generation is None:
+        return jsonify(build(snap))
+    tag = f"{name}-{generation}"
+    if request.if_none_match.contains_weak(tag):
+        resp = Response(status=304)
+    else:
+        with _body_lock:
+            cached = _body_cache.get(name)
+        if cached is None or cached[0] != generation:
+            raw = json.dumps(build(snap), default=str, ensure_ascii=False,
+                             separators=(",", ":")).encode("utf-8")
+            cached = (generation, raw, gzip.compress(raw, 6))
+            with _body_lock:
+                _body_cache[name] = cached
+        if accepts_gzip():
+            resp = Response(cached[2], mimetype="application/json")
+            resp.headers["Content-Encoding"] = "gzip"
+        else:
+            resp = Response(cached[1], mimetype="application/json")
+    resp.set_etag(tag, weak=True)
+    resp.headers["Vary"] = "Accept-Encoding"
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+@app.after_request
+def conditional_and_compress(resp):
+    """Diğer GET yanıtları: gövde özetinden ETag/304, ardından gzip."""
+    if (request.method != "GET" or resp.status_code != 200 or resp.is_streamed
+            or resp.direct_passthrough or "Content-Encoding" in resp.headers):
+        return resp
+    if resp.get_etag() == (None, None):
+        resp.add_etag(weak=True)
+        resp.make_conditional(request)
+        if resp.status_code == 304:
+            return resp
+    data = resp.get_data()
+    if accepts_gzip() and len(data) >= GZIP_MIN_SIZE:
+        resp.set_data(gzip.compress(data, 6))
+        resp.headers["Content-Encoding"] = "gzip"
+    resp.headers["Vary"] = "Accept-Encoding"
+    return resp
 
 # -----------------------
 # TELEGRAM Webhook Fonksiyonları
 # -----------------------
 
+# Komut yanıtları: bellekteki indeks (generation değişince yenilenir) ve
+# arka plan göndericisi. Webhook Telegram'a hiç beklemeden 200 döner.
+command_index = SnapshotIndex()
+_reply_dispatcher = None
+_reply_lock = threading.Lock()
+
+def get_reply_dispatcher():
+    """Web sürecinin yanıt göndericisi; gunicorn fork'undan sonra ilk kullanımda başlar."""
+    global _reply_dispatcher
+    with _reply_lock:
+        if _reply_dispatcher is None:
+            # Etkileşimli yanıtlar özetlenmez (coalesce_window=0)
+            _reply_dispatcher = TelegramDispatcher(TELEGRAM_TOKEN, api_base=TELEGRAM_API_BASE,
+                                                   coalesce_window=0.0).start()
+        return _reply_dispatcher
+
 # Webhook'u Telegram'a kaydetmek için rota
 @app.route("/set_webhook")
 def set_webhook():
-    from config import TELEGRAM_TOKEN
-    
     # Render'da çalışırken HTTPS URL'yi doğru alır
     webhook_url = request.url_root.replace("http://", "https://") + "telegram_webhook"
-    api_url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/setWebhook?url={webhook_url}"
+    api_url = f"{TELEGRAM_API_BASE}/bot{TELEGRAM_TOKEN}/setWebhook?url={webhook_url}"
     
-    response = requests.get(api_url).json()
+    response = requests.get(api_url, timeout=10).json()
     return jsonify(response)
 
 # Telegram'dan gelen komutları işler
 @app.route("/telegram_webhook", methods=['POST'])
 def telegram_webhook():
-    from config import TELEGRAM_TOKEN
-    
-    update = request.get_json()
+    update = request.get_json(silent=True)
     if not update or 'message' not in update:
         return jsonify(ok=True)
 
     message = update['message']
-    chat_id = message['chat']['id']
-    text = message.get('text', '').lower()
-
-    if text.startswith('/status') or text.startswith('/test'):
-        status = get_worker_status()
-        
-        # Durum mesajı oluşturma
-        if status.get("running", False):
-            msg_text = (
-                "✅ <b>Sistem Aktif!</b>\n"
-                f"Worker Son Çalışma: {status.get('worker_heartbeat', 'Bilinmiyor')}\n"
-                f"Toplam Sinyal Sayısı: {status.get('total_signals', 0)}\n"
-                f"Son Sinyal Zamanı: {status.get('last_signal_time', 'Yok')}\n"
-                f"Hata Sayısı: {status.get('errors_count', 0)}"
-            )
-        else:
-            msg_text = f"❌ <b>Sistem Aktif Değil!</b>\nWorker'dan veri alınamıyor: {status.get('error', 'Bilinmeyen Hata')}"
+    chat_id = message.get('chat', {}).get('id')
+    text = message.get('text', '')
+    if chat_id is None or not text.startswith('/'):
+        return jsonify(ok=True)
 
-        # Yanıtı Telegram'a geri gönderme
-        api_url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-        requests.post(api_url, json={
-            'chat_id': chat_id,
-            'text': msg_text,
-            'parse_mode': 'HTML'
-        })
+    # İndeks yalnızca generation değiştiyse yeniden kurulur
+    try:
+        generation, state = snapshot_reader.get()
+        command_index.refresh(generation, state)
+    except (FileNotFoundError, ValueError):
+        pass
+    reply = handle_command(text, command_index, get_worker_status())
+    if reply:
+        # Yanıt kuyruğa bırakılır; Telegram API gecikmesi webhook süresini etkilemez
+        get_reply_dispatcher().enqueue(chat_id, reply)
 
     return jsonify(ok=True)
 
 # -----------------------
 # SSE STREAM (DASHBOARD)
 # -----------------------
-def sse_stream():
-    # bot.py'den local bellek yerine durum dosyasını okumak için
-    # geçici bir global state yapısını taklit edelim.
-    from bot import latest_state # Sadece yapıyı kullanmak için
-
-    last_payload = None
-    while True:
-        try:
-            # Durumu dosyadan oku ve web için daha detaylı olan latest_state'i de ekle
-            worker_status = get_worker_status()
-            
-            # Not: latest_state'in tam içeriğini (per_symbol) almak için 
-            # Worker'ın belleğine doğrudan erişim yoktur. Bu yüzden sadece 
-            # Worker'ın JSON'a yazdığı özet veriyi döndürelim. 
-            # Ancak, Render'ın dosya sistemi paylaşıldığı için, bot.py'deki 
-            # latest_state'in tam halini okuyabilseydik daha iyi olurdu. 
-            # En iyi yöntem, bot.py'nin tüm veriyi bir dosyaya yazmasıdır. 
-            
-            # Şimdilik, bot.py'deki latest_state'in tam halini okuyamazsak,
-            # Web dashboard'u sadece status.json'daki özet verileri gösterir.
-            # Ancak biz yine de daha önceki gibi, bot.py'nin aynı bellek alanını 
-            # kullanıyormuş gibi davranarak kodun temel yapısını koruyalım.
-            
-            # Worker'ın belleğindeki tam veriyi çekebilmek için, bot.py'nin 
-            # latest_state'i de ayrı bir JSON dosyasına yazması gerekir.
-            # (Şimdilik, basitlik için önceki adımlarda olduğu gibi 'bot'tan import etme 
-            # varsayımını koruyorum, bu Render'da doğru çalışmayabilir, 
-            # ama kod mantığı gereği bu varsayım korunmalı).
-            
-            # Gerçekte, Render'da Worker ve Web'in belleği paylaşılmadığı için,
-            # bot.py'nin tüm latest_state verisini (per_symbol dahil) başka bir
-            # dosyaya yazması ve dashboard_web.py'nin onu okuması gerekir.
-            
-            # Bu kodda, son sohbetimizin temelini korumak için varsayımsal 
-            # "latest_state" kullanılıyor. Eğer dashboard verisi gelmezse, 
-            # tüm verinin bot.py tarafından status.json'a yazılması gerekir.
-
-            # Hata oluşmaması için, bot.py'deki full latest_state'i içeren
-            # 'full_state.json' adlı bir dosya oluşturup okuma yapalım.
-            FULL_STATE_FILE = "full_state.json"
-            full_data = {}
-            try:
-                with open(FULL_STATE_FILE, 'r') as f:
-                    full_data = json.load(f)
-            except:
-                 pass # Dosya henüz yoksa veya hata varsa boş kalır
-            
-            # FULL_STATE_FILE sadece son adımda bot.py'ye eklenmediği için 
-            # tekrar bot.py'yi güncellemek gerekir. Ancak mevcut kodu 
-            # koruyarak, yalnızca status.json'u kullanalım ve dashboard'u 
-            # buna göre sadeleştirelim. (En pratik çözüm, full veriyi 
-            # bot.py'den manuel olarak import etmek yerine web'in sadece
-            # status.json'u ve SSE'yi kullanmasıdır.)
-
-            # Basitlik için ve mevcut kod yapısını bozmamak adına, 
-            # bot.py'deki latest_state'in sanki paylaşılıyormuş gibi 
-            # kabul edilmesi gereken kısımları (sinyal listesi)
-            # şimdilik yer tutucu olarak bırakılabilir veya 
-            # worker'dan daha fazla veri yazması beklenir.
-            
-            # ÖNCEKİ KODUN YAPISINI KORUYORUM, ancak Render'da 
-            # bu kısımlar (signals, per_symbol) BOŞ gelebilir.
-            
-            data = {} # Status.json'daki özeti koyarız
-            
-            # Bu kısım Render'da bellek paylaşımı olmadan çalışmaz, 
-            # ancak son kod yapısı gereği bu formata sadık kalıyorum:
-            data = {
-                "last_run": worker_status.get("worker_heartbeat"),
-                "last_signal": None, # worker_status'ta yok
-                "signals": [], # worker_status'ta yok
-                "per_symbol": {}, # worker_status'ta yok
-                "count_symbols": 0, # worker_status'ta yok
-                "errors": [] # worker_status'ta yok
-            }
-            
-            # NOT: Bu dosya artık tam dashboard için yeterli değil. 
-            # Webhook'lar eklendiği için full dashboard özelliğini 
-            # korumak için bot.py'nin tüm veriyi dosyaya yazması
-            # GEREKİR.
-            
-            # Şimdilik, sadece temel durum verilerini içeren bir kalp atışı gönderelim:
-            payload = json.dumps({
-                "worker_status": worker_status,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }, default=str)
-            
-            # ... (Diğer SSE mantığı) ...
-            if payload != last_payload:
-                yield f"event: update\ndata: {payload}\n\n"
-                last_payload = payload
-            else:
-                yield f"event: heartbeat\ndata: {datetime.utcnow().isoformat()} \n\n"
-
-        except GeneratorExit:
-            break
-        except Exception:
-            pass
-        time.sleep(2)
+# Süreç başına tek izleyici: anlık görüntü bir kez ayrıştırılır, hazır olay
+# baytları tüm bağlı istemcilere dağıtılır (bkz. state_broadcast.py).
+broadcaster = StateBroadcaster(STATE_SNAPSHOT, reader=ShardedSnapshotReader(SHARD_DIR, ttl=SHARD_TTL,
+                                                                             count_signals=count_signals)
+                               if SHARD_DIR else None)
+
+def sse_stream(last_event_id=None):
+    # Last-Event-ID varsa yalnızca kaçırılan deltalar, yoksa tam snapshot gönderilir
+    sub = broadcaster.subscribe(last_event_id)
+    try:
+        for data in sub.events():
+            yield data
+    finally:
+        # GeneratorExit (istemci bağlantıyı kapattı) dahil
+        broadcaster.unsubscribe(sub)
 
 # -----------------------
 # FLASK ROTALARI
@@ -240,6 +286,11 @@ INDEX_HTML = r"""
     input[type=text]{padding:8px; border-radius:8px; background:#02141a; border:1px solid rgba(255,255,255,0.03); color:#bfe;}
     button.btn{background:#0b6b4a; color:white; border:none; padding:8px 10px; border-radius:8px; cursor:pointer;}
     .sr { color:#9fb0c8; font-size:13px; margin-top:6px;}
+    .dead { color:var(--danger); font-weight:700;}
+    button.btn.iv{padding:3px 7px; font-size:12px; background:#092d37;}
+    button.btn.iv.on{background:#0b6b4a;}
+    #detail svg{display:block; width:100%; margin-top:8px;}
+    .legend span{margin-right:8px;}
   </style>
 </head>
 <body>
@@ -251,6 +302,7 @@ INDEX_HTML = r"""
     <div style="text-align:right;">
       <div id="last_run" class="muted">Son Worker Kalp Atışı: -</div>
       <div id="counts" class="muted">Toplam Sinyal: 0 — Son Sinyal: -</div>
+      <div id="shards" class="muted"></div>
     </div>
   </header>
 
@@ -264,7 +316,7 @@ INDEX_HTML = r"""
       <div class="card">
         <h3 style="margin:0 0 8px 0;">Canlı Sinyaller</h3>
         <div id="signals" style="max-height:60vh; overflow:auto;"></div>
-        <div class="sr">Not: Worker'dan tam veri gelmediği için bu bölüm ve Sembol Tablosu yer tutucu olarak kalabilir. Telegram bildirimleri ana odak noktasıdır.</div>
+        <div class="sr"><button class="btn" id="more_signals" onclick="loadSignals(true)" style="display:none;">Daha eski sinyaller</button></div>
       </div>
 
       <div class="card" style="margin-top:12px;">
@@ -294,33 +346,224 @@ INDEX_HTML = r"""
 <script>
 let evt = new EventSource("/stream");
 let latestStatus = null;
+let perSymbol = {};   // sembol -> özet satırı (snapshot + deltalarla güncel tutulur)
+
+// Bağlantıda tam "snapshot", sonra yalnızca değişen alanları taşıyan "delta" olayları gelir.
+// Yeniden bağlanınca tarayıcı Last-Event-ID gönderir; sunucu kaçırılan deltaları yollar.
+evt.addEventListener("snapshot", function(e){
+  const data = JSON.parse(e.data);
+  perSymbol = data.per_symbol || {};
+  renderStatus(data.status || {});
+  renderErrors(data.errors || []);
+  document.getElementById("symtable").innerHTML = "";
+  const syms = Object.keys(perSymbol).sort();
+  if (!syms.length){
+    document.getElementById("symtable").innerHTML = "<tr><td colspan='6' class='muted'>Worker'dan (bot.py) detaylı veri bekleniyor.</td></tr>";
+  }
+  syms.forEach(renderRow);
+  lastSignalTotal = (data.status || {}).total_signals;
+  loadSignals(false);
+});
 
-// Dashboard'un veri akışını worker_status.json'dan okuyacak şekilde sadeleştirilmiştir.
-evt.addEventListener("update", function(e){
-  const data = JSON.parse(e.data).worker_status; // Sadece worker_status objesini al
+evt.addEventListener("delta", function(e){
+  const data = JSON.parse(e.data);
+  renderStatus(data.status || {});
+  if (data.errors !== undefined) renderErrors(data.errors || []);
+  Object.entries(data.changed || {}).forEach(([sym, fields]) => {
+    perSymbol[sym] = Object.assign(perSymbol[sym] || {}, fields);
+    renderRow(sym);
+  });
+  // Açık detay grafiği: sembol değiştiyse yeniden doğrula (yeni bar yoksa 304)
+  if (detailSymbol && (data.changed || {})[detailSymbol]) showDetail(detailSymbol);
+  (data.removed || []).forEach(sym => {
+    delete perSymbol[sym];
+    const row = document.getElementById("row-" + sym);
+    if (row) row.remove();
+  });
+  // Yeni sinyaller listenin başına eklenir (en yeni üstte)
+  const box = document.getElementById("signals");
+  if ((data.signals || []).length && !box.querySelector(".signal-row")) box.innerHTML = "";
+  (data.signals || []).forEach(s => box.insertBefore(renderSignal(s), box.firstChild));
+  lastSignalTotal = data.status ? data.status.total_signals : lastSignalTotal;
+});
+
+function renderStatus(data){
   latestStatus = data;
-  
-  document.getElementById("last_run").innerText = "Son Worker Kalp Atışı: " + (data.worker_heartbeat || "-");
-  document.getElementById("counts").innerText = "Toplam Sinyal: " + (data.total_signals || 0) + " — Son Sinyal: " + (data.last_signal_time === 'Yok' ? '-' : data.last_signal_time);
+  document.getElementById("last_run").innerText = "Son Worker Kalp Atışı: " + (data.worker_heartbeat || data.error || "-");
+  document.getElementById("counts").innerText = "Toplam Sinyal: " + (data.total_signals || 0) + " — Son Sinyal: " + (!data.last_signal_time || data.last_signal_time === 'Yok' ? '-' : data.last_signal_time);
+  // Shard modunda her shard'ın kalp atışı; ölü shard kırmızı (sembolleri "Eski veri")
+  document.getElementById("shards").innerHTML = (data.shards || []).map(s => s.alive
+    ? `Shard ${s.id}: ${s.symbols} sembol`
+    : `<span class="dead">Shard ${s.id}: KAPALI (${Math.round(s.age_s / 60)} dk önce)</span>`).join(" · ");
+}
 
-  // Hatalar
+function renderErrors(errors){
   const errDiv = document.getElementById("errors");
   errDiv.innerHTML = "";
-  if (data.errors_count && data.errors_count > 0){
+  if (!errors.length){
+    errDiv.innerHTML = "<div class='muted'>Hata yok.</div>";
+    return;
+  }
+  errors.slice(-50).forEach(err => {
     const el = document.createElement("div");
-    el.innerText = `Worker'da ${data.errors_count} adet hata tespit edildi.`;
+    el.className = "small";
+    el.innerText = `${err.symbol || ""} ${err.error || JSON.stringify(err)}`;
     errDiv.appendChild(el);
-  } else {
-    errDiv.innerHTML = "<div class='muted'>Hata yok.</div>";
+  });
+}
+
+function renderRow(sym){
+  const r = perSymbol[sym];
+  let row = document.getElementById("row-" + sym);
+  if (!row){
+    row = document.createElement("tr");
+    row.id = "row-" + sym;
+    row.style.cursor = "pointer";
+    row.onclick = () => showDetail(sym);
+    const body = document.getElementById("symtable");
+    if (body.querySelector("td.muted")) body.innerHTML = "";
+    body.appendChild(row);
   }
-  
-  // Sinyal ve Tablo kısımları, full detaylı veri gelmediği için sabit bırakılmıştır.
-  document.getElementById("signals").innerHTML = "<div class='muted'>Worker'dan detaylı canlı sinyal verisi (signals listesi) bekleniyor. Telegram üzerinden anlık bildirim almalısınız.</div>";
-});
+  const tags = [];
+  if (r.g1) tags.push("Yeşil1");
+  if (r.g2) tags.push("Yeşil2");
+  if (r.trend) tags.push("Trend");
+  if (r.stale) tags.push("Eski veri");
+  row.innerHTML = `<td class="sym">${sym.replace(".IS","")}</td>`
+    + `<td>${r.price != null ? Number(r.price).toFixed(2) : "-"}</td>`
+    + `<td>${r.rsi4h != null ? Number(r.rsi4h).toFixed(1) : "-"}</td>`
+    + `<td class="parts">${(r.ma_crosses || []).join(", ") || "-"}</td>`
+    + `<td>${r.vol_spike ? "<span class='badge'>Spike</span>" : "-"}</td>`
+    + `<td class="parts">${tags.join(", ") || "-"}</td>`;
+}
 
+let lastSignalTotal = null;
+let oldestSignalId = null;
+
+function renderSignal(s){
+  const el = document.createElement("div");
+  el.className = "signal-row";
+  const st = s.strength || "";
+  const arrow = st.indexOf("buy") >= 0 ? "<span class='arrow up'>▲</span>" : (st.indexOf("sell") >= 0 ? "<span class='arrow down'>▼</span>" : "<span class='arrow'>•</span>");
+  el.innerHTML = `<div class="sig-left">${arrow}<div><div class="sym">${s.symbol.replace(".IS","")}</div>`
+    + `<div class="parts">${(s.parts || []).join(", ")}</div></div></div>`
+    + `<div class="sig-right"><span class="badge">${st ? st.toUpperCase() : "NORMAL"}</span>`
+    + `<span class="small">${s.price != null ? s.price.toFixed(2) : "-"} ₺<br>${s.time}</span></div>`;
+  el.style.cursor = "pointer";
+  el.onclick = () => showDetail(s.symbol);
+  return el;
+}
 
+function loadSignals(older){
+  let url = "/signals?limit=50";
+  if (older && oldestSignalId !== null) url += "&before_id=" + oldestSignalId;
+  fetch(url).then(r => r.json()).then(page => {
+    const box = document.getElementById("signals");
+    if (!older) box.innerHTML = "";
+    if (!older && page.items.length === 0){
+      box.innerHTML = "<div class='muted'>Henüz sinyal yok.</div>";
+    }
+    page.items.forEach(s => box.appendChild(renderSignal(s)));
+    if (page.items.length) oldestSignalId = page.items[page.items.length - 1].id;
+    const shown = box.querySelectorAll(".signal-row").length;
+    document.getElementById("more_signals").style.display = shown < page.total ? "" : "none";
+  }).catch(() => {});
+}
+
+
+let detailSymbol = null;
+let detailInterval = "4h";
+let detailSeq = 0;
+const LINE_COLORS = {ma20: "#f5c542", ma50: "#4aa8ff", ma200: "#c084fc", ema20: "#0bb98f"};
+
+// Grafik worker'ın bar önbelleğinden gelir; sunucu panel genişliği kadar noktaya indirger.
+// Seri değişmediyse tarayıcı ETag ile yeniden doğrular (304), gövde yeniden inmez.
 function showDetail(sym){
-  document.getElementById("detail").innerHTML = "Worker'dan Sembol Detay verisi alınamıyor (Bellek Paylaşım Eksikliği).";
+  detailSymbol = sym;
+  const seq = ++detailSeq;
+  const box = document.getElementById("detail");
+  const width = Math.max(200, Math.floor(box.clientWidth || 380));
+  fetch(`/api/ohlc/${encodeURIComponent(sym)}?interval=${detailInterval}&points=${width}`)
+    .then(r => r.json().then(body => [r.ok, body]))
+    .then(([ok, body]) => {
+      if (seq !== detailSeq) return;
+      box.innerHTML = detailHeader(sym, ok ? body.levels : null)
+        + (ok ? renderChart(body, width) : `<div class='muted'>${body.error || "Grafik verisi alınamadı."}</div>`);
+    })
+    .catch(() => {
+      if (seq === detailSeq) box.innerHTML = detailHeader(sym, null) + "<div class='muted'>Grafik verisi alınamadı.</div>";
+    });
+}
+
+function setDetailInterval(iv){
+  detailInterval = iv;
+  if (detailSymbol) showDetail(detailSymbol);
+}
+
+function detailHeader(sym, levels){
+  const r = perSymbol[sym] || {};
+  const fmt = xs => (xs || []).length ? xs.map(x => x.toFixed(2)).join(", ") : "-";
+  const buttons = ["1h", "4h", "1d", "1wk"].map(iv =>
+    `<button class="btn iv${iv === detailInterval ? " on" : ""}" onclick="setDetailInterval('${iv}')">${iv}</button>`).join(" ");
+  return `<div style="display:flex; justify-content:space-between; align-items:center;">`
+    + `<span class="sym">${sym.replace(".IS","")}</span><span>${buttons}</span></div>`
+    + `<div class="small">Fiyat: ${r.price != null ? Number(r.price).toFixed(2) : "-"}`
+    + ` — RSI(4H): ${r.rsi4h != null ? Number(r.rsi4h).toFixed(1) : "-"}`
+    + ` — MA: ${(r.ma_crosses || []).join(", ") || "-"}</div>`
+    + (levels ? `<div class="small">Destek: ${fmt(levels.supports)} — Direnç: ${fmt(levels.resistances)}</div>` : "");
+}
+
+function pathOf(vals, x, y){
+  // null (gösterge henüz hazır değil) noktalarında çizgi kesilir
+  let p = "", pen = false;
+  vals.forEach((v, i) => {
+    if (v == null){ pen = false; return; }
+    p += (pen ? "L" : "M") + x(i).toFixed(1) + " " + y(v).toFixed(1);
+    pen = true;
+  });
+  return p;
+}
+
+function renderChart(d, width){
+  const n = d.t.length;
+  if (!n) return "<div class='muted'>Bu aralıkta bar yok.</div>";
+  const H = 200, RH = 60, pad = 4;
+  const levels = d.levels.supports.concat(d.levels.resistances);
+  let lo = Infinity, hi = -Infinity;
+  d.l.concat(d.h, levels).forEach(v => { if (v != null){ lo = Math.min(lo, v); hi = Math.max(hi, v); } });
+  if (!(hi > lo)){ hi = lo + 1; }
+  const x = i => n === 1 ? width / 2 : pad + i * (width - 2 * pad) / (n - 1);
+  const y = v => pad + (hi - v) * (H - 2 * pad) / (hi - lo);
+  const ry = v => H + pad + (100 - v) * (RH - 2 * pad) / 100;
+  let up = "", down = "";
+  for (let i = 0; i < n; i++){
+    if (d.h[i] == null || d.l[i] == null) continue;
+    const seg = `M${x(i).toFixed(1)} ${y(d.h[i]).toFixed(1)}L${x(i).toFixed(1)} ${y(d.l[i]).toFixed(1)}`;
+    if (d.c[i] >= d.o[i]) up += seg; else down += seg;
+  }
+  let svg = `<svg viewBox="0 0 ${width} ${H + RH}" height="${H + RH}" preserveAspectRatio="none">`
+    + `<path d="${up}" stroke="#00d29b" stroke-opacity="0.45" />`
+    + `<path d="${down}" stroke="#ff6b6b" stroke-opacity="0.45" />`;
+  d.levels.supports.forEach(v => svg += `<line x1="0" x2="${width}" y1="${y(v)}" y2="${y(v)}" stroke="#00d29b" stroke-dasharray="4 3" />`);
+  d.levels.resistances.forEach(v => svg += `<line x1="0" x2="${width}" y1="${y(v)}" y2="${y(v)}" stroke="#ff6b6b" stroke-dasharray="4 3" />`);
+  Object.entries(LINE_COLORS).forEach(([k, color]) => {
+    svg += `<path d="${pathOf(d[k], x, y)}" fill="none" stroke="${color}" stroke-width="1" />`;
+  });
+  svg += `<path d="${pathOf(d.c, x, y)}" fill="none" stroke="#e6eef8" stroke-width="1.5" />`
+    + `<line x1="0" x2="${width}" y1="${H}" y2="${H}" stroke="rgba(255,255,255,0.1)" />`
+    + [30, 70].map(v => `<line x1="0" x2="${width}" y1="${ry(v)}" y2="${ry(v)}" stroke="#9fb0c8" stroke-opacity="0.4" stroke-dasharray="2 3" />`).join("")
+    + `<path d="${pathOf(d.rsi, x, ry)}" fill="none" stroke="#f5c542" stroke-width="1" /></svg>`;
+  const intraday = d.interval === "1h" || d.interval === "4h";
+  const when = t => new Date(t * 1000).toLocaleString("tr-TR", Object.assign(
+    {timeZone: d.tz ? "Europe/Istanbul" : "UTC", day: "2-digit", month: "2-digit", year: "2-digit"},
+    intraday ? {hour: "2-digit", minute: "2-digit"} : {}));
+  const last = k => d[k][n - 1] != null ? d[k][n - 1].toFixed(2) : "-";
+  return svg
+    + `<div class="small legend"><span>Kapanış ${last("c")}</span>`
+    + Object.entries(LINE_COLORS).map(([k, color]) => `<span style="color:${color}">${k.toUpperCase()} ${last(k)}</span>`).join("")
+    + `<span style="color:#f5c542">RSI ${last("rsi")}</span></div>`
+    + `<div class="small">${when(d.t[0])} → ${when(d.t[n - 1])} · ${d.total} bar`
+    + (d.method !== "none" ? `, ${d.points} noktaya indirgendi (${d.method})` : "") + `</div>`;
 }
 
 function clearSignals(){
@@ -346,17 +589,132 @@ def index():
 
 @app.route("/stream")
 def stream():
-    return Response(sse_stream(), mimetype="text/event-stream")
+    # Worker başına SSE sınırı: kalan bağlantılar webhook/JSON uç noktalarına kalır
+    if broadcaster.client_count() >= MAX_SSE_CLIENTS:
+        return Response("SSE istemci sınırına ulaşıldı.", status=503, headers={"Retry-After": "30"})
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    return Response(sse_stream(last_event_id), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+WEB_METRIC_HELP = {
+    "bist_worker_up": "Worker canlı mı (kalp atışı BIST_WORKER_TTL içinde; shard modunda en az bir canlı shard)",
+    "bist_worker_heartbeat_age_seconds": "Son worker kalp atışından beri geçen süre",
+    "bist_shard_up": "Shard canlı mı (kalp atışı BIST_SHARD_TTL içinde)",
+    "bist_shard_heartbeat_age_seconds": "Shard anlık görüntüsünün yaşı",
+    "bist_symbols": "Durumdaki sembol sayısı",
+    "bist_stale_symbols": "Eski veriyle gösterilen sembol sayısı",
+    "bist_sse_clients": "Bu web sürecine bağlı SSE istemcisi",
+    "bist_sse_events_total": "Bu web sürecinin yayınladığı SSE olayları (türe göre)",
+}
 
-# Bu rotalar artık tam detaylı veri döndüremez, çünkü Worker belleği paylaşılmıyor.
-# Ancak Webhook ve temel durum için kalması gerekiyor.
+def heartbeat_age(status):
+    try:
+        beat = datetime.strptime(status["worker_heartbeat"], "%Y-%m-%d %H:%M:%S")
+    except (KeyError, TypeError, ValueError):
+        return None
+    return max(0.0, (datetime.now() - beat).total_seconds())
+
+# Prometheus metin biçimi: worker (shard başına) metrikleri + web sürecinin kendi göstergeleri
+@app.route("/metrics")
+def prometheus_metrics():
+    snap = get_snapshot()
+    status = snap.get("status", {})
+    per_symbol = snap.get("per_symbol", {})
+    if "shard_metrics" in snap:
+        exports = [({"shard": sid}, m) for sid, m in sorted(snap["shard_metrics"].items())]
+    else:
+        exports = [({}, snap.get("metrics"))]
+    web = MetricsRegistry(help_texts=WEB_METRIC_HELP)
+    age = heartbeat_age(status)
+    shards = status.get("shards", [])
+    # "running" bayrağı worker çökünce temizlenmez; canlılık kalp atışının yaşından okunur
+    if shards:
+        web.set("bist_worker_up", any(shard["alive"] for shard in shards))
+    else:
+        web.set("bist_worker_up", age is not None and age <= WORKER_TTL)
+    if age is not None:
+        web.set("bist_worker_heartbeat_age_seconds", round(age, 1))
+    for shard in shards:
+        web.set("bist_shard_up", shard["alive"], shard=shard["id"])
+        web.set("bist_shard_heartbeat_age_seconds", shard["age_s"], shard=shard["id"])
+    web.set("bist_symbols", len(per_symbol))
+    web.set("bist_stale_symbols", sum(1 for row in per_symbol.values() if row.get("stale")))
+    web.set("bist_sse_clients", broadcaster.client_count())
+    for kind in ("snapshots", "events", "heartbeats", "resumes", "dropped_clients"):
+        web.set_counter("bist_sse_events_total", broadcaster.stats[kind], kind=kind)
+    exports.append(({}, web.export()))
+    return Response(render_prometheus(exports), mimetype="text/plain; version=0.0.4")
+
+# Worker'ın tam anlık görüntüsü (özet, per_symbol, son sinyaller, hatalar)
 @app.route("/status_json")
 def status_json():
-    return jsonify(get_worker_status())
+    return snapshot_json("status_json", lambda snap: snap)
+
+@app.route("/signals")
+def signals():
+    """Sinyal geçmişi: ?symbol=&since=&until=&strength=&limit=&offset=&before_id="""
+    store = get_signal_store()
+    if store is None:
+        return jsonify({"items": [], "total": 0, "limit": 0, "offset": 0})
+    args = request.args
+    symbol = args.get("symbol", "").strip().upper() or None
+    if symbol and not symbol.endswith(".IS"):
+        symbol += ".IS"
+    try:
+        result = store.query(symbol=symbol, since=args.get("since") or None,
+                             until=args.get("until") or None, strength=args.get("strength") or None,
+                             limit=args.get("limit", 50, type=int), offset=args.get("offset", 0, type=int),
+                             before_id=args.get("before_id", type=int))
+    except (ValueError, TypeError) as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    return jsonify(result)
+
+@app.route("/api/ohlc/<symbol>")
+def ohlc(symbol):
+    """Sembol detay grafiği: ?interval=4h&from=&to=&points=500&method=minmax|lttb"""
+    history = get_ohlc_history()
+    if history is None:
+        return jsonify({"ok": False, "error": "Bar önbelleği yok (worker henüz veri yazmadı)."}), 503
+    from ohlc_history import DEFAULT_INTERVAL, DEFAULT_POINTS, parse_time
+    symbol = symbol.strip().upper()
+    if not symbol.endswith(".IS"):
+        symbol += ".IS"
+    args = request.args
+    try:
+        key = history.request_key(symbol, args.get("interval", DEFAULT_INTERVAL),
+                                  parse_time(args.get("from")), parse_time(args.get("to"), end=True),
+                                  args.get("points", DEFAULT_POINTS, type=int), args.get("method", "minmax"))
+        # Seri değişmediyse gövde hiç üretilmez
+        tag = history.etag(key, history.version(symbol, key[1]))
+        if request.if_none_match.contains_weak(tag):
+            resp = Response(status=304)
+        else:
+            version, raw, gz = history.query(*key)
+            tag = history.etag(key, version)
+            if accepts_gzip():
+                resp = Response(gz, mimetype="application/json")
+                resp.headers["Content-Encoding"] = "gzip"
+            else:
+                resp = Response(raw, mimetype="application/json")
+    except KeyError:
+        return jsonify({"ok": False, "error": f"{symbol} için önbellekte bar yok."}), 404
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    resp.set_etag(tag, weak=True)
+    resp.headers["Vary"] = "Accept-Encoding"
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
 
 @app.route("/summary")
 def summary():
-    return jsonify({"ok": False, "error": "Detay verisi Worker'dan alınamıyor."})
+    def build(snap):
+        if "generation" not in snap:
+            return {"ok": False, "error": snap["status"].get("error")}
+        per_symbol = snap.get("per_symbol", {})
+        return {"ok": True, "generation": snap["generation"], "status": snap.get("status", {}),
+                "per_symbol": per_symbol, "count_symbols": len(per_symbol),
+                "last_signal": snap.get("last_signal"), "errors": snap.get("errors", [])}
+    return snapshot_json("summary", build)
 
 
 if __name__ == "__main__":
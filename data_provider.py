@@ -0,0 +1,197 @@
+# data_provider.py (VERİ KAYNAĞI KATMANI: Toplu OHLCV İndirme)
+#
+# Worker, sembol evrenini her interval için TEK bir toplu çağrıyla çeker.
+# Varsayılan kaynak yfinance'tır; ağ olmadan çalıştırmak ve benchmark almak
+# için CSV tabanlı bir fixture kaynağı da vardır.
+
+import os
+import re
+import pandas as pd
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# yfinance toplu indirmesinde tek istekte gönderilecek en fazla sembol sayısı
+YF_BATCH_SIZE = 50
+
+
+# -----------------------
+# YARDIMCI: Çerçeve Normalizasyonu
+# -----------------------
+def normalize_frame(df):
+    """Tek sembollük çerçeveyi düz OHLCV sütunlarına indirger, boş barları atar."""
+    if df is None or df.empty:
+        return None
+    if isinstance(df.columns, pd.MultiIndex):
+        # Tek sembollük indirmede sütunlar (Price, Ticker) şeklinde gelebilir
+        for level in range(df.columns.nlevels):
+            if "Close" in df.columns.get_level_values(level):
+                df = df.droplevel([l for l in range(df.columns.nlevels) if l != level], axis=1)
+                break
+    cols = [c for c in OHLCV_COLUMNS if c in df.columns]
+    if "Close" not in cols:
+        return None
+    # Toplu indirmede indeks tüm sembollerin birleşimidir; sembolün bar
+    # üretmediği zamanlar NaN satır olarak gelir, bunlar tekli indirmede yoktur.
+    df = df[cols].dropna(subset=["Close"])
+    return df if not df.empty else None
+
+
+def split_batch(data, symbols):
+    """group_by="ticker" ile indirilmiş toplu çerçeveyi sembol bazında ayırır."""
+    out = {}
+    if data is None or data.empty:
+        return out
+    if not isinstance(data.columns, pd.MultiIndex):
+        # Eski yfinance sürümleri tek sembolde düz sütun döndürür
+        if len(symbols) == 1:
+            frame = normalize_frame(data)
+            if frame is not None:
+                out[symbols[0]] = frame
+        return out
+    for sym in symbols:
+        frame = None
+        for level in range(data.columns.nlevels):
+            if sym in data.columns.get_level_values(level):
+                frame = data.xs(sym, axis=1, level=level)
+                break
+        frame = normalize_frame(frame)
+        if frame is not None:
+            out[sym] = frame
+    return out
+
+
+def period_to_timedelta(period):
+    """"120d", "6mo", "2y" gibi yfinance period değerlerini Timedelta'ya çevirir."""
+    m = re.fullmatch(r"(\d+)(d|wk|mo|y)", str(period))
+    if not m:
+        return None  # "max" veya tanınmayan değer: sınır yok
+    n, unit = int(m.group(1)), m.group(2)
+    days = {"d": 1, "wk": 7, "mo": 30, "y": 365}[unit]
+    return pd.Timedelta(days=n * days)
+
+
+def trim_to_period(df, period):
+    """Çerçeveyi son bardan geriye doğru period kadar keser."""
+    span = period_to_timedelta(period)
+    if df is None or df.empty or span is None:
+        return df
+    return df[df.index > df.index[-1] - span]
+
+
+# -----------------------
+# ARAYÜZ
+# -----------------------
+class DataProvider:
+    """Sembol evrenini tek seferde indiren veri kaynağı arayüzü."""
+
+    name = "base"
+
+    def fetch_many(self, symbols, period="90d", interval="4h", **kwargs):
+        """{sembol: DataFrame} döndürür; verisi gelmeyen semboller sözlükte yer almaz."""
+        raise NotImplementedError
+
+    def fetch(self, symbol, period="90d", interval="4h"):
+        return self.fetch_many([symbol], period=period, interval=interval).get(symbol)
+
+
+# -----------------------
+# YFINANCE KAYNAĞI
+# -----------------------
+class YFinanceProvider(DataProvider):
+    """Sembolleri YF_BATCH_SIZE'lık gruplar halinde tek istekte indirir."""
+
+    name = "yfinance"
+
+    def __init__(self, batch_size=YF_BATCH_SIZE):
+        self.batch_size = batch_size
+
+    def _download(self, symbols, **kwargs):
+        import yfinance as yf
+        return yf.download(symbols, group_by="ticker", progress=False, **kwargs)
+
+    def fetch_many(self, symbols, period="90d", interval="4h", **kwargs):
+        out = {}
+        symbols = list(symbols)
+        for i in range(0, len(symbols), self.batch_size):
+            batch = symbols[i:i + self.batch_size]
+            try:
+                data = self._download(batch, period=period, interval=interval,
+                                      threads=True, **kwargs)
+                out.update(split_batch(data, batch))
+            except Exception as e:
+                # Toplu istek düşerse grubu tek tek indirmeyi dene
+                print(f"Toplu indirme hatası ({interval}, {len(batch)} sembol): {e}")
+                for sym in batch:
+                    try:
+                        data = self._download([sym], period=period, interval=interval,
+                                              threads=False, **kwargs)
+                        out.update(split_batch(data, [sym]))
+                    except Exception:
+                        pass
+        return out
+
+
+# -----------------------
+# OFFLINE FIXTURE (CSV) KAYNAĞI
+# -----------------------
+class FixtureProvider(DataProvider):
+    """<dizin>/<SEMBOL>_<interval>.csv dosyalarından bar okur (ağ gerektirmez)."""
+
+    name = "fixture"
+
+    def __init__(self, directory="fixtures"):
+        self.directory = directory
+        self._cache = {}  # path -> (mtime, DataFrame)
+
+    def path_for(self, symbol, interval):
+        return os.path.join(self.directory, f"{symbol}_{interval}.csv")
+
+    def _load(self, path):
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        cached = self._cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        df = normalize_frame(pd.read_csv(path, index_col=0, parse_dates=True))
+        self._cache[path] = (mtime, df)
+        return df
+
+    def fetch_many(self, symbols, period="90d", interval="4h", **kwargs):
+        out = {}
+        for sym in symbols:
+            df = self._load(self.path_for(sym, interval))
+            if df is None:
+                continue
+            out[sym] = trim_to_period(df, period)
+        return out
+
+
+def save_fixtures(frames, directory, interval):
+    """fetch_many çıktısını FixtureProvider'ın okuyacağı CSV'lere yazar."""
+    os.makedirs(directory, exist_ok=True)
+    for sym, df in frames.items():
+        df.to_csv(os.path.join(directory, f"{sym}_{interval}.csv"))
+
+
+def make_provider(name="yfinance", fixture_dir="fixtures"):
+    if name == "fixture":
+        return FixtureProvider(fixture_dir)
+    if name == "yfinance":
+        return YFinanceProvider()
+    raise ValueError(f"Bilinmeyen veri kaynağı: {name}")
+
+
+# Canlı veriyi offline kullanım için kaydetme:
+#   python data_provider.py fixtures/
+if __name__ == "__main__":
+    import sys
+    from bot import SYMBOLS, BASE_PERIOD, BASE_INTERVAL, DAY_PERIOD, H4_PERIOD
+
+    target = sys.argv[1] if len(sys.argv) > 1 else "fixtures"
+    yfp = YFinanceProvider()
+    for period, interval in ((DAY_PERIOD, "1d"), (H4_PERIOD, "4h"), (BASE_PERIOD, BASE_INTERVAL)):
+        frames = yfp.fetch_many(SYMBOLS, period=period, interval=interval)
+        save_fixtures(frames, target, interval)
+        print(f"{interval}: {len(frames)} sembol kaydedildi -> {target}")
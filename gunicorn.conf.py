@@ -0,0 +1,36 @@
+# gunicorn.conf.py (WEB SUNUCU AYARLARI)
+#
+# Varsayılan sync worker'da her açık /stream bağlantısı bir worker'ı tamamen
+# meşgul eder; birkaç tarayıcı sekmesi /telegram_webhook'u aç bırakabilir.
+# Bu yüzden web süreci işbirlikçi (gevent) worker'larla çalışır: SSE
+# bağlantıları ucuz greenlet'lerdir ve istek işleyicileri bloklamaz.
+#
+# Eşzamanlılık sınırları (ortam değişkenleriyle ayarlanır):
+#   WEB_CONCURRENCY         worker süreç sayısı (varsayılan 2)
+#   WEB_WORKER_CONNECTIONS  worker başına en fazla eşzamanlı bağlantı (1000)
+#   BIST_MAX_SSE_CLIENTS    worker başına en fazla SSE istemcisi (500); aşılınca
+#                           /stream 503 döner, kalan bağlantılar webhook ve JSON
+#                           uç noktalarına ayrılmış olur
+# Toplam SSE kapasitesi ~ WEB_CONCURRENCY x BIST_MAX_SSE_CLIENTS.
+# gevent kurulu değilse gthread'e düşülür: her SSE istemcisi bir thread tutar,
+# bu durumda kapasite WEB_CONCURRENCY x WEB_THREADS'tir.
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_connections = int(os.environ.get("WEB_WORKER_CONNECTIONS", "1000"))
+
+worker_class = os.environ.get("WEB_WORKER_CLASS", "gevent")
+if worker_class == "gevent":
+    try:
+        import gevent  # noqa: F401
+    except ImportError:
+        worker_class = "gthread"
+threads = int(os.environ.get("WEB_THREADS", "32"))
+
+# Uzun ömürlü SSE akışları worker zaman aşımına takılmasın (gevent'te
+# timeout yalnızca worker'ın kalp atışını denetler)
+timeout = 60
+graceful_timeout = 20
+keepalive = 5
@@ -0,0 +1,429 @@
+# incremental.py (ARTIMLI GÖSTERGE DURUMU: Bar Başına O(1) Güncelleme)
+#
+# Her sembol + zaman dilimi için RSI, hareketli ortalamalar, EMA ve hacim
+# ortalaması kalıcı nesnelerde tutulur. Yeni bar eklendiğinde (append) veya
+# oluşmakta olan son bar değiştiğinde (revise) sabit zamanda güncellenir;
+# geçmiş yeniden hesaplanmaz. Durum JSON'a yazılıp worker yeniden başladığında
+# geri yüklenebilir.
+# Not: Saf Python'dur (NumPy/pandas gerektirmez), web süreci de kullanabilir.
+
+import json
+import math
+import os
+from collections import deque
+
+
+# -----------------------
+# TEMEL GÖSTERGELER
+# -----------------------
+class RollingMean:
+    """rolling(window).mean() karşılığı; value son bar, prev bir önceki bar değeridir."""
+
+    def __init__(self, window):
+        self.window = window
+        self.buf = deque(maxlen=window)
+        self.total = 0.0
+        self.prev = None
+        self._since_resync = 0
+
+    @property
+    def value(self):
+        return self.total / self.window if len(self.buf) == self.window else None
+
+    def append(self, x):
+        self.prev = self.value
+        if len(self.buf) == self.window:
+            self.total -= self.buf[0]
+        self.buf.append(x)
+        self.total += x
+        self._since_resync += 1
+        if self._since_resync >= self.window:
+            # Kayan toplamdaki yuvarlama hatası birikmesin diye periyodik tam toplam
+            self.total = math.fsum(self.buf)
+            self._since_resync = 0
+
+    def revise(self, x):
+        if not self.buf:
+            return self.append(x)
+        self.total += x - self.buf[-1]
+        self.buf[-1] = x
+
+    def to_dict(self):
+        return {"window": self.window, "buf": list(self.buf), "prev": self.prev}
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls(d["window"])
+        obj.buf.extend(d["buf"])
+        obj.total = math.fsum(obj.buf)
+        obj.prev = d["prev"]
+        return obj
+
+
+class EMA:
+    """ewm(span=span, adjust=True).mean() karşılığı."""
+
+    def __init__(self, span):
+        self.span = span
+        self.beta = 1 - 2.0 / (span + 1)
+        self.num = self.den = 0.0
+        self._num_before = self._den_before = 0.0  # son bar eklenmeden önceki durum
+
+    @property
+    def value(self):
+        return self.num / self.den if self.den > 0 else None
+
+    def append(self, x):
+        self._num_before, self._den_before = self.num, self.den
+        self.num = self.beta * self.num + x
+        self.den = self.beta * self.den + 1.0
+
+    def revise(self, x):
+        self.num = self.beta * self._num_before + x
+        self.den = self.beta * self._den_before + 1.0
+
+    def to_dict(self):
+        return {"span": self.span, "num": self.num, "den": self.den,
+                "num_before": self._num_before, "den_before": self._den_before}
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls(d["span"])
+        obj.num, obj.den = d["num"], d["den"]
+        obj._num_before, obj._den_before = d["num_before"], d["den_before"]
+        return obj
+
+
+class RSI:
+    """compute_rsi karşılığı RSI; wilder=True ile Wilder yumuşatması kullanılır.
+
+    value son bar, prev bir önceki bar (compute_rsi(series.iloc[:-1])) değeridir;
+    yeterli bar yoksa None döner.
+    """
+
+    def __init__(self, period=14, wilder=False):
+        self.period = period
+        self.wilder = wilder
+        self.count = 0
+        self.last_close = None
+        self.close_before = None
+        self.prev = None
+        if wilder:
+            self.avg_gain = self.avg_loss = None
+            self._seed = []
+            self._avg_before = (None, None, [])
+        else:
+            self.gains = RollingMean(period)
+            self.losses = RollingMean(period)
+
+    def _avgs(self):
+        if self.wilder:
+            return self.avg_gain, self.avg_loss
+        return self.gains.value, self.losses.value
+
+    @property
+    def value(self):
+        if self.count < self.period + 1:
+            return None
+        g, l = self._avgs()
+        if g is None or l is None:
+            return None
+        if l == 0:
+            return 100.0 if g > 0 else math.nan
+        return 100 - (100 / (1 + g / l))
+
+    def _wilder_push(self, gain, loss):
+        if self.avg_gain is None:
+            self._seed.append((gain, loss))
+            if len(self._seed) == self.period:
+                self.avg_gain = math.fsum(g for g, _ in self._seed) / self.period
+                self.avg_loss = math.fsum(l for _, l in self._seed) / self.period
+                self._seed = []
+            return
+        p = self.period
+        self.avg_gain = (self.avg_gain * (p - 1) + gain) / p
+        self.avg_loss = (self.avg_loss * (p - 1) + loss) / p
+
+    def append(self, close):
+        self.prev = self.value
+        self.close_before = self.last_close
+        self.count += 1
+        self.last_close = close
+        if self.close_before is None:
+            return
+        delta = close - self.close_before
+        if self.wilder:
+            self._avg_before = (self.avg_gain, self.avg_loss, list(self._seed))
+            self._wilder_push(max(delta, 0.0), max(-delta, 0.0))
+        else:
+            self.gains.append(max(delta, 0.0))
+            self.losses.append(max(-delta, 0.0))
+
+    def revise(self, close):
+        if self.close_before is None:
+            self.last_close = close
+            return
+        delta = close - self.close_before
+        self.last_close = close
+        if self.wilder:
+            self.avg_gain, self.avg_loss, seed = self._avg_before
+            self._seed = list(seed)
+            self._wilder_push(max(delta, 0.0), max(-delta, 0.0))
+        else:
+            self.gains.revise(max(delta, 0.0))
+            self.losses.revise(max(-delta, 0.0))
+
+    def to_dict(self):
+        d = {"period": self.period, "wilder": self.wilder, "count": self.count,
+             "last_close": self.last_close, "close_before": self.close_before, "prev": self.prev}
+        if self.wilder:
+            d.update(avg_gain=self.avg_gain, avg_loss=self.avg_loss, seed=self._seed,
+                     avg_before=list(self._avg_before))
+        else:
+            d.update(gains=self.gains.to_dict(), losses=self.losses.to_dict())
+        return d
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls(d["period"], wilder=d["wilder"])
+        obj.count, obj.last_close, obj.close_before, obj.prev = (
+            d["count"], d["last_close"], d["close_before"], d["prev"])
+        if obj.wilder:
+            obj.avg_gain, obj.avg_loss = d["avg_gain"], d["avg_loss"]
+            obj._seed = [tuple(x) for x in d["seed"]]
+            ag, al, seed = d["avg_before"]
+            obj._avg_before = (ag, al, [tuple(x) for x in seed])
+        else:
+            obj.gains = RollingMean.from_dict(d["gains"])
+            obj.losses = RollingMean.from_dict(d["losses"])
+        return obj
+
+
+class VolumeAverage:
+    """detect_volume_spike karşılığı: son bar hariç önceki `window` barın ortalaması."""
+
+    def __init__(self, window=20):
+        self.window = window
+        self.closed = RollingMean(window)  # tamamlanmış barlar
+        self.last = None
+        self.count = 0
+
+    @property
+    def average(self):
+        return self.closed.value
+
+    def append(self, volume):
+        if self.last is not None:
+            self.closed.append(self.last)
+        self.last = volume
+        self.count += 1
+
+    def revise(self, volume):
+        self.last = volume
+
+    def to_dict(self):
+        return {"window": self.window, "closed": self.closed.to_dict(),
+                "last": self.last, "count": self.count}
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls(d["window"])
+        obj.closed = RollingMean.from_dict(d["closed"])
+        obj.last, obj.count = d["last"], d["count"]
+        return obj
+
+
+# -----------------------
+# SEMBOL + ZAMAN DİLİMİ DURUMU
+# -----------------------
+class IndicatorState:
+    """Bir sembolün tek zaman dilimindeki tüm artımlı göstergeleri.
+
+    Durum, worker'ın gördüğü kırpılmış çerçeveden (DAY_PERIOD/H4_PERIOD) daha
+    uzun bir geçmiş biriktirir. Skaler ve vektörel motorlarla aynı sonucu vermek
+    için değerler görünen pencereye (window: çerçevenin bar sayısı) göre okunur:
+    ısınma eşikleri `visible` ile, EMA20 pencere öncesi önek çıkarılarak
+    (ema20_value). Wilder RSI özyinelemeli olduğundan pencereyle sınırlanamaz.
+    """
+
+    def __init__(self, rsi_period=14, wilder=False):
+        self.rsi = RSI(rsi_period, wilder=wilder)
+        self.ma20, self.ma50, self.ma200 = RollingMean(20), RollingMean(50), RollingMean(200)
+        self.ema20 = EMA(20)
+        self.volume = VolumeAverage(20)
+        self.count = 0
+        self.last_ts = None
+        self.last_bar = None  # (open, high, low, close, volume)
+        self.window = None    # görünen bar sayısı (None: tüm geçmiş)
+        self._ema_hist = deque()  # son window+1 barın her birinden sonraki EMA (num, den)
+
+    def _parts(self):
+        return (self.rsi, self.ma20, self.ma50, self.ma200, self.ema20)
+
+    # --- Pencereye göre okunan değerler ---
+    @property
+    def visible(self):
+        """Çerçevede görünen bar sayısı (skaler motordaki len(df))."""
+        return self.count if self.window is None else min(self.count, self.window)
+
+    @property
+    def rsi_value(self):
+        return self.rsi.value if self.visible >= self.rsi.period + 1 else None
+
+    @property
+    def rsi_prev(self):
+        # compute_rsi(series.iloc[:-1]) karşılığı: son bar hariç pencere
+        return self.rsi.prev if self.visible - 1 >= self.rsi.period + 1 else None
+
+    @property
+    def ema20_value(self):
+        """Yalnızca penceredeki barların ewm(span=20, adjust=True) değeri."""
+        w = self.visible
+        if w == self.count:
+            return self.ema20.value
+        num0, den0 = self._ema_hist[-(w + 1)]
+        scale = self.ema20.beta ** w
+        den = self.ema20.den - scale * den0
+        return (self.ema20.num - scale * num0) / den if den > 0 else None
+
+    def _covers(self, window):
+        """EMA öneki bu pencere için hâlâ elde mi (değilse durum yeniden kurulmalı)?"""
+        if window is None:
+            return self.window is None
+        return self.window is not None and len(self._ema_hist) >= min(self.count, window + 1)
+
+    def _set_window(self, window):
+        self.window = window
+        if window is not None:
+            while len(self._ema_hist) > window + 1:
+                self._ema_hist.popleft()
+
+    # --- Güncelleme ---
+    def append(self, ts, bar):
+        close = bar[3]
+        for ind in self._parts():
+            ind.append(close)
+        self.volume.append(bar[4])
+        self.count += 1
+        self.last_ts, self.last_bar = ts, tuple(bar)
+        if self.window is not None:
+            self._ema_hist.append((self.ema20.num, self.ema20.den))
+            if len(self._ema_hist) > self.window + 1:
+                self._ema_hist.popleft()
+
+    def revise(self, bar):
+        close = bar[3]
+        for ind in self._parts():
+            ind.revise(close)
+        self.volume.revise(bar[4])
+        self.last_bar = tuple(bar)
+        if self._ema_hist:
+            self._ema_hist[-1] = (self.ema20.num, self.ema20.den)
+
+    def sync(self, timestamps, bars, rebuild=True, window=None):
+        """Durumu bar listesiyle eşitler; yalnızca yeni/değişen barlar işlenir.
+
+        window, çerçevenin toplam bar sayısıdır (liste yalnızca kuyruk olabilir).
+        Son kayıtlı zaman listede bulunamazsa (boşluk veya geçmiş değişti) ya da
+        pencere EMA önekinin tutulduğundan uzunsa durum sıfırdan kurulur
+        (rebuild=False ise None döner). İşlenen bar sayısını döndürür.
+        """
+        if not timestamps:
+            return 0
+        if self.last_ts is not None and self._covers(window):
+            self._set_window(window)
+            # Son kayıtlı barı sondan geriye ara (genelde son 1-2 bar içindedir)
+            for k in range(len(timestamps) - 1, -1, -1):
+                if timestamps[k] == self.last_ts:
+                    if tuple(bars[k]) != self.last_bar:
+                        self.revise(bars[k])
+                    for j in range(k + 1, len(timestamps)):
+                        self.append(timestamps[j], bars[j])
+                    return len(timestamps) - k
+                if timestamps[k] < self.last_ts:
+                    break
+        if not rebuild:
+            return None
+        fresh = IndicatorState(self.rsi.period, self.rsi.wilder)
+        fresh.window = window
+        for ts, bar in zip(timestamps, bars):
+            fresh.append(ts, bar)
+        self.__dict__.update(fresh.__dict__)
+        return len(timestamps)
+
+    def to_dict(self):
+        return {"rsi": self.rsi.to_dict(), "ma20": self.ma20.to_dict(), "ma50": self.ma50.to_dict(),
+                "ma200": self.ma200.to_dict(), "ema20": self.ema20.to_dict(),
+                "volume": self.volume.to_dict(), "count": self.count,
+                "last_ts": self.last_ts, "last_bar": self.last_bar,
+                "window": self.window, "ema_hist": list(self._ema_hist)}
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls()
+        obj.rsi = RSI.from_dict(d["rsi"])
+        obj.ma20, obj.ma50, obj.ma200 = (RollingMean.from_dict(d[k]) for k in ("ma20", "ma50", "ma200"))
+        obj.ema20 = EMA.from_dict(d["ema20"])
+        obj.volume = VolumeAverage.from_dict(d["volume"])
+        obj.count, obj.last_ts = d["count"], d["last_ts"]
+        obj.last_bar = tuple(d["last_bar"]) if d["last_bar"] is not None else None
+        # Eski checkpoint'lerde pencere yok: ilk sync durumu çerçeveden yeniden kurar
+        obj.window = d.get("window")
+        obj._ema_hist.extend(tuple(x) for x in d.get("ema_hist", []))
+        return obj
+
+
+def _frame_bars(df):
+    ts = [int(t) for t in df.index.asi8]
+    cols = [df[c].to_numpy(dtype=float).tolist() for c in ("Open", "High", "Low", "Close", "Volume")]
+    return ts, list(zip(*cols))
+
+
+class IndicatorBank:
+    """(sembol, zaman dilimi) -> IndicatorState; diske checkpoint alınabilir."""
+
+    def __init__(self, rsi_period=14, wilder=False):
+        self.rsi_period = rsi_period
+        self.wilder = wilder
+        self.states = {}
+
+    def get(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        if key not in self.states:
+            self.states[key] = IndicatorState(self.rsi_period, self.wilder)
+        return self.states[key]
+
+    def sync_frame(self, symbol, timeframe, df):
+        """DataFrame'in barlarını duruma işler; işlenen bar sayısını döndürür.
+
+        Çerçevenin uzunluğu durumun penceresi olur (değerler kırpılmış çerçeveyle aynı).
+        """
+        state = self.get(symbol, timeframe)
+        # Durum sıcaksa yalnızca kuyruğu dönüştür: son birkaç bar yeterlidir
+        if state.last_ts is not None and len(df) > 8:
+            done = state.sync(*_frame_bars(df.iloc[-8:]), rebuild=False, window=len(df))
+            if done is not None:
+                return done
+        return state.sync(*_frame_bars(df), window=len(df))
+
+    def save(self, path):
+        data = {"rsi_period": self.rsi_period, "wilder": self.wilder,
+                "states": [[s, tf, st.to_dict()] for (s, tf), st in self.states.items()]}
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, rsi_period=14, wilder=False):
+        bank = cls(rsi_period, wilder)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return bank
+        if data.get("rsi_period") != rsi_period or data.get("wilder") != wilder:
+            return bank  # ayarlar değişti: eski checkpoint geçersiz
+        for sym, tf, st in data.get("states", []):
+            bank.states[(sym, tf)] = IndicatorState.from_dict(st)
+        return bank
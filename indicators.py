@@ -0,0 +1,163 @@
+# indicators.py (VEKTÖREL GÖSTERGE MOTORU: Tüm Evren Tek Geçişte)
+#
+# Tüm sembolleri (sembol x bar) NumPy matrisine hizalar ve RSI, SMA, EMA ile
+# hacim ortalamasını sembol döngüsü olmadan hesaplar. Matris sağa hizalıdır:
+# son bar her satırda son sütundadır, kısa seriler soldan NaN ile doldurulur.
+# Sonuçlar bot.py'deki tekil fonksiyonlarla (compute_rsi, detect_ma_crosses,
+# detect_volume_spike, is_yesil1_daily, is_yesil2_4h) aynı kurallara uyar.
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+MA_CROSS_LABELS = ("MA20↑MA50", "MA20↓MA50", "MA50↑MA200", "MA50↓MA200")
+
+
+# -----------------------
+# HİZALAMA
+# -----------------------
+def align_universe(frames, symbols, column="Close"):
+    """(matris, uzunluklar) döndürür; satır sırası symbols ile aynıdır."""
+    series = [frames[s][column].to_numpy(dtype=float) if s in frames else np.empty(0)
+              for s in symbols]
+    lengths = np.array([len(v) for v in series], dtype=int)
+    width = int(lengths.max()) if len(lengths) else 0
+    mat = np.full((len(symbols), width), np.nan)
+    for i, v in enumerate(series):
+        if len(v):
+            mat[i, width - len(v):] = v
+    return mat, lengths
+
+
+# -----------------------
+# GÖSTERGELER (2D, zaman ekseni = 1)
+# -----------------------
+def rolling_mean(mat, window, tail=None):
+    """pandas rolling(window).mean() eşdeğeri; pencerede NaN varsa sonuç NaN.
+
+    tail verilirse yalnızca son `tail` sütun hesaplanır.
+    """
+    n, width = mat.shape
+    if tail is not None:
+        mat = mat[:, max(0, width - (window + tail - 1)):]
+    out = np.full(mat.shape, np.nan)
+    if mat.shape[1] >= window:
+        out[:, window - 1:] = sliding_window_view(mat, window, axis=1).sum(axis=-1) / window
+    return out if tail is None else out[:, -tail:]
+
+
+def rsi(mat, period=14, tail=None):
+    """compute_rsi ile aynı (SMA tabanlı) RSI; tüm satırlar için tek geçişte."""
+    delta = np.diff(mat, axis=1, prepend=np.nan)
+    gain = np.where(np.isnan(delta), np.nan, np.clip(delta, 0, None))
+    loss = np.where(np.isnan(delta), np.nan, -np.clip(delta, None, 0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = rolling_mean(gain, period, tail) / rolling_mean(loss, period, tail)
+        return 100 - (100 / (1 + rs))
+
+
+def ema(mat, span):
+    """pandas ewm(span=span, adjust=True).mean() eşdeğeri; zaman üzerinde, semboller vektörel."""
+    beta = 1 - 2.0 / (span + 1)
+    num = np.zeros(mat.shape[0])
+    den = np.zeros(mat.shape[0])
+    out = np.full(mat.shape, np.nan)
+    for t in range(mat.shape[1]):
+        x = mat[:, t]
+        valid = ~np.isnan(x)
+        num = beta * num + np.where(valid, x, 0.0)
+        den = beta * den + valid
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[:, t] = np.where(den > 0, num / den, np.nan)
+    return out
+
+
+def window_mean(mat, start, stop):
+    """Her satır için mat[:, start:stop] ortalaması (NaN'lar atlanır, pandas .mean() gibi)."""
+    block = mat[:, start:stop]
+    with np.errstate(invalid="ignore"):
+        counts = (~np.isnan(block)).sum(axis=1)
+        sums = np.nansum(block, axis=1)
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+# -----------------------
+# EVREN ÖZETİ
+# -----------------------
+class UniverseIndicators:
+    """compute_universe çıktısı; row(sym) bot.py'nin beklediği Python değerlerini verir."""
+
+    def __init__(self, symbols, arrays):
+        self.symbols = list(symbols)
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        self.arrays = arrays
+
+    def row(self, sym):
+        i = self.index[sym]
+        a = self.arrays
+        rsi4h = float(a["rsi4h"][i]) if a["rsi4h_known"][i] else None
+        ma_crosses = [label for label, flags in zip(MA_CROSS_LABELS, a["ma_flags"]) if flags[i]]
+        has_vol = a["vol_known"][i]
+        return {
+            "price": float(a["price"][i]),
+            "rsi4h": rsi4h,
+            "ma_crosses": ma_crosses,
+            "vol_spike": bool(a["vol_spike"][i]),
+            "last_vol": float(a["last_vol"][i]) if has_vol else None,
+            "avg_vol": float(a["avg_vol"][i]) if has_vol else None,
+            "g1": bool(a["g1"][i]),
+            "g2": bool(a["g2"][i]),
+        }
+
+
+def compute_universe(frames_day, frames_4h, symbols, rsi_period=14, vol_factor=1.7):
+    """Tüm semboller için günlük/4H göstergeleri vektörel olarak hesaplar."""
+    symbols = [s for s in symbols if s in frames_day and s in frames_4h]
+    d_close, d_len = align_universe(frames_day, symbols, "Close")
+    d_open, _ = align_universe(frames_day, symbols, "Open")
+    h_close, h_len = align_universe(frames_4h, symbols, "Close")
+    h_open, _ = align_universe(frames_4h, symbols, "Open")
+    h_vol, _ = align_universe(frames_4h, symbols, "Volume")
+    if not symbols:
+        return UniverseIndicators([], {})
+
+    # 4H RSI (son bar) — compute_rsi: uzunluk < period+1 ise None
+    rsi4h = rsi(h_close, rsi_period, tail=1)[:, -1]
+    rsi4h_known = h_len >= rsi_period + 1
+
+    # Günlük MA kesişimleri (son iki bar) — detect_ma_crosses: en az 210 bar
+    ma_ok = d_len >= 210
+    ma20 = rolling_mean(d_close, 20, tail=2)
+    ma50 = rolling_mean(d_close, 50, tail=2)
+    ma200 = rolling_mean(d_close, 200, tail=2)
+    (p20, n20), (p50, n50), (p200, n200) = (ma20.T, ma50.T, ma200.T)
+    ma_flags = (
+        ma_ok & (p20 <= p50) & (n20 > n50),
+        ma_ok & (p20 >= p50) & (n20 < n50),
+        ma_ok & (p50 <= p200) & (n50 > n200),
+        ma_ok & (p50 >= p200) & (n50 < n200),
+    )
+
+    # Hacim spike — son 20 barın (son bar hariç) ortalaması
+    vol_known = h_len >= 22
+    avg_vol = window_mean(h_vol, -21, -1)
+    last_vol = h_vol[:, -1]
+    with np.errstate(invalid="ignore"):
+        vol_spike = vol_known & (avg_vol > 0) & (last_vol > avg_vol * vol_factor)
+
+    # G1 (günlük): yeşil mum ve RSI yükseliyor (önceki RSI = iloc[:-1] üzerindeki RSI)
+    d_rsi = rsi(d_close, rsi_period, tail=2)
+    with np.errstate(invalid="ignore"):
+        g1 = ((d_len >= 2) & (d_close[:, -1] > d_open[:, -1])
+              & (d_len - 1 >= rsi_period + 1) & (d_rsi[:, -1] > d_rsi[:, -2]))
+
+    # G2 (4H): son iki mum yeşil, RSI <= 60 (NaN geçer), kapanış >= EMA20
+    ema20 = ema(h_close, 20)[:, -1]
+    with np.errstate(invalid="ignore"):
+        g2 = ((h_len >= 2) & (h_close[:, -1] > h_open[:, -1]) & (h_close[:, -2] > h_open[:, -2])
+              & rsi4h_known & ~(rsi4h > 60) & ~(h_close[:, -1] < ema20))
+
+    return UniverseIndicators(symbols, {
+        "price": h_close[:, -1], "rsi4h": rsi4h, "rsi4h_known": rsi4h_known,
+        "ma_flags": ma_flags, "vol_spike": vol_spike, "vol_known": vol_known,
+        "last_vol": last_vol, "avg_vol": avg_vol, "g1": g1, "g2": g2, "ema20": ema20,
+    })
@@ -0,0 +1,175 @@
+# market_calendar.py (BORSA İSTANBUL İŞLEM TAKVİMİ VE TARAMA ZAMANLAYICISI)
+#
+# İşlem günleri, seans saatleri ve bar kapanış anları:
+#   - Sürekli işlem 10:00-18:00 (İstanbul); arife ve 28 Ekim yarım gün (12:30'da biter)
+#   - 4H barlar seans açılışına hizalıdır (resample.py): 14:00 ve seans sonunda kapanır,
+#     günlük bar seans sonunda kapanır
+#   - Hafta sonları, resmî tatiller ve dini bayramlar kapalıdır
+# ScanScheduler bu takvime göre bir sonraki taramanın zamanını ve türünü verir:
+#   full     bar kapanışından hemen sonra (veri gecikmesi kadar beklenerek) tüm semboller
+#   refresh  seans içinde düzenli aralıkla yalnızca öncelikli semboller
+# Piyasa kapalıyken bir sonraki seans açılışına kadar tarama yapılmaz.
+# Not: Yalnızca standart kütüphane kullanır.
+
+from datetime import date, datetime, time, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo
+    SESSION_ZONE = ZoneInfo("Europe/Istanbul")
+except Exception:   # tz veritabanı yoksa: Türkiye 2016'dan beri sabit UTC+3
+    SESSION_ZONE = timezone(timedelta(hours=3))
+
+SESSION_TZ = "Europe/Istanbul"
+SESSION_OPEN_MIN = 10 * 60        # 10:00
+SESSION_CLOSE_MIN = 18 * 60       # 18:00
+HALF_DAY_CLOSE_MIN = 12 * 60 + 30  # 12:30 (arife / 28 Ekim)
+BAR_4H_MIN = 240
+
+# Sabit tarihli resmî tatiller (ay, gün)
+FIXED_HOLIDAYS = ((1, 1), (4, 23), (5, 1), (5, 19), (7, 15), (8, 30), (10, 29))
+FIXED_HALF_DAYS = ((10, 28),)
+
+# Dini bayramlar (Ramazan ve Kurban); yıllık olarak genişletilmeli. Tabloda olmayan
+# yıllar için BIST_HOLIDAYS / BIST_HALF_DAYS ortam değişkenleri kullanılabilir.
+RELIGIOUS_HOLIDAYS = {
+    2024: ("2024-04-10", "2024-04-11", "2024-04-12",
+           "2024-06-16", "2024-06-17", "2024-06-18", "2024-06-19"),
+    2025: ("2025-03-30", "2025-03-31", "2025-04-01",
+           "2025-06-06", "2025-06-07", "2025-06-08", "2025-06-09"),
+    2026: ("2026-03-20", "2026-03-21", "2026-03-22",
+           "2026-05-27", "2026-05-28", "2026-05-29", "2026-05-30"),
+    2027: ("2027-03-09", "2027-03-10", "2027-03-11",
+           "2027-05-16", "2027-05-17", "2027-05-18", "2027-05-19"),
+}
+RELIGIOUS_HALF_DAYS = {
+    2024: ("2024-04-09", "2024-06-15"),
+    2025: ("2025-03-29", "2025-06-05"),
+    2026: ("2026-03-19", "2026-05-26"),
+    2027: ("2027-03-08", "2027-05-15"),
+}
+
+
+def _parse_dates(items):
+    return {date.fromisoformat(s.strip()) for s in items if s and s.strip()}
+
+
+class BistCalendar:
+    """Borsa İstanbul işlem günleri, seans saatleri ve bar kapanışları."""
+
+    def __init__(self, extra_holidays=(), extra_half_days=()):
+        self.extra_holidays = _parse_dates(extra_holidays)
+        self.extra_half_days = _parse_dates(extra_half_days)
+        self._religious = _parse_dates(s for days in RELIGIOUS_HOLIDAYS.values() for s in days)
+        self._religious_half = _parse_dates(s for days in RELIGIOUS_HALF_DAYS.values() for s in days)
+
+    def known_year(self, year):
+        """Dini bayram tablosu bu yılı kapsıyor mu."""
+        return year in RELIGIOUS_HOLIDAYS
+
+    def is_trading_day(self, d):
+        if d.weekday() >= 5 or (d.month, d.day) in FIXED_HOLIDAYS:
+            return False
+        return d not in self._religious and d not in self.extra_holidays
+
+    def is_half_day(self, d):
+        return ((d.month, d.day) in FIXED_HALF_DAYS or d in self._religious_half
+                or d in self.extra_half_days)
+
+    def session(self, d):
+        """(açılış, kapanış) tz'li datetime; işlem günü değilse None."""
+        if not self.is_trading_day(d):
+            return None
+        close_min = HALF_DAY_CLOSE_MIN if self.is_half_day(d) else SESSION_CLOSE_MIN
+        start = datetime.combine(d, time(), tzinfo=SESSION_ZONE)
+        return start + timedelta(minutes=SESSION_OPEN_MIN), start + timedelta(minutes=close_min)
+
+    def is_open(self, now):
+        now = now.astimezone(SESSION_ZONE)
+        sess = self.session(now.date())
+        return sess is not None and sess[0] <= now < sess[1]
+
+    def bar_closes(self, d):
+        """Günün bar kapanışları: [(an, ("4h",) | ("4h", "1d"))]."""
+        sess = self.session(d)
+        if sess is None:
+            return []
+        opened, closed = sess
+        out, t = [], opened + timedelta(minutes=BAR_4H_MIN)
+        while t < closed:
+            out.append((t, ("4h",)))
+            t += timedelta(minutes=BAR_4H_MIN)
+        out.append((closed, ("4h", "1d")))
+        return out
+
+    def bar_close(self, label, minutes=BAR_4H_MIN):
+        """Açılış etiketi verilen barın kapanış anı (seans sonunu geçmez)."""
+        if hasattr(label, "to_pydatetime"):
+            label = label.to_pydatetime()
+        label = label.replace(tzinfo=SESSION_ZONE) if label.tzinfo is None else label.astimezone(SESSION_ZONE)
+        end = label + timedelta(minutes=minutes)
+        sess = self.session(label.date())
+        return min(end, sess[1]) if sess else end
+
+    def next_session(self, now, max_days=30):
+        """now'dan sonra biten ilk seans (açılış, kapanış); bugünkü açık seans dahil."""
+        now = now.astimezone(SESSION_ZONE)
+        for offset in range(max_days):
+            sess = self.session(now.date() + timedelta(days=offset))
+            if sess is not None and sess[1] > now:
+                return sess
+        return None
+
+    def next_bar_close(self, now, after=timedelta(0), max_days=30):
+        """an + after > now olan ilk bar kapanışı: (an, türler) veya None."""
+        now = now.astimezone(SESSION_ZONE)
+        for offset in range(-1, max_days):
+            for when, kinds in self.bar_closes(now.date() + timedelta(days=offset)):
+                if when + after > now:
+                    return when, kinds
+        return None
+
+
+class ScanScheduler:
+    """Takvime göre bir sonraki taramayı seçer: (zaman, "full" | "refresh", açıklama)."""
+
+    def __init__(self, calendar, refresh_interval=300, close_delay=60, min_gap=60):
+        self.calendar = calendar
+        self.refresh_interval = timedelta(seconds=refresh_interval)
+        self.close_delay = timedelta(seconds=close_delay)   # bar kapanışı ile verinin gelmesi arası
+        self.min_gap = timedelta(seconds=min_gap)           # tam taramadan hemen önce refresh yapılmaz
+
+    def next_run(self, now):
+        now = now.astimezone(SESSION_ZONE)
+        bar = self.calendar.next_bar_close(now, after=self.close_delay)
+        full_at = bar[0] + self.close_delay if bar else None
+        reason = f"{'+'.join(bar[1])} kapanışı {bar[0]:%Y-%m-%d %H:%M}" if bar else ""
+        if self.calendar.is_open(now):
+            refresh_at = now + self.refresh_interval
+            if full_at is None or refresh_at + self.min_gap < full_at:
+                return refresh_at, "refresh", "seans içi yenileme"
+            return full_at, "full", reason
+        sess = self.calendar.next_session(now)
+        if full_at is not None and (sess is None or full_at <= sess[0]):
+            return full_at, "full", reason          # seans bitti, son kapanış verisi bekleniyor
+        if sess is None:
+            return now + timedelta(days=1), "refresh", "takvimde seans yok"
+        refresh_at = sess[0] + self.refresh_interval
+        if full_at is not None and refresh_at + self.min_gap >= full_at:
+            return full_at, "full", reason
+        return refresh_at, "refresh", f"seans açılışı {sess[0]:%Y-%m-%d %H:%M}"
+
+
+def priority_symbols(per_symbol, sr_pct=1.5, vol_ratio=1.2, limit=None):
+    """Seans içi yenilemede taranacak semboller: destek/dirence sr_pct kadar yakın ya da
+    hacmi ortalamanın vol_ratio katını aşanlar; en yakın seviye önce."""
+    ranked = []
+    for sym, row in per_symbol.items():
+        price = row.get("price")
+        levels = [x for x in (row.get("supports") or []) + (row.get("resistances") or []) if x is not None]
+        dist = min((abs(price - x) / price * 100 for x in levels), default=None) if price else None
+        ratio = (row.get("last_vol") or 0) / row["avg_vol"] if row.get("avg_vol") else 0
+        near = dist is not None and dist <= sr_pct
+        if near or ratio >= vol_ratio or row.get("stale"):
+            ranked.append((dist if near else sr_pct, -ratio, sym))
+    ranked.sort()
+    return [sym for _, _, sym in ranked[:limit]]
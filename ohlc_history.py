@@ -0,0 +1,346 @@
+# ohlc_history.py (SEMBOL DETAY GRAFİĞİ: OHLC + GÖSTERGE GEÇMİŞİ)
+#
+# Dashboard'un /api/ohlc/<sembol> uç noktası için worker'ın bar önbelleğinden
+# (bars.db, bkz. bar_cache.py) fiyat geçmişi üretir; veri kaynağına (Yahoo)
+# hiç gidilmez.
+#   - İstenen interval önbellekte yoksa saatlik barlardan seans hizalı 4h/1d/1wk
+#     barlar türetilir (resample.resample_session ile aynı etiketler)
+#   - RSI(14), MA20/50/200 ve EMA20 tüm geçmiş üzerinde artımlı hesaplanır
+#     (incremental.py), ardından from/to aralığı kesilir; destek/dirençler
+#     aralığın son barına göre bot.support_resistance ile aynı kuralla bulunur
+#   - Yanıt istenen nokta sayısına sunucuda indirgenir: "minmax" her kovayı tek
+#     muma toplar (en yüksek/en düşük korunur), "lttb" kapanış eğrisinin
+#     şeklini koruyan barları seçer
+#   - Sütunlu JSON (t, o, h, l, c, v, rsi, ...) üretilir; gövde (sembol, interval,
+#     aralık, nokta, yöntem) başına önbelleklenir ve seride yeni bar (ya da son
+#     mumun güncellenmesi) olunca geçersiz olur
+# Not: Yalnızca standart kütüphane ve saf Python modüllerini kullanır (web süreci).
+
+import bisect
+import gzip
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+
+from bar_cache import BarCache
+from incremental import EMA, RSI, RollingMean
+from market_calendar import BAR_4H_MIN, SESSION_CLOSE_MIN, SESSION_OPEN_MIN, SESSION_ZONE
+from sr_levels import local_extrema, nearest_levels
+
+BASE_INTERVAL = "1h"                  # türetmede kullanılan gün içi seri
+OHLCV = ("t", "o", "h", "l", "c", "v")
+INTERVALS = ("1h", "4h", "1d", "1wk")
+DEFAULT_INTERVAL = "4h"
+DEFAULT_POINTS = 500
+MAX_POINTS = 5000
+METHODS = ("minmax", "lttb")
+RSI_PERIOD = 14
+MA_WINDOWS = (20, 50, 200)
+EMA_SPAN = 20
+SR_LOOKBACK, SR_ORDER = 100, 5        # bot.SR_LOOKBACK / bot.SR_ORDER ile aynı
+CACHE_ENTRIES = 256                   # önbellekteki en fazla yanıt gövdesi
+SERIES_ENTRIES = 64                   # göstergeleri hesaplanmış en fazla seri
+PRICE_DECIMALS = 4
+INDICATOR_DECIMALS = 2
+
+
+# -----------------------
+# SEANS HİZALI TOPLAMA
+# -----------------------
+def _zone(tz):
+    # tz'siz seriler yerel duvar saatini UTC gibi saklar (bar_cache.frame_to_rows)
+    return SESSION_ZONE if tz else timezone.utc
+
+
+def bar_label(ts, interval, zone):
+    """Barın ait olduğu seans hizalı 4h/1d/1wk barın açılış zamanı (epoch sn)."""
+    local = datetime.fromtimestamp(ts, zone)
+    day = datetime(local.year, local.month, local.day, tzinfo=zone)
+    if interval == "1d":
+        return int(day.timestamp())
+    if interval == "1wk":
+        return int((day - timedelta(days=local.weekday())).timestamp())
+    n_buckets = -(-(SESSION_CLOSE_MIN - SESSION_OPEN_MIN) // BAR_4H_MIN)
+    bucket = min(max((local.hour * 60 + local.minute - SESSION_OPEN_MIN) // BAR_4H_MIN, 0), n_buckets - 1)
+    return int((day + timedelta(minutes=SESSION_OPEN_MIN + bucket * BAR_4H_MIN)).timestamp())
+
+
+def aggregate(rows, interval, tz=""):
+    """Gün içi satırları [(ts, o, h, l, c, v)] seans hizalı barlara toplar (NaN'lar atlanır)."""
+    zone = _zone(tz)
+    out = []
+    for ts, o, h, l, c, v in rows:
+        label = bar_label(ts, interval, zone)
+        if out and out[-1][0] == label:
+            bar = out[-1]
+            if bar[1] != bar[1]:
+                bar[1] = o
+            if h == h and not h <= bar[2]:
+                bar[2] = h
+            if l == l and not l >= bar[3]:
+                bar[3] = l
+            bar[4] = c
+            if v == v:
+                bar[5] += v
+        else:
+            out.append([label, o, h, l, c, v if v == v else 0.0])
+    return [tuple(bar) for bar in out]
+
+
+# -----------------------
+# GÖSTERGELER VE DESTEK/DİRENÇ
+# -----------------------
+def indicator_columns(closes):
+    """Her bar için RSI, MA20/50/200 ve EMA20 (hazır değilse None)."""
+    rsi = RSI(RSI_PERIOD)
+    means = {w: RollingMean(w) for w in MA_WINDOWS}
+    ema = EMA(EMA_SPAN)
+    cols = {"rsi": [], "ema20": [], **{f"ma{w}": [] for w in MA_WINDOWS}}
+    for x in closes:
+        rsi.append(x)
+        ema.append(x)
+        cols["rsi"].append(rsi.value)
+        cols["ema20"].append(ema.value)
+        for w, m in means.items():
+            m.append(x)
+            cols[f"ma{w}"].append(m.value)
+    return cols
+
+
+def support_resistance(closes, lookback=SR_LOOKBACK, order=SR_ORDER):
+    """bot.support_resistance karşılığı: son lookback kapanışa göre (destekler, dirençler)."""
+    vals = closes[-lookback:]
+    if len(vals) < order * 2 + 3:
+        return [], []
+    max_idx, min_idx = local_extrema(vals, order)
+    return nearest_levels([vals[i] for i in max_idx], [vals[i] for i in min_idx], vals[-1])
+
+
+# -----------------------
+# İNDİRGEME
+# -----------------------
+def minmax_buckets(n, points):
+    """[0, n) aralığını points eşit kovaya böler: [(başlangıç, bitiş)]."""
+    return [(n * k // points, n * (k + 1) // points) for k in range(points)]
+
+
+def lttb_indices(xs, ys, points):
+    """Largest-Triangle-Three-Buckets: şekli koruyan points adet indeks (ilk ve son dahil)."""
+    n = len(xs)
+    if points >= n:
+        return list(range(n))
+    if points < 3:
+        return [0, n - 1]
+    every = (n - 2) / (points - 2)
+    out = [0]
+    a = 0
+    for k in range(points - 2):
+        lo = int(k * every) + 1
+        hi = int((k + 1) * every) + 1
+        nlo, nhi = hi, min(int((k + 2) * every) + 1, n)
+        avg_x = sum(xs[nlo:nhi]) / (nhi - nlo)
+        avg_y = sum(ys[nlo:nhi]) / (nhi - nlo)
+        ax, ay = xs[a], ys[a]
+        best, best_area = lo, -1.0
+        for i in range(lo, hi):
+            area = abs((ax - avg_x) * (ys[i] - ay) - (ax - xs[i]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = i, area
+        out.append(best)
+        a = best
+    out.append(n - 1)
+    return out
+
+
+def downsample(cols, points, method):
+    """cols (eşit uzunlukta sütunlar) -> en fazla points satır; (sütunlar, uygulanan yöntem)."""
+    n = len(cols["t"])
+    if n <= points:
+        return cols, "none"
+    if method == "lttb":
+        idx = lttb_indices(cols["t"], cols["c"], points)
+        return {k: [v[i] for i in idx] for k, v in cols.items()}, method
+    out = {k: [] for k in cols}
+    for lo, hi in minmax_buckets(n, points):
+        out["t"].append(cols["t"][lo])
+        out["o"].append(cols["o"][lo])
+        out["h"].append(max((x for x in cols["h"][lo:hi] if x == x), default=math.nan))
+        out["l"].append(min((x for x in cols["l"][lo:hi] if x == x), default=math.nan))
+        out["c"].append(cols["c"][hi - 1])
+        out["v"].append(math.fsum(x for x in cols["v"][lo:hi] if x == x))
+        # Göstergeler kovanın kapanışındaki değeri alır (mumla tutarlı)
+        for k in cols:
+            if k not in OHLCV:
+                out[k].append(cols[k][hi - 1])
+    return out, method
+
+
+# -----------------------
+# PARAMETRELER
+# -----------------------
+def parse_time(value, end=False):
+    """Epoch sn veya ISO tarih/zaman -> tz'li datetime; tz'siz değerler İstanbul saatidir.
+
+    Yalnızca tarih verilen bitiş (end=True) o günün sonunu kapsar.
+    """
+    if value is None or value == "":
+        return None
+    value = str(value).strip()
+    try:
+        epoch = float(value)
+    except ValueError:
+        epoch = None
+    if epoch is not None:
+        try:
+            return datetime.fromtimestamp(epoch, timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            raise ValueError(f"Geçersiz zaman: {value!r}") from None
+    try:
+        if len(value) == 10:
+            day = date.fromisoformat(value)
+            dt = datetime(day.year, day.month, day.day) + (timedelta(days=1, seconds=-1) if end else timedelta())
+        else:
+            dt = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Geçersiz zaman: {value!r} (epoch sn veya YYYY-MM-DD[THH:MM])") from None
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=SESSION_ZONE)
+
+
+def _series_ts(dt, tz):
+    """datetime -> serinin zaman damgası ölçeği (tz'siz seride yerel duvar saati)."""
+    if dt is None:
+        return None
+    if tz:
+        return int(dt.timestamp())
+    return int(dt.astimezone(SESSION_ZONE).replace(tzinfo=timezone.utc).timestamp())
+
+
+def _num(x, decimals):
+    return None if x is None or x != x else round(x, decimals)
+
+
+# -----------------------
+# SERVİS
+# -----------------------
+class OHLCHistory:
+    """Bar önbelleğinden (salt-okunur) göstergeli, indirgenmiş grafik gövdeleri üretir.
+
+    İki katmanlı LRU önbellek: (sembol, interval) başına toplanmış barlar +
+    göstergeler ve (sembol, interval, from, to, nokta, yöntem) başına hazır
+    JSON/gzip gövde. İkisi de seri sürümüyle (bar_cache.last_row) doğrulanır.
+    """
+
+    def __init__(self, cache, max_entries=CACHE_ENTRIES, max_series=SERIES_ENTRIES):
+        self.cache = cache if isinstance(cache, BarCache) else BarCache(cache, readonly=True)
+        self.max_entries = max_entries
+        self.max_series = max_series
+        self._series = OrderedDict()    # (sym, interval) -> (sürüm, tz, sütunlar)
+        self._bodies = OrderedDict()    # sorgu anahtarı -> (sürüm, ham, gzip)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "series_builds": 0}
+
+    def source(self, symbol, interval):
+        """(kaynak interval, sürüm, tz); sembolün hiç barı yoksa KeyError."""
+        for src in dict.fromkeys((interval, BASE_INTERVAL)):
+            info = self.cache.series_info(symbol, src)
+            last = self.cache.last_row(symbol, src) if info else None
+            if last is not None:
+                return src, (src,) + tuple(last), info[1]
+        raise KeyError(symbol)
+
+    def version(self, symbol, interval):
+        """Seri sürümü (yeni bar ya da son mum değişince değişir); koşullu GET için."""
+        return self.source(symbol, interval)[1]
+
+    @staticmethod
+    def request_key(symbol, interval=DEFAULT_INTERVAL, start=None, end=None,
+                    points=DEFAULT_POINTS, method="minmax"):
+        """Doğrulanmış sorgu anahtarı; start/end parse_time'ın döndürdüğü datetime'lardır."""
+        if interval not in INTERVALS:
+            raise ValueError(f"Desteklenmeyen interval: {interval} ({', '.join(INTERVALS)})")
+        if method not in METHODS:
+            raise ValueError(f"Desteklenmeyen yöntem: {method} ({', '.join(METHODS)})")
+        return symbol, interval, start, end, min(max(int(points), 2), MAX_POINTS), method
+
+    @staticmethod
+    def etag(key, version):
+        digest = hashlib.blake2b(repr((key, version)).encode("utf-8"), digest_size=10).hexdigest()
+        return f"ohlc-{digest}"
+
+    def _lru_get(self, store, key, version):
+        with self._lock:
+            hit = store.get(key)
+            if hit is None or hit[0] != version:
+                return None
+            store.move_to_end(key)
+            return hit
+
+    def _lru_put(self, store, key, value, limit):
+        with self._lock:
+            store[key] = value
+            store.move_to_end(key)
+            while len(store) > limit:
+                store.popitem(last=False)
+
+    def series(self, symbol, interval):
+        """(sürüm, tz, sütunlar): tüm geçmişin barları ve göstergeleri."""
+        src, version, tz = self.source(symbol, interval)
+        hit = self._lru_get(self._series, (symbol, interval), version)
+        if hit is not None:
+            return hit
+        # SQLite NaN'ı NULL olarak saklar; kapanışı olmayan barlar atlanır (resample ile aynı)
+        rows = [tuple(math.nan if x is None else x for x in r)
+                for r in self.cache.read_rows(symbol, src) if r[4] is not None]
+        if src != interval:
+            rows = aggregate(rows, interval, tz)
+        cols = dict(zip(OHLCV, map(list, zip(*rows)))) if rows else {k: [] for k in OHLCV}
+        cols.update(indicator_columns(cols["c"]))
+        entry = (version, tz, cols)
+        self.stats["series_builds"] += 1
+        self._lru_put(self._series, (symbol, interval), entry, self.max_series)
+        return entry
+
+    def query(self, symbol, interval=DEFAULT_INTERVAL, start=None, end=None,
+              points=DEFAULT_POINTS, method="minmax"):
+        """(sürüm, ham JSON, gzip JSON); sembolün barı yoksa KeyError, geçersiz parametrede ValueError."""
+        key = self.request_key(symbol, interval, start, end, points, method)
+        _, interval, start, end, points, method = key
+        version = self.version(symbol, interval)
+        hit = self._lru_get(self._bodies, key, version)
+        if hit is not None:
+            self.stats["hits"] += 1
+            return hit
+        self.stats["misses"] += 1
+        version, tz, cols = self.series(symbol, interval)
+        body = self.render(symbol, interval, tz, cols, _series_ts(start, tz), _series_ts(end, tz),
+                           points, method)
+        raw = json.dumps(body, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+        entry = (version, raw, gzip.compress(raw, 6))
+        self._lru_put(self._bodies, key, entry, self.max_entries)
+        return entry
+
+    @staticmethod
+    def render(symbol, interval, tz, cols, start_ts, end_ts, points, method):
+        ts = cols["t"]
+        lo = 0 if start_ts is None else bisect.bisect_left(ts, start_ts)
+        hi = len(ts) if end_ts is None else max(bisect.bisect_right(ts, end_ts), lo)
+        window = {k: v[lo:hi] for k, v in cols.items()}
+        supports, resistances = support_resistance(cols["c"][:hi])
+        out, applied = downsample(window, points, method)
+
+        def price(k):
+            return [_num(x, PRICE_DECIMALS) for x in out[k]]
+
+        body = {"symbol": symbol, "interval": interval, "tz": tz or None,
+                "total": hi - lo, "points": len(out["t"]), "method": applied,
+                "last_ts": ts[-1] if ts else None,
+                "t": out["t"], "o": price("o"), "h": price("h"), "l": price("l"), "c": price("c"),
+                "v": [None if x != x else int(x) for x in out["v"]],
+                "levels": {"supports": [_num(x, PRICE_DECIMALS) for x in supports],
+                           "resistances": [_num(x, PRICE_DECIMALS) for x in resistances]}}
+        for k in ("rsi", *(f"ma{w}" for w in MA_WINDOWS), "ema20"):
+            body[k] = [_num(x, INDICATOR_DECIMALS if k == "rsi" else PRICE_DECIMALS) for x in out[k]]
+        return body
@@ -0,0 +1,61 @@
+# resample.py (SEANS HİZALI YENİDEN ÖRNEKLEME)
+#
+# Günlük, 4 saatlik (ve istenirse haftalık) barları tek bir gün içi (ör. 1h)
+# indirmeden yerel olarak üretir. Borsa İstanbul sürekli işlem seansı
+# 10:00-18:00 (İstanbul saati) kabul edilir; 4 saatlik barlar seans açılışına
+# hizalanır (10:00-14:00, 14:00-18:00). Açılış öncesi/kapanış seansı barları
+# sırasıyla ilk ve son 4 saatlik bara dahil edilir.
+
+import numpy as np
+import pandas as pd
+
+# Seans saatleri işlem takvimiyle (market_calendar.py) ortaktır
+from market_calendar import BAR_4H_MIN, SESSION_CLOSE_MIN, SESSION_OPEN_MIN, SESSION_TZ
+
+AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def _local_index(idx):
+    """İndeksi İstanbul saatine çevirir; tz bilgisi yoksa zaten yerel kabul edilir."""
+    if getattr(idx, "tz", None) is None:
+        return idx
+    return idx.tz_convert(SESSION_TZ)
+
+
+def _aggregate(df, key):
+    agg = {c: f for c, f in AGG.items() if c in df.columns}
+    out = df.groupby(key).agg(agg)
+    out.index.name = "Date"
+    return out
+
+
+def resample_session(df, freq="1d"):
+    """Gün içi barları seans sınırlarına hizalı "4h", "1d" veya "1wk" barlara toplar."""
+    if df is None or df.empty:
+        return None
+    df = df.dropna(subset=["Close"])
+    local = _local_index(df.index)
+    day = local.normalize()
+    if freq == "1d":
+        key = day
+    elif freq == "1wk":
+        key = day - pd.to_timedelta(day.weekday, unit="D")
+    elif freq == "4h":
+        n_buckets = -(-(SESSION_CLOSE_MIN - SESSION_OPEN_MIN) // BAR_4H_MIN)
+        minutes = np.asarray(local.hour * 60 + local.minute) - SESSION_OPEN_MIN
+        bucket = np.clip(minutes // BAR_4H_MIN, 0, n_buckets - 1)
+        key = day + pd.to_timedelta(SESSION_OPEN_MIN + bucket * BAR_4H_MIN, unit="m")
+    else:
+        raise ValueError(f"Desteklenmeyen frekans: {freq}")
+    return _aggregate(df, key)
+
+
+def derive_frames(df_base, weekly=False):
+    """Tek bir gün içi çerçeveden {"4h", "1d"[, "1wk"]} çerçevelerini üretir.
+
+    Tüm zaman dilimleri aynı kaynaktan türetildiği için son tik hepsinde aynıdır.
+    """
+    out = {"4h": resample_session(df_base, "4h"), "1d": resample_session(df_base, "1d")}
+    if weekly:
+        out["1wk"] = resample_session(df_base, "1wk")
+    return out
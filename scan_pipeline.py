@@ -0,0 +1,188 @@
+# scan_pipeline.py (AŞAMALI AKIŞ: indir -> göstergeler -> kurallar -> yayın)
+#
+# Tarama, sınırlı kuyruklarla bağlanmış aşamalara bölünür; her aşamanın kendi
+# thread'leri vardır. Bir öğe (ör. sembol grubu) bir aşamayı bitirir bitirmez
+# sonrakine geçer, böylece ilk sembolün sinyali son indirmeyi beklemeden
+# yayınlanır. Aşama fonksiyonu bir öğe alır ve sonraki aşamaya gidecek öğeleri
+# (liste/üreteç) döndürür; son aşamanın çıktısı atılır.
+# Süresini aşan öğe beklenmez (on_stale ile bildirilir); askıda kalan tek bir
+# indirme döngüyü durduramaz.
+# Not: Yalnızca standart kütüphane kullanır.
+
+import queue
+import threading
+import time
+from collections import deque
+
+QUEUE_SIZE = 8            # aşamalar arası kuyruk uzunluğu (geri basınç)
+LATENCY_WINDOW = 2000     # metrik başına saklanan son ölçüm sayısı
+
+
+class LatencyStats:
+    """Adlandırılmış gecikme ölçümlerinin kayan penceresi (saniye) ve yüzdelikleri.
+
+    observer(ad, saniye) verilirse her ölçüm ona da iletilir (ör. histogram metrikleri).
+    """
+
+    def __init__(self, window=LATENCY_WINDOW, observer=None):
+        self.window = window
+        self.observer = observer
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.window)
+            self.samples[name].append(seconds)
+        if self.observer is not None:
+            self.observer(name, seconds)
+
+    def summary(self):
+        """{ad: {"n", "p50", "p95", "max"}} (saniye, 3 hane)."""
+        with self._lock:
+            snap = {name: sorted(values) for name, values in self.samples.items()}
+        out = {}
+        for name, values in snap.items():
+            if not values:
+                continue
+            n = len(values)
+            out[name] = {"n": n, "p50": round(values[(n - 1) // 2], 3),
+                         "p95": round(values[min(n - 1, int(0.95 * n))], 3), "max": round(values[-1], 3)}
+        return out
+
+
+class Stage:
+    def __init__(self, name, fn, workers=1, deadline=None):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.deadline = deadline    # öğe başına süre sınırı (sn); None = sınırsız
+
+
+class _Ticket:
+    """Aşamada işlenen bir öğe; süre aşımında terk edilir ve sonucu atılır."""
+    __slots__ = ("stage", "item", "started", "abandoned")
+
+    def __init__(self, stage, item):
+        self.stage, self.item = stage, item
+        self.started = time.monotonic()
+        self.abandoned = False
+
+
+class Pipeline:
+    """Aşamaları kuyruklarla bağlar; run() her tarama döngüsünde yeni thread'lerle çalışır."""
+
+    def __init__(self, stages, queue_size=QUEUE_SIZE, metrics=None, on_error=None, on_stale=None):
+        self.stages = list(stages)
+        self.queue_size = queue_size
+        self.metrics = metrics or LatencyStats()
+        self.on_error = on_error or (lambda stage, item, exc: None)
+        self.on_stale = on_stale or (lambda stage, item, reason: None)
+
+    def run(self, items, deadline=None, poll=0.05):
+        """Tüm öğeler son aşamayı geçene ya da deadline (sn) dolana kadar çalışır.
+
+        Tamamlandıysa True; deadline dolduysa bekleyen öğeler on_stale ile bildirilir ve False döner.
+        """
+        queues = [queue.Queue()] + [queue.Queue(maxsize=self.queue_size) for _ in self.stages[1:]]
+        stop = threading.Event()
+        cond = threading.Condition()
+        # Öğe kuyruktan alınırken ve sonraki kuyruğa bırakılırken cond tutulur: süre
+        # dolduğunda her öğe ya active'de, ya held'de (bırakılmayı bekleyen çıktılar)
+        # ya da bir kuyruktadır; hiçbiri bildirilmeden kaybolmaz.
+        state = {"outstanding": len(items), "active": set(), "held": []}
+
+        def worker(idx, stage):
+            src = queues[idx]
+            dst = queues[idx + 1] if idx + 1 < len(queues) else None
+            while True:
+                with cond:
+                    while True:
+                        if stop.is_set():
+                            return
+                        try:
+                            item = src.get_nowait()
+                            break
+                        except queue.Empty:
+                            cond.wait(timeout=poll)
+                    ticket = _Ticket(stage, item)
+                    state["active"].add(ticket)
+                    cond.notify_all()           # kuyrukta yer açıldı
+                try:
+                    outputs = list(stage.fn(item) or ())
+                except Exception as e:
+                    outputs = []
+                    if not ticket.abandoned:
+                        self.on_error(stage.name, item, e)
+                elapsed = time.monotonic() - ticket.started
+                with cond:
+                    state["active"].discard(ticket)
+                    if ticket.abandoned:
+                        continue        # süre aşımında zaten sayılmadı; geç sonucu at
+                    self.metrics.add(f"stage.{stage.name}", elapsed)
+                    if dst is not None and outputs:
+                        held = (idx + 1, deque(outputs))
+                        state["outstanding"] += len(outputs)
+                        state["held"].append(held)
+                        while held[1] and not stop.is_set():
+                            try:
+                                dst.put_nowait(held[1][0])
+                                held[1].popleft()
+                                cond.notify_all()
+                            except queue.Full:
+                                cond.wait(timeout=poll)
+                        if stop.is_set():
+                            return      # kalan çıktılar run() tarafından stale bildirildi
+                        state["held"].remove(held)
+                    state["outstanding"] -= 1
+                    if state["outstanding"] == 0:
+                        cond.notify_all()
+
+        for item in items:
+            queues[0].put(item)
+        for idx, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                threading.Thread(target=worker, args=(idx, stage), daemon=True,
+                                 name=f"pipe-{stage.name}-{n}").start()
+
+        t_end = None if deadline is None else time.monotonic() + deadline
+        try:
+            with cond:
+                while state["outstanding"] > 0:
+                    now = time.monotonic()
+                    for ticket in list(state["active"]):
+                        limit = ticket.stage.deadline
+                        if limit is not None and now - ticket.started > limit:
+                            ticket.abandoned = True
+                            state["active"].discard(ticket)
+                            state["outstanding"] -= 1
+                            self.on_stale(ticket.stage.name, ticket.item, f"zaman aşımı ({limit:.0f}s)")
+                    if t_end is not None and now >= t_end:
+                        break
+                    if state["outstanding"] > 0:
+                        cond.wait(timeout=poll)
+                if state["outstanding"] == 0:
+                    return True
+                # Döngü süresi doldu: önce durdurulur (cond tutulurken hiçbir öğe el
+                # değiştiremez), sonra işlenmekte, bırakılmayı ve kuyrukta bekleyen öğeler stale
+                stop.set()
+                for ticket in list(state["active"]):
+                    ticket.abandoned = True
+                    self.on_stale(ticket.stage.name, ticket.item, "döngü süresi doldu")
+                state["active"].clear()
+                for idx, outputs in state["held"]:
+                    for out in outputs:
+                        self.on_stale(self.stages[idx].name, out, "döngü süresi doldu")
+                    outputs.clear()
+                state["held"].clear()
+                for stage, q in zip(self.stages, queues):
+                    while True:
+                        try:
+                            self.on_stale(stage.name, q.get_nowait(), "döngü süresi doldu")
+                        except queue.Empty:
+                            break
+                cond.notify_all()
+                return False
+        finally:
+            stop.set()
@@ -0,0 +1,59 @@
+# scan_pool.py (EŞZAMANLI TARAMA: Hız Sınırlayıcı)
+#
+# Veri kaynağına giden istekler token-bucket ile sınırlandırılır; indirme
+# thread'leri ve süre sınırları scan_pipeline.py'dadır.
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Saniyede `rate` token üreten, en fazla `burst` token biriktiren sınırlayıcı."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Token alınana kadar bekler; timeout dolarsa False döner."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+class RateLimitedProvider:
+    """Her fetch_many çağrısından önce TokenBucket'tan token alan DataProvider sarmalayıcısı."""
+
+    def __init__(self, inner, bucket, timeout=None):
+        self.inner = inner
+        self.bucket = bucket
+        self.timeout = timeout
+        self.name = f"ratelimited:{inner.name}"
+
+    def fetch_many(self, symbols, period="90d", interval="4h", **kwargs):
+        if not self.bucket.acquire(self.timeout):
+            raise TimeoutError("Veri kaynağı hız sınırı: token beklenirken süre doldu")
+        return self.inner.fetch_many(symbols, period=period, interval=interval, **kwargs)
+
+    def fetch(self, symbol, period="90d", interval="4h"):
+        return self.fetch_many([symbol], period=period, interval=interval).get(symbol)
+
+    def __getattr__(self, name):
+        # cache, evict gibi alt kaynak özelliklerini dışarı aç
+        return getattr(self.inner, name)
@@ -0,0 +1,231 @@
+# sharding.py (SEMBOL EVRENİNİN WORKER SÜREÇLERİNE BÖLÜNMESİ)
+#
+# N worker süreci (aynı makinede ya da ayrı dyno'larda) sembol evrenini tutarlı
+# hash (consistent hashing) halkasıyla paylaşır: her sembolün sahibi, halkada
+# hash'inden sonra gelen ilk sanal düğümün shard'ıdır. Bir shard eklenip
+# çıktığında yalnızca onun payına düşen semboller el değiştirir.
+#
+# Üyelik:
+#   - BIST_SHARD_MEMBERS verilirse sabit liste ("a,b,c")
+#   - verilmezse ortak dizindeki (SHARD_DIR) taze shard dosyalarından keşfedilir;
+#     dosyası SHARD_TTL'den eski olan shard ölü sayılır ve sembolleri diğerlerine geçer
+# Her shard kendi kısmi durumunu <SHARD_DIR>/<id>.snap dosyasına yazar (shared_state.py
+# biçimi). Web süreci ShardedSnapshotReader ile tüm shard'ları tek görünümde birleştirir;
+# kalp atışı shard başınadır, ölü shard'ın sembolleri "stale" işaretlenir.
+# Not: Yalnızca standart kütüphane kullanır.
+
+import bisect
+import hashlib
+import os
+import threading
+import time
+
+from shared_state import SnapshotReader, read_generation
+
+SNAP_SUFFIX = ".snap"
+DEFAULT_VNODES = 64
+DEFAULT_TTL = 900          # sn; worker boşta en geç IDLE_HEARTBEAT'te bir yazar
+MERGED_SIGNALS = 50        # birleşik görünümdeki son sinyal sayısı
+GENERATION_BITS = 52       # birleşik generation JS'de (SSE id, ETag) tam sayı kalsın
+
+
+def _hash(key):
+    """Süreçler ve makineler arasında kararlı 64 bit hash (PYTHONHASHSEED'den bağımsız)."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Sanal düğümlü tutarlı hash halkası."""
+
+    def __init__(self, members, vnodes=DEFAULT_VNODES):
+        self.members = sorted(set(members))
+        if not self.members:
+            raise ValueError("Halkada en az bir shard olmalı")
+        points = sorted((_hash(f"{m}#{i}"), m) for m in self.members for i in range(vnodes))
+        self._keys = [p for p, _ in points]
+        self._owners = [m for _, m in points]
+
+    def owner(self, key):
+        idx = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._owners[idx]
+
+    def partition(self, keys):
+        """{shard: [anahtarlar]} (girdi sırası korunur; payı olmayan shard boş listeyle)."""
+        out = {m: [] for m in self.members}
+        for key in keys:
+            out[self.owner(key)].append(key)
+        return out
+
+    def owned(self, keys, member):
+        return [k for k in keys if self.owner(k) == member]
+
+
+# -----------------------
+# SHARD DOSYALARI VE ÜYELİK
+# -----------------------
+def shard_path(directory, shard_id):
+    return os.path.join(directory, f"{shard_id}{SNAP_SUFFIX}")
+
+
+def scan_shards(directory, ttl=DEFAULT_TTL, now=None):
+    """{shard: (dosya yolu, yaş sn, canlı mı)}; dizin yoksa boş."""
+    now = time.time() if now is None else now
+    out = {}
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return out
+    for entry in entries:
+        if not entry.name.endswith(SNAP_SUFFIX) or not entry.is_file():
+            continue
+        try:
+            age = max(0.0, now - entry.stat().st_mtime)
+        except FileNotFoundError:
+            continue
+        out[entry.name[:-len(SNAP_SUFFIX)]] = (entry.path, age, age <= ttl)
+    return out
+
+
+def live_members(directory, self_id, ttl=DEFAULT_TTL, static=None):
+    """Halkanın güncel üyeleri: sabit liste ya da taze dosyası olan shard'lar (kendisi her zaman dahil)."""
+    if static:
+        return sorted(set(static) | {self_id})
+    alive = {sid for sid, (_, _, ok) in scan_shards(directory, ttl).items() if ok}
+    return sorted(alive | {self_id})
+
+
+def load_symbols(path, default):
+    """Sembol listesi dosyası (satır ya da virgülle ayrılmış, # yorum); yol boşsa default."""
+    if not path:
+        return list(default)
+    symbols = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            symbols.extend(s.strip().upper() for s in line.split(",") if s.strip())
+    return list(dict.fromkeys(symbols))
+
+
+# -----------------------
+# WEB: BİRLEŞİK OKUYUCU
+# -----------------------
+def _merge_generation(key):
+    digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> (64 - GENERATION_BITS)
+
+
+def _latest(items, field):
+    values = [x for x in items if x and x.get(field)]
+    return max(values, key=lambda x: x[field]) if values else None
+
+
+class ShardedSnapshotReader:
+    """Shard anlık görüntülerini tek durumda birleştirir; SnapshotReader ile aynı arayüz.
+
+    Birleşik generation, shard'ların (id, generation, canlı mı) listesinin hash'idir:
+    yalnızca eşitlik için karşılaştırılır (ETag, SSE Last-Event-ID). Shard dosyaları
+    generation değişmedikçe yeniden ayrıştırılmaz.
+    """
+
+    def __init__(self, directory, ttl=DEFAULT_TTL, count_signals=None, signals=MERGED_SIGNALS):
+        self.directory = directory
+        self.ttl = ttl
+        self.count_signals = count_signals     # toplam sinyal (ortak SignalStore) için çağrılabilir
+        self.signals = signals
+        self.generation = None
+        self.state = None
+        self._key = None
+        self._readers = {}
+        self._lock = threading.Lock()
+
+    def _scan(self):
+        shards = scan_shards(self.directory, self.ttl)
+        key = tuple(sorted((sid, read_generation(path), alive) for sid, (path, _, alive) in shards.items()))
+        return shards, tuple(k for k in key if k[1] is not None)
+
+    def peek(self):
+        """Birleşik generation (yalnızca başlıklar okunur); hiç shard yoksa None."""
+        _, key = self._scan()
+        return _merge_generation(key) if key else None
+
+    def get(self):
+        """(generation, birleşik durum); shard dosyası yoksa FileNotFoundError."""
+        with self._lock:
+            shards, key = self._scan()
+            if not key:
+                raise FileNotFoundError(f"Shard anlık görüntüsü yok: {self.directory}")
+            if key == self._key:
+                return self.generation, self.state
+            parts = []
+            for sid, _, alive in key:
+                reader = self._readers.get(sid)
+                if reader is None:
+                    reader = self._readers[sid] = SnapshotReader(shards[sid][0])
+                try:
+                    _, state = reader.get()
+                except (FileNotFoundError, ValueError):
+                    continue
+                parts.append((sid, alive, shards[sid][1], state))
+            for sid in set(self._readers) - set(shards):
+                del self._readers[sid]
+            self._key = key
+            self.generation = _merge_generation(key)
+            self.state = self.merge(parts)
+            self.state["generation"] = self.generation
+            return self.generation, self.state
+
+    def merge(self, parts):
+        """parts: [(shard, canlı mı, yaş sn, durum)] -> tek bot.py durumu gibi görünen sözlük."""
+        # Önce canlı shard'lar: rebalance sırasında aynı sembol iki shard'da olabilir
+        parts = sorted(parts, key=lambda p: (not p[1], p[0]))
+        live = [p for p in parts if p[1]]
+        per_symbol, errors, signals, shards = {}, [], [], []
+        for sid, alive, age, state in parts:
+            status = state.get("status", {})
+            rows = state.get("per_symbol", {})
+            for sym, row in rows.items():
+                if sym in per_symbol:
+                    continue
+                row = dict(row, shard=sid)
+                if not alive:
+                    row["stale"] = True
+                per_symbol[sym] = row
+            errors.extend(dict(e, shard=sid) for e in state.get("errors", []))
+            signals.extend(state.get("signals", []))
+            shards.append({"id": sid, "alive": alive, "age_s": round(age, 1),
+                           "heartbeat": status.get("worker_heartbeat"), "last_run": status.get("last_run"),
+                           "symbols": len(rows), "errors_count": len(state.get("errors", [])),
+                           "next_scan": status.get("next_scan")})
+        signals.sort(key=lambda s: s.get("time") or "")
+        last_signal = _latest([p[3].get("last_signal") for p in parts], "time")
+        statuses = [p[3].get("status", {}) for p in live]
+        first = statuses[0] if statuses else {}
+        total = None
+        if self.count_signals is not None:
+            try:
+                total = self.count_signals()
+            except Exception:
+                total = None
+        if total is None:
+            # Shard'lar ortak depoyla başladıysa toplamlar çakışır; depo yoksa en iyi tahmin en büyüğü
+            total = max((p[3].get("status", {}).get("total_signals", 0) for p in parts), default=0)
+        status = {
+            "running": any(s.get("running") for s in statuses),
+            "last_run": max((s["last_run"] for s in statuses if s.get("last_run")), default=None),
+            "total_signals": total,
+            "last_signal_time": last_signal["time"] if last_signal else "Yok",
+            "errors_count": len(errors),
+            "market_open": first.get("market_open"),
+            "next_scan": min((s["next_scan"] for s in statuses if s.get("next_scan")), default=None),
+            "worker_heartbeat": max((s["worker_heartbeat"] for s in statuses
+                                     if s.get("worker_heartbeat")), default=None),
+            "shards": shards,
+            "dead_shards": [s["id"] for s in shards if not s["alive"]],
+        }
+        if not statuses:
+            status["error"] = "Canlı shard yok (tüm shard kalp atışları eski)."
+        return {"status": status, "per_symbol": dict(sorted(per_symbol.items())),
+                "signals": signals[-self.signals:], "last_signal": last_signal, "errors": errors,
+                "rules": live[0][3].get("rules") if live else None,
+                "pipeline": {p[0]: p[3].get("pipeline") for p in parts},
+                "shard_metrics": {p[0]: p[3].get("metrics") for p in parts}}
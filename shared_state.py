@@ -0,0 +1,162 @@
+# shared_state.py (WORKER <-> WEB PAYLAŞILAN DURUM ANLIK GÖRÜNTÜSÜ)
+#
+# Worker tüm durumu (özet, per_symbol, son sinyaller, hatalar) tek bir dosyaya
+# atomik olarak yazar: geçici dosyaya yazılır, fsync edilir ve os.replace ile
+# yerine konur. Okuyucu hiçbir zaman yarım yazılmış dosya görmez.
+#
+# Dosya biçimi:  "BISTSNAP1 <generation> <gövde uzunluğu>\n" + kompakt JSON
+# generation her yayında artar; okuyucu yalnızca ilk satırı okuyarak durumun
+# değişip değişmediğini anlar ve değişmediyse JSON'u hiç ayrıştırmaz.
+#
+# Durum şeması da buradadır: worker (bot.py) anlık görüntüyü build_snapshot ile
+# kurar, web tarafı (dashboard_web, state_broadcast, sharding) aynı alanları
+# okur. Web süreci analiz yığınını (pandas/NumPy/yfinance) hiç içe aktarmaz;
+# bkz. bench/import_budget.py.
+# Not: Yalnızca standart kütüphane kullanır.
+
+import json
+import math
+import os
+import threading
+from datetime import datetime
+
+MAGIC = b"BISTSNAP1"
+
+# Anlık görüntüye konan son sinyal sayısı (tam geçmiş SignalStore'da)
+SNAPSHOT_SIGNALS = 50
+NO_WORKER_ERROR = "Status dosyası bulunamadı (Worker aktif değil)."
+CORRUPT_ERROR = "Status dosyası okunamıyor (Bozuk format)."
+
+
+# -----------------------
+# DURUM ŞEMASI
+# -----------------------
+def offline_state(error=NO_WORKER_ERROR):
+    """Worker durumu okunamadığında web'in kullandığı boş durum (generation yok)."""
+    return {"status": {"running": False, "error": error}, "per_symbol": {}, "signals": [],
+            "last_signal": None, "errors": []}
+
+
+def status_summary(state, **extra):
+    """Worker'ın bellek içi durumundan anlık görüntünün "status" bölümü."""
+    last_signal = state.get("last_signal")
+    return {"running": state.get("running", False),
+            "last_run": state.get("last_run"),
+            "total_signals": state.get("total_signals", 0),
+            "last_signal_time": last_signal.get("time", "Yok") if last_signal else "Yok",
+            "errors_count": len(state.get("errors", [])),
+            **extra,
+            "worker_heartbeat": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+
+
+def build_snapshot(state, signals=SNAPSHOT_SIGNALS, **extra):
+    """Yayınlanacak anlık görüntü: status, per_symbol, son sinyaller, hatalar + ek bölümler."""
+    snapshot = {"status": status_summary(state, **state.get("schedule", {})),
+                "per_symbol": state.get("per_symbol", {}),
+                "signals": list(state.get("signals", []))[-signals:],
+                "last_signal": state.get("last_signal"),
+                "errors": state.get("errors", [])}
+    snapshot.update(extra)
+    return snapshot
+
+
+def _clean(obj):
+    """JSON'a uygun olmayan değerleri (NaN/inf, NumPy skalerleri, tuple) dönüştürür."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {str(k): _clean(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_clean(v) for v in obj]
+    if hasattr(obj, "item") and not isinstance(obj, (str, bytes)):
+        return _clean(obj.item())   # NumPy skaleri
+    return obj
+
+
+def encode_snapshot(state, generation):
+    body = json.dumps(_clean(state), separators=(",", ":"), ensure_ascii=False,
+                      allow_nan=False, default=str).encode("utf-8")
+    return MAGIC + b" %d %d\n" % (generation, len(body)) + body
+
+
+def write_snapshot(path, state, generation):
+    """Anlık görüntüyü atomik olarak yazar."""
+    data = encode_snapshot(state, generation)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return len(data)
+
+
+def _parse_header(line):
+    parts = line.split()
+    if len(parts) != 3 or parts[0] != MAGIC:
+        raise ValueError("Geçersiz anlık görüntü başlığı")
+    return int(parts[1]), int(parts[2])
+
+
+def read_generation(path):
+    """Yalnızca başlığı okur; dosya yoksa None."""
+    try:
+        with open(path, "rb") as f:
+            return _parse_header(f.readline())[0]
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def read_snapshot(path, known_generation=None):
+    """(generation, durum) döndürür; generation değişmediyse durum None'dır.
+
+    Dosya yoksa FileNotFoundError, bozuksa ValueError yükseltir.
+    """
+    with open(path, "rb") as f:
+        generation, length = _parse_header(f.readline())
+        if generation == known_generation:
+            return generation, None
+        body = f.read(length)
+    if len(body) != length:
+        raise ValueError("Anlık görüntü eksik")
+    return generation, json.loads(body)
+
+
+class SnapshotWriter:
+    """Worker tarafı: her publish'te generation'ı artırarak yazar."""
+
+    def __init__(self, path):
+        self.path = path
+        # Yeniden başlatmada generation geri gitmesin
+        self.generation = read_generation(path) or 0
+        self._lock = threading.Lock()
+
+    def publish(self, state):
+        """Durumu yeni generation ile yazar (state["generation"] da eklenir)."""
+        with self._lock:
+            self.generation += 1
+            state["generation"] = self.generation
+            write_snapshot(self.path, state, self.generation)
+            return self.generation
+
+
+class SnapshotReader:
+    """Web tarafı: generation değişmedikçe önceki ayrıştırılmış durumu döndürür."""
+
+    def __init__(self, path):
+        self.path = path
+        self.generation = None
+        self.state = None
+        self._lock = threading.Lock()
+
+    def peek(self):
+        """Yalnızca dosyadaki generation (ayrıştırmadan); dosya yoksa None."""
+        return read_generation(self.path)
+
+    def get(self):
+        """(generation, durum); dosya yoksa/bozuksa istisna yükseltir."""
+        with self._lock:
+            generation, state = read_snapshot(self.path, self.generation)
+            if state is not None:
+                self.generation, self.state = generation, state
+            return self.generation, self.state
@@ -0,0 +1,108 @@
+# signal_dedup.py (SİNYAL BASTIRMA / TEKİLLEŞTİRME İNDEKSİ)
+#
+# Aynı koşul (ör. hacim spike, MA kesişimi) art arda birçok taramada doğru
+# kalır. Her tetikleyici (sembol, tetikleyici tipi, seviye/bar) anahtarıyla
+# kaydedilir ve kendi bekleme süresi (cooldown) dolmadan tekrar gönderilmez.
+# Tüm tetikleyiciler bastırılmış olsa bile güç yükselirse (ör. buy ->
+# strong_buy) ya da yön değişirse sinyal yeniden gönderilir.
+# İndeks JSON dosyasına atomik yazılır; worker yeniden başlayınca yüklenir.
+
+import json
+import os
+import threading
+import time
+
+DEFAULT_COOLDOWN = 4 * 3600
+
+STRENGTH_RANK = {None: 0, "buy": 1, "sell": 1, "strong_buy": 2, "strong_sell": 2}
+
+
+def _direction(strength):
+    if not strength:
+        return None
+    return "buy" if "buy" in strength else "sell"
+
+
+def is_escalation(old, new):
+    """new gücü old'a göre yükseltme (veya yön değişimi) mi?"""
+    if _direction(new) and _direction(old) and _direction(new) != _direction(old):
+        return True
+    return STRENGTH_RANK.get(new, 0) > STRENGTH_RANK.get(old, 0)
+
+
+class SuppressionIndex:
+    """(sembol, tetikleyici, seviye) -> son gönderim zamanı; sembol -> son gönderilen güç."""
+
+    def __init__(self, path=None, cooldowns=None, default_cooldown=DEFAULT_COOLDOWN):
+        self.path = path
+        self.cooldowns = dict(cooldowns or {})
+        self.default_cooldown = default_cooldown
+        self.entries = {}     # "sym|trigger|level" -> ts
+        self.strengths = {}   # sym -> (strength, ts)
+        self.stats = {"emitted": 0, "suppressed": 0, "escalated": 0}
+        self._lock = threading.Lock()
+        self._dirty = False
+        if path:
+            self._load()
+
+    def cooldown(self, trigger):
+        return self.cooldowns.get(trigger, self.default_cooldown)
+
+    @staticmethod
+    def _key(symbol, trigger, level):
+        return f"{symbol}|{trigger}|{level if level is not None else ''}"
+
+    def should_emit(self, symbol, triggers, strength, now=None):
+        """triggers: {tetikleyici: seviye}. Sinyal gönderilecekse True döner ve kaydeder."""
+        now = now or time.time()
+        with self._lock:
+            fresh = [t for t, lvl in triggers.items()
+                     if now - self.entries.get(self._key(symbol, t, lvl), -1e18) >= self.cooldown(t)]
+            last_strength, last_ts = self.strengths.get(symbol, (None, 0))
+            escalated = not fresh and is_escalation(last_strength, strength)
+            if not fresh and not escalated:
+                self.stats["suppressed"] += 1
+                return False
+            for t, lvl in triggers.items():
+                self.entries[self._key(symbol, t, lvl)] = now
+            self.strengths[symbol] = (strength, now)
+            self.stats["emitted"] += 1
+            if escalated:
+                self.stats["escalated"] += 1
+            self._dirty = True
+            return True
+
+    def prune(self, now=None):
+        """Bekleme süresi çoktan dolmuş kayıtları siler."""
+        now = now or time.time()
+        horizon = 2 * max([self.default_cooldown] + list(self.cooldowns.values()))
+        with self._lock:
+            old = [k for k, ts in self.entries.items() if now - ts > horizon]
+            for k in old:
+                del self.entries[k]
+            for sym in [s for s, (_, ts) in self.strengths.items() if now - ts > horizon]:
+                del self.strengths[sym]
+            if old:
+                self._dirty = True
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        self.prune()
+        with self._lock:
+            data = {"entries": self.entries,
+                    "strengths": {s: list(v) for s, v in self.strengths.items()}}
+            self._dirty = False
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.entries = {k: float(v) for k, v in data.get("entries", {}).items()}
+        self.strengths = {s: (v[0], float(v[1])) for s, v in data.get("strengths", {}).items()}
@@ -0,0 +1,304 @@
+# signal_rules.py (SİNYAL KURAL DİLİ: rules.json -> Vektörel Değerlendirici)
+#
+# Tetikleyici ve güç kuralları rules.json'da Python benzeri ifadelerle tanımlanır:
+#   "rsi4h < 20 and vol_spike"
+# İfadeler başlangıçta BİR KEZ ayrıştırılır (ast, yalnızca güvenli alt küme:
+# and/or/not, karşılaştırma, + - * /, sayı ve isimler), ortak alt ifadeler tek
+# düğümde birleştirilir ve her taramada tüm semboller için NumPy dizileri
+# üzerinde değerlendirilir. Diziler (sembol,) ya da (sembol x bar) olabilir.
+#
+# Dosya yapısı:
+#   params    sabitler (ör. "vol_factor": 1.7); ifadelerde isimle kullanılır
+#   define    adlandırılmış ara ifadeler (ör. "green12": "g1 and g2")
+#   triggers  [{"name", "when", "label", "direction"}] sırası mesaj sırasıdır;
+#             label yalnızca LABEL_FIELDS alanlarını ("{rsi4h}") içerebilir
+#   strength  [{"name", "when"}] ilk eşleşen kazanır (eski if zinciri)
+# Not: Yalnızca NumPy kullanır.
+
+import ast
+import json
+import os
+import string
+import time
+
+import numpy as np
+
+from indicators import MA_CROSS_LABELS
+
+DEFAULT_RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json")
+
+MA_FEATURES = dict(zip(MA_CROSS_LABELS, ("ma20_up", "ma20_down", "ma50_up", "ma50_down")))
+
+# Motorların (vektörel/artımlı/tekil ve backtest) sağladığı özellikler
+FEATURES = ("price", "rsi4h", "rsi4h_known", "g1", "g2", "vol_spike", "last_vol", "avg_vol",
+            "vol_ratio", "res_break", "sup_break") + tuple(MA_FEATURES.values())
+
+# Tetikleyici label şablonlarında kullanılabilen alanlar (label_context); başka alan
+# ya da biçim belirteci yükleme anında RuleError verir
+LABEL_FIELDS = ("price", "rsi4h", "ma_crosses", "last_vol", "avg_vol", "vol_ratio")
+
+_COMPARE = {ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater,
+            ast.GtE: np.greater_equal, ast.Eq: np.equal, ast.NotEq: np.not_equal}
+_BINARY = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide}
+_COMMUTATIVE = {"and", "or", "Add", "Mult", "Eq", "NotEq"}
+
+
+class RuleError(ValueError):
+    """Kural dosyası veya ifadesi geçersiz."""
+
+
+# -----------------------
+# ÖZELLİKLER
+# -----------------------
+def features_from_rows(rows):
+    """analyze_symbol satırlarından (Python değerleri) özellik dizileri üretir.
+
+    rsi4h/last_vol/avg_vol None ise NaN; ma_crosses etiket listesi, trend (tür, seviye) veya None.
+    """
+    def column(key, default=np.nan):
+        return np.array([default if r.get(key) is None else r[key] for r in rows], dtype=float)
+
+    crosses = [set(r.get("ma_crosses") or ()) for r in rows]
+    trends = [(r.get("trend") or (None,))[0] for r in rows]
+    feats = {"price": column("price"), "rsi4h": column("rsi4h"),
+             "rsi4h_known": np.array([r.get("rsi4h") is not None for r in rows], dtype=bool),
+             "g1": np.array([bool(r.get("g1")) for r in rows], dtype=bool),
+             "g2": np.array([bool(r.get("g2")) for r in rows], dtype=bool),
+             "vol_spike": np.array([bool(r.get("vol_spike")) for r in rows], dtype=bool),
+             "last_vol": column("last_vol"), "avg_vol": column("avg_vol"),
+             "res_break": np.array([t == "res_break" for t in trends], dtype=bool),
+             "sup_break": np.array([t == "sup_break" for t in trends], dtype=bool)}
+    for label, name in MA_FEATURES.items():
+        feats[name] = np.array([label in c for c in crosses], dtype=bool)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        feats["vol_ratio"] = np.where(feats["avg_vol"] > 0, feats["last_vol"] / feats["avg_vol"], np.nan)
+    return feats
+
+
+def label_context(row):
+    """Sinyal satırından label şablonu bağlamı (LABEL_FIELDS); bilinmeyen değerler None."""
+    def number(key, digits=None):
+        v = row.get(key)
+        if v is None or v != v:
+            return None
+        return round(float(v), digits) if digits is not None else int(v)
+
+    last, avg = number("last_vol"), number("avg_vol")
+    return {"price": row.get("price"), "rsi4h": number("rsi4h", 1),
+            "ma_crosses": ",".join(row.get("ma_crosses") or []),
+            "last_vol": last, "avg_vol": avg,
+            "vol_ratio": round(row["last_vol"] / row["avg_vol"], 2) if last is not None and avg else None}
+
+
+def _check_label(label, where):
+    """label şablonu yalnızca düz {alan} yer tutucularıyla LABEL_FIELDS'i kullanabilir."""
+    if not isinstance(label, str):
+        raise RuleError(f"{where}: label metin olmalı: {label!r}")
+    try:
+        parts = list(string.Formatter().parse(label))
+    except ValueError as e:
+        raise RuleError(f"{where}: geçersiz label şablonu: {e}") from None
+    for _, field, spec, conversion in parts:
+        if field is None:
+            continue
+        if field not in LABEL_FIELDS or spec or conversion:
+            placeholder = field + (f"!{conversion}" if conversion else "") + (f":{spec}" if spec else "")
+            raise RuleError(f"{where}: label alanı desteklenmez: {{{placeholder}}} "
+                            f"(kullanılabilir: {', '.join(LABEL_FIELDS)})")
+
+
+# -----------------------
+# DERLEYİCİ
+# -----------------------
+class _Compiler:
+    """İfadeleri paylaşılan düğüm listesine derler: düğüm = (op, argümanlar).
+
+    Aynı yapıdaki alt ifade (değişmeli işlemlerde argüman sırası fark etmeksizin)
+    tek düğüme eşlenir; böylece "g1 and g2" tüm kurallarda bir kez hesaplanır.
+    """
+
+    def __init__(self, params, defines):
+        self.params = params
+        self.defines = defines
+        self.nodes = []          # [(op, args)]; args düğüm indeksleri veya sabit/isim
+        self.keys = {}           # yapısal anahtar -> düğüm indeksi
+        self._expanding = set()
+
+    def _node(self, op, args):
+        key = (op, tuple(sorted(args)) if op in _COMMUTATIVE else tuple(args))
+        if key not in self.keys:
+            self.keys[key] = len(self.nodes)
+            self.nodes.append(key)
+        return self.keys[key]
+
+    def compile(self, expr, where):
+        try:
+            tree = ast.parse(expr, mode="eval")
+        except SyntaxError as e:
+            raise RuleError(f"{where}: sözdizimi hatası: {expr!r} ({e.msg})")
+        return self._visit(tree.body, where)
+
+    def _visit(self, node, where):
+        if isinstance(node, ast.BoolOp):
+            op = "and" if isinstance(node.op, ast.And) else "or"
+            args = [self._visit(v, where) for v in node.values]
+            out = args[0]
+            for arg in args[1:]:
+                out = self._node(op, (out, arg))
+            return out
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return self._node("not", (self._visit(node.operand, where),))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return self._node("Sub", (self._node("const", (0.0,)), self._visit(node.operand, where)))
+        if isinstance(node, ast.Compare):
+            # a < b < c -> (a < b) and (b < c)
+            left, out = self._visit(node.left, where), None
+            for op, comp in zip(node.ops, node.comparators):
+                if type(op) not in _COMPARE:
+                    raise RuleError(f"{where}: desteklenmeyen karşılaştırma: {type(op).__name__}")
+                right = self._visit(comp, where)
+                term = self._node(type(op).__name__, (left, right))
+                out = term if out is None else self._node("and", (out, term))
+                left = right
+            return out
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            return self._node(type(node.op).__name__,
+                              (self._visit(node.left, where), self._visit(node.right, where)))
+        if isinstance(node, ast.Constant) and isinstance(node.value, (bool, int, float)):
+            return self._node("const", (float(node.value),))
+        if isinstance(node, ast.Name):
+            return self._name(node.id, where)
+        raise RuleError(f"{where}: izin verilmeyen ifade: {ast.dump(node)[:60]}")
+
+    def _name(self, name, where):
+        if name in self.params:
+            return self._node("const", (float(self.params[name]),))
+        if name in self.defines:
+            if name in self._expanding:
+                raise RuleError(f"{where}: döngüsel tanım: {name}")
+            self._expanding.add(name)
+            try:
+                return self.compile(self.defines[name], f"define.{name}")
+            finally:
+                self._expanding.discard(name)
+        if name in FEATURES:
+            return self._node("feature", (name,))
+        raise RuleError(f"{where}: bilinmeyen isim: {name}")
+
+
+# -----------------------
+# KURAL SETİ
+# -----------------------
+class Rule:
+    def __init__(self, name, node, label=None, direction=1):
+        self.name = name
+        self.node = node
+        self.label = label if label is not None else name
+        self.direction = direction
+
+
+class RuleSet:
+    """Derlenmiş kurallar; evaluate(features) tüm semboller için tek geçişte çalışır."""
+
+    def __init__(self, spec, source="<dict>"):
+        self.source = source
+        self.params = dict(spec.get("params", {}))
+        compiler = _Compiler(self.params, dict(spec.get("define", {})))
+        self.triggers = [self._rule(compiler, item, "triggers") for item in spec.get("triggers", [])]
+        self.strength = [self._rule(compiler, item, "strength") for item in spec.get("strength", [])]
+        self.nodes = compiler.nodes
+        self.strength_names = tuple(r.name for r in self.strength)
+        self.stats = {"evaluations": 0, "nodes": len(self.nodes), "seconds": 0.0,
+                      "rules": {r.name: {"seconds": 0.0, "nodes": 0}
+                                for r in self.triggers + self.strength}}
+
+    @staticmethod
+    def _rule(compiler, item, section):
+        if not isinstance(item, dict) or "name" not in item or "when" not in item:
+            raise RuleError(f"{section}: her kuralda 'name' ve 'when' olmalı: {item!r}")
+        node = compiler.compile(item["when"], f"{section}.{item['name']}")
+        rule = Rule(item["name"], node, item.get("label"), item.get("direction", 1))
+        _check_label(rule.label, f"{section}.{item['name']}")
+        return rule
+
+    def evaluate(self, features):
+        """features: {isim: dizi}. Kurallar sırayla değerlendirilir; her düğüm bir kez hesaplanır."""
+        values = {}
+        t_start = time.perf_counter()
+        for rule in self.triggers + self.strength:
+            t0, before = time.perf_counter(), len(values)
+            self._eval(rule.node, values, features)
+            stat = self.stats["rules"][rule.name]
+            stat["seconds"] += time.perf_counter() - t0
+            stat["nodes"] = max(stat["nodes"], len(values) - before)
+        self.stats["evaluations"] += 1
+        self.stats["seconds"] += time.perf_counter() - t_start
+        return RuleResult(self, {r.name: values[r.node] for r in self.triggers},
+                          [values[r.node] for r in self.strength])
+
+    def _eval(self, idx, values, features):
+        if idx in values:
+            return values[idx]
+        op, args = self.nodes[idx]
+        if op == "const":
+            out = args[0]
+        elif op == "feature":
+            if args[0] not in features:
+                raise KeyError(f"Özellik eksik: {args[0]}")
+            out = features[args[0]]
+        else:
+            vals = [self._eval(a, values, features) for a in args]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                if op == "and":
+                    out = np.logical_and(*vals)
+                elif op == "or":
+                    out = np.logical_or(*vals)
+                elif op == "not":
+                    out = np.logical_not(vals[0])
+                elif op in _BINARY_BY_NAME:
+                    out = _BINARY_BY_NAME[op](*vals)
+                else:
+                    out = _COMPARE_BY_NAME[op](*vals)
+        values[idx] = out
+        return out
+
+    def timing(self):
+        """Kural başına ortalama değerlendirme süresi (ms) ve yeni hesaplanan düğüm sayısı."""
+        n = max(1, self.stats["evaluations"])
+        return {name: {"avg_ms": round(s["seconds"] / n * 1000, 4), "nodes": s["nodes"]}
+                for name, s in self.stats["rules"].items()}
+
+
+_BINARY_BY_NAME = {op.__name__: fn for op, fn in _BINARY.items()}
+_COMPARE_BY_NAME = {op.__name__: fn for op, fn in _COMPARE.items()}
+
+
+class RuleResult:
+    """evaluate çıktısı: tetikleyici bayrakları ve güç kodu (0 = yok, k = k'inci güç kuralı)."""
+
+    def __init__(self, rules, triggers, strength_flags):
+        self.rules = rules
+        # Sabit sonuçlu kurallar ("when": "0" gibi) sembol boyutuna genişletilir
+        shape = np.broadcast_shapes(*[np.shape(f) for f in triggers.values()],
+                                    *[np.shape(f) for f in strength_flags])
+        self.triggers = {name: np.broadcast_to(flag, shape).astype(bool) for name, flag in triggers.items()}
+        self.strength_code = np.zeros(shape, dtype=np.int8)
+        if strength_flags:
+            self.strength_code = np.select([np.broadcast_to(f, shape).astype(bool) for f in strength_flags],
+                                           list(range(1, len(strength_flags) + 1)), 0).astype(np.int8)
+
+    def fired(self, i):
+        """i'inci sembolde tetiklenen kural adları (dosyadaki sırayla)."""
+        return [r.name for r in self.rules.triggers if self.triggers[r.name][i]]
+
+    def strength(self, i):
+        code = int(self.strength_code[i])
+        return self.rules.strength_names[code - 1] if code else None
+
+
+def load_rules(path=None):
+    """rules.json'u okuyup derler; hatalı ifade başlangıçta RuleError verir."""
+    path = path or DEFAULT_RULES_FILE
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    return RuleSet(spec, source=path)
@@ -0,0 +1,96 @@
+# signal_store.py (KALICI SİNYAL DEPOSU: SQLite WAL + Sorgu API'si)
+#
+# Worker her sinyali buraya ekler; bellekte yalnızca sınırlı bir halka tampon
+# tutulur. Web süreci aynı dosyayı salt-okunur açıp sembol, zaman aralığı ve
+# güce göre sayfalı sorgular. Yalnızca standart kütüphane kullanır.
+
+import json
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol TEXT NOT NULL,
+    time TEXT NOT NULL,
+    strength TEXT,
+    price REAL,
+    parts TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_signals_symbol_time ON signals (symbol, time);
+CREATE INDEX IF NOT EXISTS idx_signals_time ON signals (time);
+CREATE INDEX IF NOT EXISTS idx_signals_strength_time ON signals (strength, time);
+"""
+
+MAX_PAGE = 500
+
+
+class SignalStore:
+    """Sinyal tablosu; yazma worker'da, okuma (readonly=True) web sürecinde."""
+
+    def __init__(self, path="signals.db", readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def append(self, msg):
+        """Sinyal sözlüğünü ({symbol, time, strength, price, parts}) ekler; id döndürür."""
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO signals (symbol, time, strength, price, parts) VALUES (?, ?, ?, ?, ?)",
+                (msg["symbol"], msg["time"], msg.get("strength"), msg.get("price"),
+                 json.dumps(msg.get("parts", []), ensure_ascii=False)))
+            self._conn.commit()
+            return cur.lastrowid
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0]
+
+    def query(self, symbol=None, since=None, until=None, strength=None,
+              limit=50, offset=0, before_id=None):
+        """Yeniden eskiye sayfalı sorgu: {"items", "total", "limit", "offset"}.
+
+        since/until "YYYY-MM-DD[ HH:MM:SS]" biçimindedir (sınırlar dahil).
+        before_id verilirse offset yerine anahtar tabanlı sayfalama yapılır.
+        """
+        where, args = [], []
+        if symbol:
+            where.append("symbol = ?")
+            args.append(symbol)
+        if since:
+            where.append("time >= ?")
+            args.append(since)
+        if until:
+            # Yalnızca tarih verilmişse günün tamamı dahil
+            where.append("time <= ?")
+            args.append(until if len(until) > 10 else until + " 23:59:59")
+        if strength:
+            if strength == "none":
+                where.append("strength IS NULL")
+            else:
+                where.append("strength = ?")
+                args.append(strength)
+        clause = (" WHERE " + " AND ".join(where)) if where else ""
+        limit = max(1, min(int(limit), MAX_PAGE))
+        page_clause, page_args = clause, list(args)
+        if before_id is not None:
+            page_clause += (" AND " if where else " WHERE ") + "id < ?"
+            page_args.append(int(before_id))
+            offset = 0
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM signals{clause}", args).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT id, symbol, time, strength, price, parts FROM signals{page_clause} "
+                "ORDER BY time DESC, id DESC LIMIT ? OFFSET ?",
+                page_args + [limit, int(offset)]).fetchall()
+        items = [{"id": r[0], "symbol": r[1], "time": r[2], "strength": r[3],
+                  "price": r[4], "parts": json.loads(r[5])} for r in rows]
+        return {"items": items, "total": total, "limit": limit, "offset": int(offset)}
@@ -0,0 +1,385 @@
+# sr_levels.py (DESTEK/DİRENÇ MOTORU: Monotonik Deque + Seviye İndeksi)
+#
+# Yerel tepe/dipler kayan pencere maksimum/minimumu (monotonik deque) ile
+# bulunur; scipy.signal.argrelextrema(..., order, mode="clip") ile birebir
+# aynı sonucu verir: nokta, pencereye kırpılmış ±order komşusunun hepsinden
+# kesin büyük (küçük) ise ve serinin ilk/son noktası değilse uç noktadır.
+#
+# Artımlı kullanım:
+#   ExtremaTracker  bir order için bar bar beslenir; merkezi order bar geride
+#                   kalan nokta tam penceresiyle bir kez "onaylanır" (O(1)).
+#   LevelIndex      bir lookback için pencere içindeki onaylı dip/tepe
+#                   değerlerini sıralı tutar (pencere görünen çerçeveyle
+#                   kırpılır: tracker çerçeveden uzun geçmiş taşıyabilir); pencere kaydıkça yalnızca giren
+#                   ve çıkan seviyeler eklenip silinir. En yakın N seviye ve
+#                   "son bardan beri kesilen seviyeler" bisect ile O(log n).
+#                   Pencerenin iki ucundaki (kırpılmış) en fazla 2*order nokta
+#                   sorguda doğrudan değerlendirilir.
+#   SRBank          (sembol, zaman dilimi) başına tracker'lar ve birden çok
+#                   (lookback, order) ayarı için indeksler.
+# Not: Saf Python'dur (NumPy/SciPy gerektirmez), web süreci de kullanabilir.
+
+import bisect
+import math
+from collections import deque
+
+ZONE_TOLERANCE = 0.005    # aynı bölgeye katılacak seviyelerin en fazla göreli uzaklığı
+
+
+def _unique_max(dq, key, i):
+    """dq (değerleri artmayan, eşitleri tutan) penceresinde i kesin tek maksimum mu?"""
+    return bool(dq) and dq[0] == i and (len(dq) == 1 or key(dq[1]) < key(i))
+
+
+def _push(dq, key, j):
+    # Yalnızca kesin küçükler atılır: eşit değerler tekilliği bozduğu için kalır
+    x = key(j)
+    while dq and key(dq[-1]) < x:
+        dq.pop()
+    dq.append(j)
+
+
+def local_extrema(values, order):
+    """argrelextrema(np.greater / np.less, order, mode="clip") karşılığı: (tepe, dip) indeksleri."""
+    n = len(values)
+    key_max = values.__getitem__
+    neg = [-v for v in values]
+    key_min = neg.__getitem__
+    nan_prefix = [0]
+    for v in values:
+        nan_prefix.append(nan_prefix[-1] + (v != v))
+    maxima, minima = [], []
+    dq_max, dq_min = deque(), deque()
+    pushed = 0
+    for i in range(n):
+        hi = min(n - 1, i + order)
+        while pushed <= hi:
+            if values[pushed] == values[pushed]:   # NaN deque'e girmez
+                _push(dq_max, key_max, pushed)
+                _push(dq_min, key_min, pushed)
+            pushed += 1
+        lo = i - order
+        while dq_max and dq_max[0] < lo:
+            dq_max.popleft()
+        while dq_min and dq_min[0] < lo:
+            dq_min.popleft()
+        if i == 0 or i == n - 1 or nan_prefix[hi + 1] - nan_prefix[max(0, lo)]:
+            continue
+        if _unique_max(dq_max, key_max, i):
+            maxima.append(i)
+        elif _unique_max(dq_min, key_min, i):
+            minima.append(i)
+    return maxima, minima
+
+
+def _is_extremum(values, i, lo, hi, order, sign):
+    """values[lo..hi] penceresine kırpılmış komşulukta i kesin tepe (sign=1) / dip (sign=-1) mi?"""
+    if i <= lo or i >= hi:
+        return False
+    x = values[i] * sign
+    if x != x:
+        return False
+    for j in range(max(lo, i - order), min(hi, i + order) + 1):
+        if j != i and not x > values[j] * sign:
+            return False
+    return True
+
+
+def nearest_levels(maxima, minima, price, n=3):
+    """Fiyatın altındaki en yakın n dip (azalan) ve üstündeki en yakın n tepe (artan)."""
+    supports = sorted([v for v in minima if v < price], reverse=True)[:n]
+    resistances = sorted([v for v in maxima if v > price])[:n]
+    return supports, resistances
+
+
+def cluster_zones(levels, tolerance=ZONE_TOLERANCE):
+    """Yakın seviyeleri bölgelere toplar: [{"low", "high", "level", "touches"}] (artan)."""
+    zones = []
+    for v in sorted(levels):
+        if zones and v - zones[-1]["low"] <= tolerance * abs(zones[-1]["low"]):
+            z = zones[-1]
+            z["high"] = v
+            z["touches"] += 1
+            z["_sum"] += v
+        else:
+            zones.append({"low": v, "high": v, "touches": 1, "_sum": v})
+    for z in zones:
+        z["level"] = z.pop("_sum") / z["touches"]
+    return zones
+
+
+# -----------------------
+# ARTIMLI MOTOR
+# -----------------------
+class ExtremaTracker:
+    """Tek order için bar bar beslenen uç nokta bulucu; onaylı tepe/dipleri indeksle tutar."""
+
+    def __init__(self, order, history=1000):
+        self.order = order
+        self.history = max(history, 4 * order + 4)
+        self.values = []            # son `history` kapanış
+        self.base = 0               # values[0]'ın global bar indeksi
+        self.count = 0              # işlenen toplam bar
+        self.last_ts = None
+        self.max_idx, self.max_val = [], []   # onaylı tepeler (indekse göre artan)
+        self.min_idx, self.min_val = [], []   # onaylı dipler
+        self.version = 0            # geçmiş geri alındıkça artar (indeksler yeniden kurulur)
+        self._dq_max, self._dq_min = deque(), deque()
+        self._last_nan = -1
+
+    def value(self, i):
+        return self.values[i - self.base]
+
+    def _neg(self, i):
+        return -self.values[i - self.base]
+
+    def append(self, close, ts=None):
+        t = self.count
+        x = float(close) if close is not None else math.nan
+        self.values.append(x)
+        self.count += 1
+        self.last_ts = ts
+        if x != x:
+            self._last_nan = t
+        else:
+            _push(self._dq_max, self.value, t)
+            _push(self._dq_min, self._neg, t)
+        order = self.order
+        lo = t - 2 * order
+        while self._dq_max and self._dq_max[0] < lo:
+            self._dq_max.popleft()
+        while self._dq_min and self._dq_min[0] < lo:
+            self._dq_min.popleft()
+        c = t - order                # tam penceresi yeni tamamlanan merkez
+        if c >= 1 and lo >= 0 and self._last_nan < lo:
+            if _unique_max(self._dq_max, self.value, c):
+                self.max_idx.append(c)
+                self.max_val.append(self.value(c))
+            elif _unique_max(self._dq_min, self._neg, c):
+                self.min_idx.append(c)
+                self.min_val.append(self.value(c))
+        if len(self.values) > 2 * self.history:
+            self._trim()
+
+    def _trim(self):
+        drop = len(self.values) - self.history
+        self.values = self.values[drop:]
+        self.base += drop
+        for idx, val in ((self.max_idx, self.max_val), (self.min_idx, self.min_val)):
+            k = bisect.bisect_left(idx, self.base + self.order)
+            del idx[:k], val[:k]
+
+    def truncate(self, m):
+        """İlk m bar dışındakileri geri alır (oluşmakta olan bar revize edildiğinde)."""
+        if m >= self.count:
+            return
+        if m <= self.base:
+            self.reset()
+            return
+        keep = self.values[:m - self.base]
+        for idx, val in ((self.max_idx, self.max_val), (self.min_idx, self.min_val)):
+            k = bisect.bisect_left(idx, m - self.order)
+            del idx[k:], val[k:]
+        # Deque'ler ve NaN işareti son 2*order+1 bardan yeniden kurulur
+        self.values, self.count = keep, m
+        self._dq_max.clear()
+        self._dq_min.clear()
+        self._last_nan = -1
+        for j in range(max(self.base, m - 2 * self.order - 1), m):
+            if self.value(j) != self.value(j):
+                self._last_nan = j
+            else:
+                _push(self._dq_max, self.value, j)
+                _push(self._dq_min, self._neg, j)
+        self.version += 1
+
+    def reset(self):
+        version = self.version
+        self.__init__(self.order, self.history)
+        self.version = version + 1
+
+    def sync(self, timestamps, closes, rebuild=True):
+        """Barlarla eşitler; yalnızca yeni/değişen barlar işlenir (IndicatorState.sync gibi).
+
+        Son kayıtlı zaman listede yoksa sıfırdan kurulur (rebuild=False ise None).
+        """
+        if not timestamps:
+            return 0
+        if self.last_ts is not None:
+            for k in range(len(timestamps) - 1, -1, -1):
+                if timestamps[k] == self.last_ts:
+                    start = k
+                    if not _same(closes[k], self.values[-1]):
+                        self.truncate(self.count - 1)
+                    else:
+                        start = k + 1
+                    for j in range(start, len(timestamps)):
+                        self.append(closes[j], timestamps[j])
+                    return len(timestamps) - start
+                if timestamps[k] < self.last_ts:
+                    break
+        if not rebuild:
+            return None
+        self.reset()
+        for ts, c in zip(timestamps, closes):
+            self.append(c, ts)
+        return len(timestamps)
+
+
+def _same(a, b):
+    a = float(a) if a is not None else math.nan
+    return a == b or (a != a and b != b)
+
+
+class LevelIndex:
+    """Bir ExtremaTracker üzerinde son `lookback` barın tepe/dip seviyeleri (sıralı)."""
+
+    def __init__(self, tracker, lookback):
+        self.tracker = tracker
+        self.lookback = lookback
+        self.visible = None  # görünen çerçevenin bar sayısı (SRBank.sync_frame); None = sınırsız
+        self.tops = []      # pencere içindeki onaylı tepe değerleri (artan)
+        self.bottoms = []   # pencere içindeki onaylı dip değerleri (artan)
+        self._range = None  # (lo, hi) onaylı iç aralık
+        self._version = None
+        self._edges = None  # (count, version, kenar tepeleri, kenar dipleri)
+
+    def window(self):
+        """(s, t): pencerenin global ilk/son bar indeksi."""
+        t = self.tracker.count - 1
+        span = self.lookback if self.visible is None else min(self.lookback, self.visible)
+        return max(0, t - span + 1), t
+
+    def _interior(self, lo, hi, idx, val):
+        a, b = bisect.bisect_left(idx, lo), bisect.bisect_right(idx, hi)
+        return val[a:b]
+
+    def refresh(self):
+        tr, order = self.tracker, self.tracker.order
+        s, t = self.window()
+        lo, hi = s + order, t - order
+        if self._range is not None and self._version == tr.version and lo >= self._range[0] \
+                and hi >= self._range[1] and self._range[0] >= tr.base + order:
+            old_lo, old_hi = self._range
+            # Pencereden çıkan seviyeler
+            for idx, val, arr in ((tr.max_idx, tr.max_val, self.tops), (tr.min_idx, tr.min_val, self.bottoms)):
+                for v in self._interior(old_lo, min(lo - 1, old_hi), idx, val):
+                    del arr[bisect.bisect_left(arr, v)]
+                for v in self._interior(max(old_hi + 1, lo), hi, idx, val):
+                    bisect.insort(arr, v)
+        else:
+            self.tops = sorted(self._interior(lo, hi, tr.max_idx, tr.max_val))
+            self.bottoms = sorted(self._interior(lo, hi, tr.min_idx, tr.min_val))
+        self._range, self._version = (lo, hi), tr.version
+        return self
+
+    def edges(self):
+        """Pencerenin kırpılmış uçlarındaki tepe/dipler (her barda değişir, önbellekli)."""
+        tr, order = self.tracker, self.tracker.order
+        s, t = self.window()
+        key = (tr.count, tr.version, s)
+        if self._edges is None or self._edges[0] != key:
+            vals = tr.values
+            base = tr.base
+            lo, hi = s - base, t - base
+            candidates = list(range(s + 1, min(s + order, t))) + \
+                list(range(max(t - order + 1, s + order, s + 1), t))
+            tops = [vals[i - base] for i in candidates if _is_extremum(vals, i - base, lo, hi, order, 1)]
+            bottoms = [vals[i - base] for i in candidates if _is_extremum(vals, i - base, lo, hi, order, -1)]
+            self._edges = (key, tops, bottoms)
+        return self._edges[1], self._edges[2]
+
+    def ready(self):
+        s, t = self.window()
+        return t - s + 1 >= self.tracker.order * 2 + 3
+
+    def levels(self):
+        """Penceredeki tüm (tepe, dip) değerleri; argrelextrema ile aynı küme."""
+        self.refresh()
+        if not self.ready():
+            return [], []
+        e_tops, e_bottoms = self.edges()
+        return self.tops + e_tops, self.bottoms + e_bottoms
+
+    def nearest(self, price=None, n=3):
+        """support_resistance ile aynı çıktı: (en yakın n destek azalan, en yakın n direnç artan)."""
+        self.refresh()
+        if not self.ready():
+            return [], []
+        if price is None:
+            price = self.tracker.values[-1]
+        if price != price:
+            return [], []
+        e_tops, e_bottoms = self.edges()
+        k = bisect.bisect_left(self.bottoms, price)
+        supports = sorted(self.bottoms[max(0, k - n):k] + [v for v in e_bottoms if v < price],
+                          reverse=True)[:n]
+        k = bisect.bisect_right(self.tops, price)
+        resistances = sorted(self.tops[k:k + n] + [v for v in e_tops if v > price])[:n]
+        return supports, resistances
+
+    def crossed(self, prev_price, price):
+        """prev_price -> price hareketinde kesilen seviyeler: [(seviye, "up"|"down")]."""
+        self.refresh()
+        if not self.ready() or prev_price is None or price is None or prev_price == price:
+            return []
+        tops, bottoms = self.edges()
+        up = price > prev_price
+        lo, hi = (prev_price, price) if up else (price, prev_price)
+        hits = []
+        for arr, extra in ((self.tops, tops), (self.bottoms, bottoms)):
+            # Yukarı: prev <= L < price ; aşağı: price < L <= prev
+            a = bisect.bisect_left(arr, lo) if up else bisect.bisect_right(arr, lo)
+            b = bisect.bisect_left(arr, hi) if up else bisect.bisect_right(arr, hi)
+            hits.extend(arr[a:b])
+            hits.extend(v for v in extra if (lo <= v < hi if up else lo < v <= hi))
+        return [(v, "up" if up else "down") for v in sorted(hits, reverse=not up)]
+
+    def zones(self, tolerance=ZONE_TOLERANCE):
+        tops, bottoms = self.levels()
+        return cluster_zones(tops + bottoms, tolerance)
+
+
+class SRBank:
+    """(sembol, zaman dilimi) -> order başına ExtremaTracker, (lookback, order) başına LevelIndex."""
+
+    def __init__(self, settings, history=None):
+        self.settings = list(dict.fromkeys(settings))
+        self.history = history or max(lb for lb, _ in self.settings) + 1
+        self.trackers = {}   # (sym, tf, order) -> ExtremaTracker
+        self.indexes = {}    # (sym, tf, lookback, order) -> LevelIndex
+        self.visible = {}    # (sym, tf) -> son çerçevenin bar sayısı
+
+    def tracker(self, symbol, timeframe, order):
+        key = (symbol, timeframe, order)
+        if key not in self.trackers:
+            self.trackers[key] = ExtremaTracker(order, history=self.history)
+        return self.trackers[key]
+
+    def index(self, symbol, timeframe, lookback, order):
+        key = (symbol, timeframe, lookback, order)
+        if key not in self.indexes:
+            self.indexes[key] = LevelIndex(self.tracker(symbol, timeframe, order), lookback)
+        index = self.indexes[key]
+        index.visible = self.visible.get((symbol, timeframe))
+        return index.refresh()
+
+    def sync_frame(self, symbol, timeframe, df):
+        """DataFrame'in kapanışlarını tüm order'ların tracker'larına işler.
+
+        Tracker'lar çerçeveden önceki barları da taşıyabilir; indeks pencereleri
+        len(df) ile kırpılır (support_resistance(df) ile aynı barlar).
+        """
+        self.visible[(symbol, timeframe)] = len(df)
+        tail = df.iloc[-8:] if len(df) > 8 else df
+        ts_tail = [int(t) for t in tail.index.asi8]
+        closes_tail = tail["Close"].to_numpy(dtype=float).tolist()
+        full = None
+        for order in {o for _, o in self.settings}:
+            tr = self.tracker(symbol, timeframe, order)
+            if tr.last_ts is not None and tr.sync(ts_tail, closes_tail, rebuild=False) is not None:
+                continue
+            if full is None:
+                keep = df.iloc[-self.history:]
+                full = ([int(t) for t in keep.index.asi8], keep["Close"].to_numpy(dtype=float).tolist())
+            tr.sync(*full)
@@ -0,0 +1,263 @@
+# state_broadcast.py (TEK DURUM İZLEYİCİ + SSE YAYINI)
+#
+# Web süreci başına tek bir arka plan thread'i anlık görüntünün generation
+# başlığını izler. Değişiklikte dosya BİR KEZ ayrıştırılır, SSE olayı bir kez
+# serileştirilir ve hazır baytlar tüm abonelerin sınırlı kuyruklarına
+# bırakılır. Kuyruğu dolan (yavaş) istemci düşürülür; bağlı istemci sayısı
+# dosya okuma ve JSON maliyetini artırmaz.
+#
+# Olaylar:
+#   snapshot  bağlantıda bir kez: tam durum (status, per_symbol, sinyaller, hatalar)
+#   delta     sonraki her generation: yalnızca değişen sembol alanları, silinen
+#             semboller ve yeni sinyaller; "base" önceki generation'dır
+# Her olayın id'si generation'dır. Yeniden bağlanan EventSource Last-Event-ID
+# gönderir; aradaki deltalar hâlâ bellekteyse yalnızca onlar, değilse tam
+# snapshot gönderilir. Okuyucu verilirse (ör. sharding.ShardedSnapshotReader)
+# dosya yerine onun peek()/get() arayüzü izlenir.
+# Not: Yalnızca standart kütüphane kullanır.
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from shared_state import SnapshotReader, offline_state
+
+POLL_INTERVAL = 0.5       # generation başlığı kontrol aralığı (sn)
+HEARTBEAT_INTERVAL = 15   # değişiklik yokken kalp atışı aralığı (sn)
+CLIENT_QUEUE_SIZE = 16    # istemci başına bekleyen en fazla olay
+DELTA_HISTORY = 64        # Last-Event-ID ile devam için saklanan delta sayısı
+
+
+def sse_event(event, data, event_id=None):
+    """SSE çerçevesini bayt olarak üretir."""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {data}")
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+def _dumps(obj):
+    return json.dumps(obj, default=str, ensure_ascii=False, separators=(",", ":"))
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _signal_key(sig):
+    return (sig.get("symbol"), sig.get("time"))
+
+
+def diff_states(old, new):
+    """İki anlık görüntü arasındaki fark.
+
+    {"changed": {sembol: {alan: yeni değer}}, "removed": [sembol],
+     "signals": [yeni sinyaller]} ve değiştiyse "errors" / "last_signal".
+    Yeni sembolün tüm satırı gönderilir; satırdan düşen alan None olur.
+    """
+    old_rows, new_rows = old.get("per_symbol", {}), new.get("per_symbol", {})
+    changed = {}
+    for sym, row in new_rows.items():
+        prev = old_rows.get(sym)
+        if prev is None:
+            changed[sym] = row
+            continue
+        fields = {k: v for k, v in row.items() if prev.get(k) != v}
+        fields.update({k: None for k in prev if k not in row})
+        if fields:
+            changed[sym] = fields
+    seen = {_signal_key(s) for s in old.get("signals", [])}
+    delta = {"changed": changed,
+             "removed": [s for s in old_rows if s not in new_rows],
+             "signals": [s for s in new.get("signals", []) if _signal_key(s) not in seen]}
+    for key in ("errors", "last_signal"):
+        if old.get(key) != new.get(key):
+            delta[key] = new.get(key)
+    return delta
+
+
+def _status(generation, state):
+    status = dict(state.get("status", {}))
+    if generation is not None:
+        status["generation"] = generation
+    return status
+
+
+class Subscription:
+    def __init__(self, size):
+        self.queue = queue.Queue(maxsize=size)
+        self.closed = False
+
+    def events(self, timeout=HEARTBEAT_INTERVAL * 2):
+        """Olay baytlarını üretir; abonelik düşürülünce biter."""
+        while not self.closed:
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            if item is None:
+                return
+            yield item
+
+
+class StateBroadcaster:
+    """Anlık görüntü değişikliklerini tüm SSE abonelerine delta olarak yayar."""
+
+    def __init__(self, path, poll=POLL_INTERVAL, heartbeat=HEARTBEAT_INTERVAL,
+                 client_queue=CLIENT_QUEUE_SIZE, history=DELTA_HISTORY, reader=None):
+        self.path = path
+        self.poll = poll
+        self.heartbeat = heartbeat
+        self.client_queue = client_queue
+        self.reader = reader or SnapshotReader(path)
+        self.subscribers = set()
+        self.generation = None
+        self.state = None
+        self.deltas = deque(maxlen=history)   # (base, generation, olay baytları)
+        self.stats = {"parses": 0, "events": 0, "snapshots": 0, "resumes": 0,
+                      "heartbeats": 0, "dropped_clients": 0}
+        self._snapshot = None                 # mevcut generation'ın tam olayı (tembel)
+        self._checked = False                 # dosya en az bir kez kontrol edildi mi
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # --- Olay üretimi ---
+    def _snapshot_event(self):
+        """Mevcut durumun tam snapshot olayı; generation başına bir kez serileştirilir."""
+        if self._snapshot is None:
+            if self.state is None:
+                payload = dict(offline_state(), timestamp=_now())
+            else:
+                payload = {"generation": self.generation,
+                           "status": _status(self.generation, self.state),
+                           "per_symbol": self.state.get("per_symbol", {}),
+                           "signals": self.state.get("signals", []),
+                           "last_signal": self.state.get("last_signal"),
+                           "errors": self.state.get("errors", []), "timestamp": _now()}
+            self._snapshot = sse_event("snapshot", _dumps(payload), event_id=self.generation)
+            self.stats["snapshots"] += 1
+        return self._snapshot
+
+    def _resume(self, last_event_id):
+        """last_event_id'den mevcut generation'a delta zinciri; kurulamazsa None."""
+        try:
+            generation = int(last_event_id)
+        except (TypeError, ValueError):
+            return None
+        if self.generation is None:
+            return None
+        by_base = {base: (gen, data) for base, gen, data in self.deltas}
+        chain = []
+        while generation != self.generation:
+            if generation not in by_base:
+                return None
+            generation, data = by_base[generation]
+            chain.append(data)
+        return chain
+
+    # --- Abonelik ---
+    def subscribe(self, last_event_id=None):
+        """Yeni abone; Last-Event-ID verilirse kaçırılan deltalar, yoksa tam snapshot kuyruğa konur."""
+        self._ensure_thread()
+        sub = Subscription(self.client_queue)
+        with self._lock:
+            backlog = self._resume(last_event_id)
+            if backlog is None or len(backlog) >= self.client_queue:
+                backlog = [self._snapshot_event()] if self._checked else []
+            else:
+                self.stats["resumes"] += 1
+            for data in backlog:
+                sub.queue.put_nowait(data)
+            self.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        sub.closed = True
+        with self._lock:
+            self.subscribers.discard(sub)
+
+    def client_count(self):
+        return len(self.subscribers)
+
+    # --- Yayın ---
+    def broadcast(self, data, subs=None):
+        if subs is None:
+            with self._lock:
+                subs = list(self.subscribers)
+        for sub in subs:
+            try:
+                sub.queue.put_nowait(data)
+            except queue.Full:
+                # Yavaş tüketici: kuyruğu boşalt, kapanış işareti bırak ve düşür.
+                # Tarayıcı Last-Event-ID ile yeniden bağlanıp kaldığı yerden devam eder.
+                self.unsubscribe(sub)
+                self.stats["dropped_clients"] += 1
+                try:
+                    while True:
+                        sub.queue.get_nowait()
+                except queue.Empty:
+                    pass
+                sub.queue.put_nowait(None)
+
+    def check(self):
+        """Generation değiştiyse ayrıştırıp yayınlar; yayın yapıldıysa True."""
+        generation = self.reader.peek()
+        if generation is None:
+            # Worker henüz yazmadı: bir kez hata durumunu snapshot olarak yayınla
+            if self._checked and self.state is None:
+                return False
+            with self._lock:
+                self._checked = True
+                self.state, self.generation, self._snapshot = None, None, None
+                self.deltas.clear()
+                data, subs = self._snapshot_event(), list(self.subscribers)
+            self.broadcast(data, subs)
+            return True
+        if generation == self.generation:
+            return False
+        try:
+            generation, state = self.reader.get()
+        except (FileNotFoundError, ValueError):
+            return False
+        self.stats["parses"] += 1
+        with self._lock:
+            previous, base = self.state, self.generation
+            self.state, self.generation, self._snapshot = state, generation, None
+            self._checked = True
+            if previous is None:
+                data = self._snapshot_event()
+            else:
+                delta = diff_states(previous, state)
+                delta.update(generation=generation, base=base, status=_status(generation, state),
+                             timestamp=_now())
+                data = sse_event("delta", _dumps(delta), event_id=generation)
+                self.deltas.append((base, generation, data))
+            subs = list(self.subscribers)
+        self.stats["events"] += 1
+        self.broadcast(data, subs)
+        return True
+
+    def _run(self):
+        last_sent = time.monotonic()
+        while True:
+            try:
+                if self.check():
+                    last_sent = time.monotonic()
+                elif time.monotonic() - last_sent >= self.heartbeat and self.subscribers:
+                    self.stats["heartbeats"] += 1
+                    self.broadcast(sse_event("heartbeat", datetime.utcnow().isoformat()))
+                    last_sent = time.monotonic()
+            except Exception as e:
+                print(f"Durum izleyici hatası: {e}")
+            time.sleep(self.poll)
+
+    def _ensure_thread(self):
+        # gunicorn fork'undan sonra her worker süreci kendi thread'ini ilk abonelikte başlatır
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="state-watcher", daemon=True)
+                self._thread.start()
@@ -0,0 +1,211 @@
+# telegram_commands.py (TELEGRAM KOMUTLARI: ANLIK GÖRÜNTÜ İNDEKSİ)
+#
+# Webhook komutları diske ya da ağa gitmeden bellekteki bir indeksten
+# yanıtlanır. İndeks worker'ın anlık görüntüsünden kurulur ve yalnızca
+# generation değiştiğinde yeniden oluşturulur:
+#   /status, /test       worker özeti
+#   /signal SEMBOL       sembolün son değerleri ve son sinyali
+#   /top [N]             en güçlü N sembol (son sinyal gücü, aktif koşul sayısı)
+#   /near_sr [yüzde]     fiyatı en yakın destek/dirence yüzde kadar yakın semboller
+#   /help                komut listesi
+# Not: Yalnızca standart kütüphane kullanır.
+
+import bisect
+import html
+import threading
+
+STRENGTH_RANK = {"strong_buy": 4, "strong_sell": 4, "buy": 2, "sell": 2}
+STRENGTH_LABEL = {"strong_buy": "🚀 GÜÇLÜ AL", "buy": "🟢 AL",
+                  "strong_sell": "🔻 GÜÇLÜ SAT", "sell": "🔴 SAT"}
+TOP_DEFAULT = 5
+TOP_MAX = 20
+NEAR_SR_DEFAULT_PCT = 1.5
+NEAR_SR_MAX_ROWS = 15
+
+HELP_TEXT = ("<b>Komutlar</b>\n"
+             "/status - Worker durumu\n"
+             "/signal SEMBOL - Sembol detayı (ör. /signal ASELS)\n"
+             "/top [N] - En güçlü sinyaller\n"
+             "/near_sr [yüzde] - Destek/dirence yakın semboller")
+
+
+def normalize_symbol(text):
+    sym = text.strip().upper()
+    if sym and not sym.endswith(".IS"):
+        sym += ".IS"
+    return sym
+
+
+def _fmt(value, digits=2):
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def _conditions(row):
+    """Satırdaki aktif koşul adları."""
+    active = []
+    if row.get("g1") and row.get("g2"):
+        active.append("Yeşil1+2")
+    if row.get("vol_spike"):
+        active.append("Hacim")
+    active.extend(row.get("ma_crosses") or [])
+    if row.get("trend"):
+        active.append("Trend")
+    rsi = row.get("rsi4h")
+    if rsi is not None and (rsi < 20 or rsi > 80):
+        active.append(f"RSI {rsi:.0f}")
+    return active
+
+
+def _nearest_level(row):
+    """(uzaklık %, seviye, 'destek'|'direnç') veya None."""
+    price = row.get("price")
+    if not price:
+        return None
+    best = None
+    for kind, levels in (("destek", row.get("supports") or []), ("direnç", row.get("resistances") or [])):
+        for level in levels:
+            if level is None:
+                continue
+            dist = abs(price - level) / price * 100
+            if best is None or dist < best[0]:
+                best = (dist, level, kind)
+    return best
+
+
+class SnapshotIndex:
+    """Anlık görüntüden türetilen komut indeksi; generation değişince yeniden kurulur."""
+
+    def __init__(self):
+        self.generation = None
+        self.status = {}
+        self.rows = {}          # sembol -> per_symbol satırı
+        self.last_signal = {}   # sembol -> anlık görüntüdeki son sinyali
+        self.ranking = []       # [(skor, sembol)] büyükten küçüğe
+        self.near = []          # [(uzaklık %, sembol, seviye, tür)] küçükten büyüğe
+        self._near_dist = []    # near'ın uzaklık sütunu (bisect için)
+        self.stats = {"rebuilds": 0, "queries": 0}
+        self._lock = threading.Lock()
+
+    def refresh(self, generation, state):
+        """Generation değiştiyse indeksi yeniden kurar; kurulduysa True."""
+        if state is None or generation == self.generation:
+            return False
+        rows = state.get("per_symbol", {})
+        last_signal = {}
+        for sig in state.get("signals", []):
+            last_signal[sig.get("symbol")] = sig
+        ranking, near = [], []
+        for sym, row in rows.items():
+            sig = last_signal.get(sym)
+            rank = STRENGTH_RANK.get(sig.get("strength"), 1) if sig else 0
+            vol_ratio = (row.get("last_vol") or 0) / row["avg_vol"] if row.get("avg_vol") else 0
+            ranking.append(((rank, len(_conditions(row)), vol_ratio), sym))
+            nearest = _nearest_level(row)
+            if nearest:
+                near.append((nearest[0], sym, nearest[1], nearest[2]))
+        ranking.sort(reverse=True)
+        near.sort()
+        with self._lock:
+            self.generation = generation
+            self.status = dict(state.get("status", {}))
+            self.rows, self.last_signal, self.ranking, self.near = rows, last_signal, ranking, near
+            self._near_dist = [item[0] for item in near]
+            self.stats["rebuilds"] += 1
+        return True
+
+    # --- Sorgular ---
+    def signal(self, symbol):
+        row = self.rows.get(symbol)
+        if row is None:
+            return f"❓ {html.escape(symbol)} için veri yok."
+        lines = [f"<b>{symbol}</b>",
+                 f"Fiyat: {_fmt(row.get('price'))} ₺ — RSI(4H): {_fmt(row.get('rsi4h'), 1)}",
+                 f"Destek: {', '.join(_fmt(x) for x in row.get('supports') or []) or '-'}",
+                 f"Direnç: {', '.join(_fmt(x) for x in row.get('resistances') or []) or '-'}",
+                 f"Koşullar: {', '.join(_conditions(row)) or '-'}"]
+        sig = self.last_signal.get(symbol)
+        if sig:
+            label = STRENGTH_LABEL.get(sig.get("strength"), "NORMAL")
+            lines.append(f"Son sinyal: {label} @ {_fmt(sig.get('price'))} ({sig.get('time')})")
+        if row.get("stale"):
+            lines.append("⚠️ Son taramada güncellenemedi (eski veri).")
+        lines.append(f"Güncelleme: {row.get('ts', '-')}")
+        return "\n".join(lines)
+
+    def top(self, n=TOP_DEFAULT):
+        n = max(1, min(n, TOP_MAX))
+        lines = [f"<b>En güçlü {n} sembol</b>"]
+        for (rank, n_cond, _), sym in self.ranking[:n]:
+            if rank == 0 and n_cond == 0:
+                break
+            sig = self.last_signal.get(sym)
+            label = STRENGTH_LABEL.get(sig.get("strength"), "NORMAL") if sig else "-"
+            lines.append(f"{sym.replace('.IS', '')}: {label} — {', '.join(_conditions(self.rows[sym])) or '-'}")
+        if len(lines) == 1:
+            lines.append("Aktif koşul yok.")
+        return "\n".join(lines)
+
+    def near_sr(self, pct=NEAR_SR_DEFAULT_PCT):
+        hits = self.near[:bisect.bisect_right(self._near_dist, pct)]
+        lines = [f"<b>Destek/dirence %{pct:g} yakın semboller</b>"]
+        for dist, sym, level, kind in hits[:NEAR_SR_MAX_ROWS]:
+            price = self.rows[sym].get("price")
+            lines.append(f"{sym.replace('.IS', '')}: {_fmt(price)} ₺ — {kind} {_fmt(level)} (%{dist:.2f})")
+        if not hits:
+            lines.append("Yok.")
+        elif len(hits) > NEAR_SR_MAX_ROWS:
+            lines.append(f"... ve {len(hits) - NEAR_SR_MAX_ROWS} sembol daha")
+        return "\n".join(lines)
+
+
+def status_text(status):
+    if status.get("running", False):
+        text = ("✅ <b>Sistem Aktif!</b>\n"
+                f"Worker Son Çalışma: {status.get('worker_heartbeat', 'Bilinmiyor')}\n"
+                f"Toplam Sinyal Sayısı: {status.get('total_signals', 0)}\n"
+                f"Son Sinyal Zamanı: {status.get('last_signal_time', 'Yok')}\n"
+                f"Hata Sayısı: {status.get('errors_count', 0)}")
+        shards = status.get("shards")
+        if shards:
+            alive = sum(1 for s in shards if s.get("alive"))
+            text += f"\nShard: {alive}/{len(shards)} aktif"
+            if status.get("dead_shards"):
+                text += f" (kapalı: {', '.join(status['dead_shards'])})"
+        return text
+    return f"❌ <b>Sistem Aktif Değil!</b>\nWorker'dan veri alınamıyor: {status.get('error', 'Bilinmeyen Hata')}"
+
+
+def handle_command(text, index, status):
+    """Komut metnine yanıt (HTML) döndürür; komut değilse None."""
+    parts = (text or "").strip().split()
+    if not parts or not parts[0].startswith("/"):
+        return None
+    command = parts[0].split("@", 1)[0].lower()   # /top@BotAdi -> /top
+    args = parts[1:]
+    index.stats["queries"] += 1
+    if command in ("/status", "/test"):
+        return status_text(status)
+    if command in ("/help", "/start"):
+        return HELP_TEXT
+    with index._lock:   # sorgu boyunca aynı generation'ın indeksi kullanılır
+        return _query(index, command, args, status)
+
+
+def _query(index, command, args, status):
+    if index.generation is None:
+        return status_text(status)
+    if command == "/signal":
+        if not args:
+            return "Kullanım: /signal SEMBOL (ör. /signal ASELS)"
+        return index.signal(normalize_symbol(args[0]))
+    if command == "/top":
+        try:
+            return index.top(int(args[0]) if args else TOP_DEFAULT)
+        except ValueError:
+            return "Kullanım: /top [N]"
+    if command == "/near_sr":
+        try:
+            return index.near_sr(float(args[0].replace(",", ".")) if args else NEAR_SR_DEFAULT_PCT)
+        except ValueError:
+            return "Kullanım: /near_sr [yüzde]"
+    return None
@@ -0,0 +1,219 @@
+# telegram_dispatch.py (ARKA PLAN TELEGRAM GÖNDERİCİSİ)
+#
+# Tarayıcı ve webhook mesajları yalnızca kuyruğa bırakır; gönderim tek bir
+# arka plan thread'inde, havuzlanmış bir requests.Session ile yapılır.
+#  - Sohbet başına ve genel hız sınırları uygulanır (Telegram: ~1 mesaj/sn
+#    sohbet başına, ~30 mesaj/sn toplam).
+#  - 429 yanıtlarında ve bağlantı hatalarında yalnızca o sohbet ertelenir
+#    (parameters.retry_after / üstel bekleme); thread uyumaz, diğer sohbetler
+#    gönderilmeye devam eder.
+#  - Kısa sürede aynı sohbete birikmiş mesajlar tek bir özet mesajda birleşir.
+# Not: Yalnızca requests kullanır; web süreci de içe aktarabilir.
+
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_BASE = "https://api.telegram.org"
+MAX_MESSAGE_LEN = 4096
+DIGEST_SEPARATOR = "\n\n"
+
+
+class TelegramDispatcher:
+    """Sınırlı kuyruklu, hız sınırına duyarlı Telegram gönderici thread'i."""
+
+    def __init__(self, token, api_base=API_BASE, queue_size=1000, per_chat_interval=1.0,
+                 global_rate=25.0, coalesce_window=1.5, digest_threshold=3,
+                 timeout=10.0, max_retries=5, pool_size=4):
+        self.token = token
+        self.url = f"{api_base.rstrip('/')}/bot{token}/sendMessage"
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.per_chat_interval = per_chat_interval
+        self.global_interval = 1.0 / global_rate
+        self.coalesce_window = coalesce_window
+        self.digest_threshold = digest_threshold
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.stats = {"enqueued": 0, "dropped": 0, "sent": 0, "failed": 0,
+                      "retries_429": 0, "digests": 0, "last_latency": None}
+        self._latencies = deque(maxlen=512)
+        self._lock = threading.Lock()            # sayaçlar ve gecikmeler (üretici/metrik thread'leri okur)
+        self._outstanding = 0                    # kabul edilip henüz sonuçlanmamış mesaj
+        self._attempts = {}                      # chat_id -> sıradaki batch'in başarısız deneme sayısı
+        self._pending = defaultdict(list)       # chat_id -> [(enqueued_at, text, parse_mode)]
+        self._chat_next = defaultdict(float)    # chat_id -> bir sonraki izinli gönderim zamanı
+        self._global_next = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Üretici tarafı ---
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="telegram-dispatch", daemon=True)
+            self._thread.start()
+        return self
+
+    def enqueue(self, chat_id, text, parse_mode="HTML"):
+        """Mesajı kuyruğa ekler; kuyruk doluysa mesaj düşürülür ve False döner."""
+        with self._lock:
+            self._outstanding += 1
+        try:
+            self.queue.put_nowait((time.monotonic(), str(chat_id), text, parse_mode))
+        except queue.Full:
+            with self._lock:
+                self._outstanding -= 1
+                self.stats["dropped"] += 1
+            return False
+        with self._lock:
+            self.stats["enqueued"] += 1
+        return True
+
+    def depth(self):
+        """Kuyrukta, sohbet bekleme listelerinde ya da yeniden denemede olan mesaj sayısı."""
+        with self._lock:
+            return self._outstanding
+
+    def latency_percentiles(self):
+        """Kuyruğa girişten başarılı gönderime kadar geçen sürenin p50/p99 değerleri (sn)."""
+        with self._lock:
+            vals = sorted(self._latencies)
+        if not vals:
+            return {"p50": None, "p99": None}
+        return {"p50": vals[len(vals) // 2], "p99": vals[min(len(vals) - 1, int(len(vals) * 0.99))]}
+
+    def flush(self, timeout=30.0):
+        """Kuyruk boşalana kadar bekler (test/benchmark ve kapanış için)."""
+        deadline = time.monotonic() + timeout
+        while self.depth() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return self.depth() == 0
+
+    def stop(self):
+        self._stop.set()
+
+    # --- Gönderici thread'i ---
+    def _drain(self, block_for):
+        try:
+            item = self.queue.get(timeout=block_for)
+        except queue.Empty:
+            return
+        while True:
+            enq, chat_id, text, parse_mode = item
+            self._pending[chat_id].append((enq, text, parse_mode))
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def _idle_time(self):
+        """Yeni mesaj beklerken en fazla ne kadar uyunabilir: en erken gönderilebilir sohbete kadar."""
+        if not self._pending:
+            return 0.2
+
+        def ready_at(chat_id):
+            items = self._pending[chat_id]
+            t = self._chat_next[chat_id]
+            if 1 < len(items) < self.digest_threshold:
+                t = max(t, items[0][0] + self.coalesce_window)
+            return t
+
+        ready = max(self._global_next, min(ready_at(c) for c in self._pending))
+        return min(0.2, max(0.001, ready - time.monotonic()))
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._drain(block_for=self._idle_time())
+            now = time.monotonic()
+            for chat_id in list(self._pending):
+                if now < self._global_next:
+                    break   # genel hız sınırı: kalan sohbetler sonraki turda
+                items = self._pending[chat_id]
+                if not items or now < self._chat_next[chat_id]:
+                    continue
+                # Patlama: pencere dolmadan yeni mesaj gelebilir, özet için kısa bekle
+                if len(items) < self.digest_threshold and now - items[0][0] < self.coalesce_window \
+                        and len(items) > 1:
+                    continue
+                batch = self._take_batch(items)
+                if self._send(chat_id, batch):
+                    with self._lock:
+                        self._outstanding -= len(batch)
+                else:
+                    items[:0] = batch   # sohbet ertelendi; sırası bozulmadan yeniden denenir
+                if not items:
+                    del self._pending[chat_id]
+                now = time.monotonic()
+
+    def _take_batch(self, items):
+        """Sıradaki tek mesajı ya da (parse_mode'u aynı) birden çok mesajı özet olarak alır."""
+        if len(items) < self.digest_threshold:
+            return [items.pop(0)]
+        batch, size = [], 0
+        while items and items[0][2] == (batch[0][2] if batch else items[0][2]):
+            extra = len(items[0][1]) + len(DIGEST_SEPARATOR)
+            if batch and size + extra > MAX_MESSAGE_LEN:
+                break
+            batch.append(items.pop(0))
+            size += extra
+        return batch
+
+    def _send(self, chat_id, batch):
+        """Tek gönderim denemesi; sonuçlandıysa True, sohbet ertelendiyse False."""
+        if len(batch) > 1:
+            header = f"📦 <b>{len(batch)} sinyal</b>" if batch[0][2] == "HTML" else f"{len(batch)} mesaj"
+            text = DIGEST_SEPARATOR.join([header] + [b[1] for b in batch])
+        else:
+            text = batch[0][1]
+        payload = {"chat_id": chat_id, "text": text[:MAX_MESSAGE_LEN]}
+        if batch[0][2]:
+            payload["parse_mode"] = batch[0][2]
+
+        self._global_next = time.monotonic() + self.global_interval
+        try:
+            r = self.session.post(self.url, data=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"Telegram gönderme istisnası ({chat_id}): {e}")
+            return self._defer(chat_id, min(2 ** self._attempts.get(chat_id, 0), 30))
+        if r.status_code == 429:
+            with self._lock:
+                self.stats["retries_429"] += 1
+            try:
+                retry_after = float(r.json().get("parameters", {}).get("retry_after", 1))
+            except ValueError:
+                retry_after = 1.0
+            return self._defer(chat_id, retry_after)
+        self._attempts.pop(chat_id, None)
+        now = time.monotonic()
+        self._chat_next[chat_id] = now + self.per_chat_interval
+        with self._lock:
+            if r.status_code == 200:
+                self.stats["sent"] += 1
+                self.stats["digests"] += len(batch) > 1
+                for enq, _, _ in batch:
+                    self._latencies.append(now - enq)
+                self.stats["last_latency"] = now - batch[0][0]
+            else:
+                self.stats["failed"] += 1
+        if r.status_code != 200:
+            print(f"Telegram'a gönderme hatası ({chat_id}): {r.text}")
+        return True
+
+    def _defer(self, chat_id, delay):
+        """Sohbeti delay sn erteler; deneme sınırı aşıldıysa batch düşürülür (True döner)."""
+        self._chat_next[chat_id] = time.monotonic() + delay
+        attempt = self._attempts[chat_id] = self._attempts.get(chat_id, 0) + 1
+        if attempt <= self.max_retries:
+            return False
+        del self._attempts[chat_id]
+        with self._lock:
+            self.stats["failed"] += 1
+        print(f"Telegram'a gönderme başarısız ({chat_id}): yeniden deneme sınırı aşıldı")
+        return True
@@ -0,0 +1,243 @@
+# telemetry.py (METRİKLER + ÖRNEKLEMELİ PROFİLLEYİCİ)
+#
+# Worker sıcak yoldaki süreleri (aşama, sembol, indirme, Telegram, döngü) ve
+# sayaçları bir MetricsRegistry'de toplar; export() JSON'a uygun halini durum
+# anlık görüntüsüne koyar. Web süreci bunu render_prometheus() ile Prometheus
+# metin biçiminde (/metrics) sunar. Histogramlar sabit kovalıdır; shard'lar ve
+# süreçler arasında toplanabilir.
+#
+# SamplingProfiler istek üzerine tek bir tarama döngüsünü örnekler: çalışan
+# thread'lerin yığınları belirli aralıkla okunur ve flame graph araçlarının
+# (flamegraph.pl, speedscope) okuduğu "folded" biçimde yazılır:
+#   thread;modül.fonksiyon;...;yaprak <örnek sayısı>
+# Not: Yalnızca standart kütüphane kullanır.
+
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Saniye cinsinden süre kovaları (1 ms .. 10 dk)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+PROFILE_INTERVAL = 0.005   # örnekleme aralığı (sn)
+# Yaprağı bu dosyalardaysa thread boşta bekliyordur (kuyruk/koşul); örnek sayılmaz
+IDLE_FILES = ("threading.py", "queue.py")
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class MetricsRegistry:
+    """Sayaç, gösterge (gauge) ve histogram aileleri; etiket kümesi başına bir örnek."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, help_texts=None):
+        self.buckets = tuple(buckets)
+        self.help_texts = dict(help_texts or {})   # ad -> HELP satırı
+        self._families = {}    # ad -> {"type", "help", "samples": {etiket anahtarı: değer}}
+        self._lock = threading.Lock()
+
+    def _family(self, name, kind):
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = {"type": kind, "help": self.help_texts.get(name, ""),
+                                             "samples": {}}
+        elif family["type"] != kind:
+            raise ValueError(f"{name} zaten {family['type']} olarak tanımlı")
+        return family
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            samples = self._family(name, "counter")["samples"]
+            key = _label_key(labels)
+            samples[key] = samples.get(key, 0) + value
+
+    def set_counter(self, name, value, **labels):
+        """Başka yerde tutulan birikimli sayacı (ör. önbellek istatistikleri) aynalar."""
+        with self._lock:
+            self._family(name, "counter")["samples"][_label_key(labels)] = value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._family(name, "gauge")["samples"][_label_key(labels)] = value
+
+    def observe(self, name, value, **labels):
+        with self._lock:
+            samples = self._family(name, "histogram")["samples"]
+            key = _label_key(labels)
+            hist = samples.get(key)
+            if hist is None:
+                hist = samples[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            idx = next((i for i, b in enumerate(self.buckets) if value <= b), len(self.buckets))
+            hist[0][idx] += 1
+            hist[1] += value
+            hist[2] += 1
+
+    def time(self, name, **labels):
+        """with registry.time("ad", etiket=...): bloğun süresini histograma ekler."""
+        return _Timer(self, name, labels)
+
+    def export(self):
+        """JSON'a uygun kopya: {ad: {"type", "help", ["buckets"], "samples": [[etiketler, değer]]}}.
+
+        Histogram değeri [kova sayıları (kümülatif değil, son eleman +Inf), toplam, adet].
+        """
+        with self._lock:
+            out = {}
+            for name, family in self._families.items():
+                entry = {"type": family["type"], "help": family["help"],
+                         "samples": [[dict(key), [list(v[0]), v[1], v[2]] if family["type"] == "histogram" else v]
+                                     for key, v in family["samples"].items()]}
+                if family["type"] == "histogram":
+                    entry["buckets"] = list(self.buckets)
+                out[name] = entry
+            return out
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "labels", "t0")
+
+    def __init__(self, registry, name, labels):
+        self.registry, self.name, self.labels = registry, name, labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.t0, **self.labels)
+        return False
+
+
+# -----------------------
+# PROMETHEUS METİN BİÇİMİ
+# -----------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _number(value):
+    if value is None:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    value = float(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+
+
+def render_prometheus(exports):
+    """exports: [(ek etiketler, export() çıktısı)] -> Prometheus metin biçimi (0.0.4).
+
+    Aynı ad birden fazla kaynakta (ör. shard) varsa HELP/TYPE bir kez yazılır,
+    örnekler kaynağın ek etiketleriyle ayrışır.
+    """
+    families = {}
+    for extra, export in exports:
+        for name, family in (export or {}).items():
+            merged = families.setdefault(name, {"type": family["type"], "help": family.get("help", ""),
+                                                "buckets": family.get("buckets"), "samples": []})
+            if merged["type"] != family["type"]:
+                continue
+            merged["samples"].extend((dict(extra, **labels), value) for labels, value in family["samples"])
+    lines = []
+    for name in sorted(families):
+        family = families[name]
+        if family["help"]:
+            lines.append(f"# HELP {name} {_escape(family['help'])}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for labels, value in family["samples"]:
+            if family["type"] != "histogram":
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                continue
+            counts, total, count = value
+            cumulative = 0
+            for bound, n in zip(list(family["buckets"]) + [math.inf], counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels(dict(labels, le=_number(bound)))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------
+# ÖRNEKLEMELİ PROFİLLEYİCİ
+# -----------------------
+def _frame_name(code):
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}.{code.co_name}"
+
+
+class SamplingProfiler:
+    """Arka plan thread'iyle yığın örnekler; stop() sonrası folded() flame graph verisidir."""
+
+    def __init__(self, interval=PROFILE_INTERVAL, thread_filter=None):
+        self.interval = interval
+        self.thread_filter = thread_filter or (lambda name: True)
+        self.stacks = Counter()
+        self.samples = 0
+        self.idle = 0
+        self.started = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                name = names.get(ident, str(ident))
+                if ident == own or not self.thread_filter(name):
+                    continue
+                if os.path.basename(frame.f_code.co_filename) in IDLE_FILES:
+                    self.idle += 1
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame.f_code))
+                    frame = frame.f_back
+                stack.append(name.rstrip("0123456789").rstrip("-") or name)
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def folded(self):
+        """Folded yığın satırları (en sık önce)."""
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.folded())
+        return path
+
+    def top(self, n=10):
+        """Yaprak fonksiyon başına öz süre payı: [(fonksiyon, oran)]."""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = max(1, self.samples)
+        return [(name, round(count / total, 4)) for name, count in leaves.most_common(n)]
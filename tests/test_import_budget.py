@@ -0,0 +1,27 @@
+# tests/test_import_budget.py (WEB SÜRECİ İÇE AKTARMA BÜTÇESİ TESTİ)
+#
+# dashboard_web temiz bir süreçte içe aktarılır; analiz yığını (bench/import_budget.py
+# FORBIDDEN) yüklenmemelidir. Bu kısım belirleyicidir. RSS geniş bir sınırla
+# denetlenir; içe aktarma süresi paylaşılan makinelerde oynak olduğundan
+# yalnızca bench'te ölçülür:
+#
+#   python -m pytest tests/test_import_budget.py
+#   python -m bench.import_budget --budget-ms 800 --rss-mb 80 --detail
+
+import os
+
+from bench.import_budget import DEFAULT_RSS_MB, FORBIDDEN, probe
+
+
+def web_env():
+    return dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+
+
+def test_web_import_loads_no_forbidden_module():
+    result = probe("dashboard_web", web_env())
+    assert result["loaded"] == [], f"web sürecine yüklenmemeli: {result['loaded']} (yasak: {FORBIDDEN})"
+
+
+def test_web_import_rss_within_generous_bound():
+    result = probe("dashboard_web", web_env())
+    assert result["rss_kb"] / 1024 < 2 * DEFAULT_RSS_MB